@@ -1,22 +1,62 @@
+import asyncio
+import contextlib
+import json
 import logging
-import shutil
-import tempfile
-from pathlib import Path
+from collections.abc import Iterator
+from datetime import date
+from typing import Any
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from pydantic import BaseModel
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
+from backend import metrics
 from backend.config import Settings, load_settings
-from backend.engine import LLMEngine, Transcriber
-from backend.output import SessionLogger
+from backend.engine import (
+    LLMEngine,
+    PoolSaturatedError,
+    RoutingError,
+    SegmentColumns,
+    StreamingSession,
+    Transcriber,
+    TranscriptionPool,
+)
+from backend.engine.transcriber import Detail
+from backend.event_bus import EventBus
+from backend.event_log import EventLog
+from backend.jobs import Job, JobManager, JobStoreFullError
+from backend.output import SessionHistory, SessionIndex, SessionLogger
+from backend.output.search import SearchResults
+from backend.pipeline import Pipeline, PipelineError, PipelineResult
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# WebSocket close code for "server overloaded, try again later" (RFC 6455 registry)
+WS_TRY_AGAIN_LATER = 1013
+
 # Singleton instances
 _transcriber = None
 _session_logger = None
+_session_index = None
+_session_history = None
+_event_log = None
+_job_manager = None
+_pipeline = None
 _llm_engine = None
+_transcription_pool = None
 
 def get_settings():
     return load_settings()
@@ -27,10 +67,38 @@ def get_transcriber(settings: Settings = Depends(get_settings)):
         _transcriber = Transcriber(settings)
     return _transcriber
 
-def get_session_logger(settings: Settings = Depends(get_settings)):
+def get_transcription_pool(
+    settings: Settings = Depends(get_settings),
+    transcriber: Transcriber = Depends(get_transcriber)
+):
+    global _transcription_pool
+    if _transcription_pool is None:
+        _transcription_pool = TranscriptionPool(settings, transcriber)
+    return _transcription_pool
+
+def get_session_index(settings: Settings = Depends(get_settings)):
+    global _session_index
+    if _session_index is None and settings.session.index:
+        _session_index = SessionIndex(settings)
+    return _session_index
+
+def get_session_history(settings: Settings = Depends(get_settings)):
+    global _session_history
+    if _session_history is None:
+        _session_history = SessionHistory(settings)
+    return _session_history
+
+def get_session_logger(
+    settings: Settings = Depends(get_settings),
+    session_index: SessionIndex | None = Depends(get_session_index),
+    session_history: SessionHistory = Depends(get_session_history)
+):
     global _session_logger
     if _session_logger is None:
         _session_logger = SessionLogger(settings)
+        _session_logger.add_listener(session_history.index_entries)
+        if session_index is not None:
+            _session_logger.add_listener(session_index.index_entries)
     return _session_logger
 
 def get_llm_engine(settings: Settings = Depends(get_settings)):
@@ -39,47 +107,350 @@ def get_llm_engine(settings: Settings = Depends(get_settings)):
         _llm_engine = LLMEngine(settings)
     return _llm_engine
 
+def get_event_log(settings: Settings = Depends(get_settings)):
+    global _event_log
+    if _event_log is None:
+        _event_log = EventLog(settings.events)
+    return _event_log
+
+def get_pipeline(
+    pool: TranscriptionPool = Depends(get_transcription_pool),
+    llm_engine: LLMEngine = Depends(get_llm_engine),
+    session_logger: SessionLogger = Depends(get_session_logger)
+):
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = Pipeline(pool, llm_engine, session_logger)
+    return _pipeline
+
+def get_job_manager(
+    settings: Settings = Depends(get_settings),
+    pool: TranscriptionPool = Depends(get_transcription_pool),
+    llm_engine: LLMEngine = Depends(get_llm_engine),
+    session_logger: SessionLogger = Depends(get_session_logger)
+):
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(settings.jobs, pool, llm_engine, session_logger)
+    return _job_manager
+
+def start_warmup(settings: Settings) -> asyncio.Task:
+    """Warm up transcription models in the background; /api/ready reports progress."""
+    pool = get_transcription_pool(settings, get_transcriber(settings))
+    return asyncio.create_task(pool.warm_up())
+
+def start_llm_warmup(settings: Settings) -> asyncio.Task:
+    """Open connections to the LLM providers in the background."""
+    return asyncio.create_task(get_llm_engine(settings).warm_up())
+
+def start_template_watch(settings: Settings) -> asyncio.Task:
+    """Recompile prompt templates as their files change, in the background."""
+    return asyncio.create_task(get_llm_engine(settings).templates.watch())
+
+def start_session_index(settings: Settings) -> asyncio.Task | None:
+    """Index session files written while the server was down, in the background."""
+    session_index = get_session_index(settings)
+    if session_index is None:
+        return None
+    # Attach the live listener first so nothing is missed between the two
+    get_session_logger(settings, session_index, get_session_history(settings))
+    return asyncio.create_task(asyncio.to_thread(session_index.backfill))
+
+def shutdown():
+    """Release singleton resources; called from the app lifespan."""
+    global _transcription_pool, _session_logger, _session_index, _session_history
+    global _event_log, _job_manager, _pipeline
+    _pipeline = None
+    if _job_manager is not None:
+        _job_manager.shutdown()
+        _job_manager = None
+    if _transcription_pool is not None:
+        _transcription_pool.shutdown()
+        _transcription_pool = None
+    if _session_logger is not None:
+        # Drains queued entries and fsyncs the session file
+        _session_logger.close()
+        _session_logger = None
+    if _session_index is not None:
+        _session_index.close()
+        _session_index = None
+    _session_history = None
+    if _event_log is not None:
+        _event_log.close()
+        _event_log = None
+
+async def close_llm_engine():
+    """Close the LLM provider connection pool; called from the app lifespan."""
+    global _llm_engine
+    if _llm_engine is not None:
+        await _llm_engine.aclose()
+        _llm_engine = None
+
 class AppendRequest(BaseModel):
     text: str
+    # Wait until the entry is fsynced; defaults to [session] durable
+    durable: bool | None = None
+    # Segment metadata from /api/transcribe, kept in the day's sidecar file
+    segments: SegmentColumns | None = None
 
 class RefineRequest(BaseModel):
     text: str
     template: str
     provider: str | None = None
 
+class BatchRefinement(BaseModel):
+    template: str
+    provider: str | None = None
+
+class BatchRefineRequest(BaseModel):
+    text: str
+    refinements: list[BatchRefinement] = Field(min_length=1)
+
+class ChunkedRefineRequest(BaseModel):
+    # Either the text itself or the day whose session file to refine
+    text: str | None = None
+    day: date | None = None
+    template: str
+    provider: str | None = None
+    # Defaults to the one in [llm.chunking.reduce] for the template
+    reduce_template: str | None = None
+
 class TranscribeResponse(BaseModel):
     text: str
+    vad_skipped_seconds: float | None = None
+    # Only present (and True) when the result came from the cache
+    cached: bool | None = None
+    # Only with detail "segments" or "words"
+    language: str | None = None
+    language_probability: float | None = None
+    duration: float | None = None
+    segments: SegmentColumns | None = None
 
 @router.get("/health")
-def health_check(settings: Settings = Depends(get_settings)):
+def health_check(
+    settings: Settings = Depends(get_settings),
+    pool: TranscriptionPool = Depends(get_transcription_pool)
+):
     return {
         "status": "ok",
         "version": "0.1.0",
+        "ready": pool.ready,
         "transcription_model": settings.transcription.model,
         "session_directory": str(settings.session.directory),
     }
 
+@router.get("/ready")
+def readiness_check(pool: TranscriptionPool = Depends(get_transcription_pool)):
+    if not pool.ready:
+        raise HTTPException(status_code=503, detail="Transcription model is not loaded yet")
+    return {"ready": True, "models": pool.loaded_models}
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 @router.get("/config")
 def get_config(settings: Settings = Depends(get_settings)):
     return settings
 
-@router.post("/transcribe")
-def transcribe_audio(
+@router.get("/templates")
+def list_templates(llm_engine: LLMEngine = Depends(get_llm_engine)) -> dict[str, Any]:
+    return {
+        "default": llm_engine.settings.templates.default,
+        "templates": llm_engine.templates.list(),
+    }
+
+@router.post("/transcribe", response_model_exclude_none=True)
+async def transcribe_audio(
+    response: Response,
     file: UploadFile = File(...),
-    transcriber: Transcriber = Depends(get_transcriber)
+    model: str | None = Form(None),
+    detail: Detail = Form("text"),
+    pool: TranscriptionPool = Depends(get_transcription_pool)
 ) -> TranscribeResponse:
     logger.info(f"Received audio upload: {file.filename}")
 
+    available = pool.transcriber.available_models
+    if model is not None and model not in available:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Model '{model}' is not available; choose one of {available}"
+        )
+
+    try:
+        with metrics.timed(metrics.TRANSCRIPTION_STAGE_SECONDS, stage="upload_receive"):
+            audio = await file.read()
+        result = await pool.transcribe(audio, model, detail)
+        for stage, seconds in result.timings.items():
+            metrics.observe(metrics.TRANSCRIPTION_STAGE_SECONDS, seconds, stage=stage)
+        metrics.TRANSCRIPTIONS_TOTAL.inc(cached=str(result.cached).lower())
+        await EventBus.publish_async("transcription_complete", {
+            "text": result.text,
+            "language": result.language,
+            "duration": result.duration,
+            "cached": result.cached,
+        })
+
+        response.headers["X-Queue-Depth"] = str(pool.queue_depth)
+        response.headers["X-Cache"] = "HIT" if result.cached else "MISS"
+        rich = {}
+        if detail != "text":
+            rich = {
+                "language": result.language,
+                "language_probability": result.language_probability,
+                "duration": result.duration,
+                "segments": result.segments,
+            }
+        return TranscribeResponse(
+            text=result.text,
+            vad_skipped_seconds=result.vad_skipped_seconds,
+            cached=result.cached or None,
+            **rich
+        )
+    except PoolSaturatedError as e:
+        logger.warning(f"Rejecting transcription: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1", "X-Queue-Depth": str(e.queue_depth)}
+        ) from e
+    except Exception as e:
+        logger.error(f"Transcription failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@router.post("/transcribe/segments")
+async def transcribe_audio_segments(
+    file: UploadFile = File(...),
+    model: str | None = Form(None),
+    words: bool = Form(False),
+    pool: TranscriptionPool = Depends(get_transcription_pool)
+):
+    """Transcribe an upload, streaming NDJSON segment events as the decoder produces them."""
+    available = pool.transcriber.available_models
+    if model is not None and model not in available:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Model '{model}' is not available; choose one of {available}"
+        )
+    with metrics.timed(metrics.TRANSCRIPTION_STAGE_SECONDS, stage="upload_receive"):
+        audio = await file.read()
+
+    events = pool.stream("iter_segments", audio, model, words)
     try:
-        text = transcriber.transcribe(file.file)
-        return TranscribeResponse(text=text)
+        # Decoding, language detection and admission happen before the first event
+        first = await anext(events)
+    except PoolSaturatedError as e:
+        logger.warning(f"Rejecting transcription: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": "1", "X-Queue-Depth": str(e.queue_depth)}
+        ) from e
     except Exception as e:
         logger.error(f"Transcription failed: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+    async def lines():
+        info = first
+        yield json.dumps(first).encode() + b"\n"
+        try:
+            async for event in events:
+                if event["type"] == "done":
+                    for stage, seconds in event["timings"].items():
+                        metrics.observe(metrics.TRANSCRIPTION_STAGE_SECONDS, seconds, stage=stage)
+                    metrics.TRANSCRIPTIONS_TOTAL.inc(cached="false")
+                    await EventBus.publish_async("transcription_complete", {
+                        "text": event["text"],
+                        "language": info["language"],
+                        "duration": info["duration"],
+                        "cached": False,
+                    })
+                yield json.dumps(event).encode() + b"\n"
+        except Exception as e:
+            logger.error(f"Streaming transcription failed: {e}")
+            yield json.dumps({"type": "error", "detail": str(e)}).encode() + b"\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws/transcribe")
+async def transcribe_stream(
+    websocket: WebSocket,
+    pool: TranscriptionPool = Depends(get_transcription_pool),
+    settings: Settings = Depends(get_settings)
+):
+    """
+    Stream audio chunks in as binary messages; partial and final segments are
+    pushed back as JSON. Send {"type": "stop"} to flush and receive "done".
+
+    Each step's inference takes a slot on the transcription pool like any
+    upload. A session is refused (close code 1013) when the pool is full at
+    connect time; later, a step that finds it full is skipped and its audio
+    is covered by the next one.
+    """
+    await websocket.accept()
+    if pool.in_flight >= pool.capacity:
+        logger.warning("Rejecting streaming session: transcription queue is full")
+        await websocket.close(code=WS_TRY_AGAIN_LATER, reason=str(PoolSaturatedError(pool.queue_depth)))
+        return
+    session = StreamingSession(pool.transcriber, settings.streaming)
+    stopped = asyncio.Event()
+
+    async def step(final: bool = False) -> list[dict]:
+        window = session.next_window()
+        segments = []
+        while len(window):
+            try:
+                segments = await pool.submit("transcribe_segments", window, settings.streaming.beam_size)
+                break
+            except PoolSaturatedError:
+                if not final:
+                    return []
+                # The last step carries the end of the dictation; wait for a slot
+                await asyncio.sleep(settings.streaming.step_seconds)
+        return session.advance(window, segments, final)
+
+    async def receive():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes"):
+                    session.feed(message["bytes"])
+                elif message.get("text") and json.loads(message["text"]).get("type") == "stop":
+                    break
+        finally:
+            stopped.set()
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while not stopped.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stopped.wait(), timeout=settings.streaming.step_seconds)
+            if not stopped.is_set() and session.has_new_audio():
+                for event in await step():
+                    await websocket.send_json(event)
+
+        await asyncio.to_thread(session.finish)
+        for event in await step(final=True):
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("Streaming client disconnected")
+    except Exception as e:
+        logger.error(f"Streaming transcription failed: {e}")
+        try:
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
     finally:
-        # Clean up
-        if tmp_path.exists():
-            tmp_path.unlink()
+        receiver.cancel()
+        session.close()
 
 @router.post("/session/append")
 def append_session(
@@ -87,24 +458,305 @@ def append_session(
     session_logger: SessionLogger = Depends(get_session_logger)
 ):
     try:
-        path = session_logger.append(request.text)
+        with metrics.timed(metrics.SESSION_APPEND_SECONDS):
+            path = session_logger.append(
+                request.text,
+                durable=request.durable,
+                segments=request.segments.model_dump(exclude_none=True) if request.segments else None
+            )
+        EventBus.publish("session_append", {"file": str(path), "text": request.text})
         return {"status": "success", "file": str(path)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Failed to append to session: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
+@router.get("/session/search", response_model=SearchResults)
+def search_sessions(
+    q: str,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session_index: SessionIndex | None = Depends(get_session_index)
+):
+    if session_index is None:
+        raise HTTPException(status_code=503, detail="Session search is disabled ([session] index = false)")
+    return session_index.search(
+        q,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+        limit=limit,
+        offset=offset,
+    )
+
+def _ndjson(items) -> Iterator[bytes]:
+    for item in items:
+        yield json.dumps(item).encode() + b"\n"
+
+def _read_session(session_history: SessionHistory, day: date, since: str | None = None) -> StreamingResponse:
+    if not session_history.get_session_file(day).exists():
+        raise HTTPException(status_code=404, detail=f"No session file for {day.isoformat()}")
+    if since is not None and since.isdigit():
+        since = int(since)
+    return StreamingResponse(_ndjson(session_history.read(day, since)), media_type="application/x-ndjson")
+
+# Declared after /session/search so "search" isn't taken for a date
+@router.get("/session/{day}")
+def get_session(day: date, session_history: SessionHistory = Depends(get_session_history)):
+    return _read_session(session_history, day)
+
+@router.get("/session/{day}/entries")
+def get_session_entries(
+    day: date,
+    since: str | None = Query(None, pattern=r"^(\d+|\d{2}:\d{2}:\d{2})$"),
+    session_history: SessionHistory = Depends(get_session_history)
+):
+    return _read_session(session_history, day, since)
+
 @router.post("/refine")
 async def refine_text(
     request: RefineRequest,
     llm_engine: LLMEngine = Depends(get_llm_engine)
 ):
     try:
-        refined_text = await llm_engine.refine_text(
+        result = await llm_engine.refine(
             text=request.text,
             template_name=request.template,
             provider=request.provider
         )
-        return {"text": refined_text}
+        await EventBus.publish_async("refine_complete", {
+            "text": result.text,
+            "template": request.template,
+            "provider": result.provider,
+            "cached": result.cached,
+        })
+        if result.cached:
+            return {"text": result.text, "cached": True}
+        return {
+            "text": result.text,
+            "provider": result.provider,
+            "model": result.model,
+            "route": result.route,
+            "usage": result.usage,
+        }
+    except RoutingError as e:
+        logger.error(f"Refinement failed on every provider: {e}")
+        return JSONResponse(status_code=503, content={"detail": str(e), "route": e.route.model_dump()})
     except Exception as e:
         logger.error(f"Refinement failed: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+def _sse(event: str, data: Any, event_id: int | None = None) -> str:
+    """Format one Server-Sent Events message."""
+    message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return f"id: {event_id}\n{message}" if event_id is not None else message
+
+@router.post("/refine/stream")
+async def refine_text_stream(
+    request: RefineRequest,
+    llm_engine: LLMEngine = Depends(get_llm_engine)
+):
+    async def events():
+        try:
+            async for event in llm_engine.refine_stream(
+                text=request.text,
+                template_name=request.template,
+                provider=request.provider
+            ):
+                if event["type"] == "done":
+                    await EventBus.publish_async("refine_complete", {
+                        "text": event["text"],
+                        "template": request.template,
+                        "provider": event.get("provider"),
+                        "cached": event.get("cached", False),
+                    })
+                yield _sse(event.pop("type"), event)
+        except Exception as e:
+            logger.error(f"Streaming refinement failed: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Stop reverse proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/refine/batch")
+async def refine_text_batch(
+    request: BatchRefineRequest,
+    llm_engine: LLMEngine = Depends(get_llm_engine)
+):
+    """Run several refinements of one text at once; stream each result as NDJSON as it finishes."""
+    async def results():
+        async for item in llm_engine.refine_batch(
+            request.text,
+            [(r.template, r.provider) for r in request.refinements]
+        ):
+            if "error" not in item:
+                await EventBus.publish_async("refine_complete", {
+                    "text": item["text"],
+                    "template": item["template"],
+                    "provider": item["provider"],
+                    "cached": item["cached"],
+                })
+            yield json.dumps(item).encode() + b"\n"
+
+    return StreamingResponse(
+        results(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/refine/chunked")
+async def refine_text_chunked(
+    request: ChunkedRefineRequest,
+    llm_engine: LLMEngine = Depends(get_llm_engine),
+    session_history: SessionHistory = Depends(get_session_history)
+):
+    """Refine a long text, or a whole day's session, as concurrently refined chunks."""
+    if (request.text is None) == (request.day is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of 'text' or 'day'")
+    text = request.text
+    if request.day is not None:
+        if not session_history.get_session_file(request.day).exists():
+            raise HTTPException(status_code=404, detail=f"No session file for {request.day.isoformat()}")
+        entries = await asyncio.to_thread(lambda: list(session_history.read(request.day)))
+        text = "\n\n".join(entry["text"] for entry in entries)
+    try:
+        result = await llm_engine.refine_chunked(
+            text,
+            request.template,
+            provider=request.provider,
+            reduce_template=request.reduce_template
+        )
+    except RoutingError as e:
+        logger.error(f"Chunked refinement failed on every provider: {e}")
+        return JSONResponse(status_code=503, content={"detail": str(e), "route": e.route.model_dump()})
+    except Exception as e:
+        logger.error(f"Chunked refinement failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    await EventBus.publish_async("refine_complete", {
+        "text": result.text,
+        "template": request.template,
+        "provider": result.provider,
+        "cached": result.cached_chunks == result.chunks,
+    })
+    return result
+
+@router.post("/pipeline")
+async def run_pipeline(
+    steps: str = Form(...),
+    file: UploadFile | None = File(None),
+    text: str | None = Form(None),
+    model: str | None = Form(None),
+    provider: str | None = Form(None),
+    pipeline: Pipeline = Depends(get_pipeline)
+) -> PipelineResult:
+    """
+    Run comma-separated steps (e.g. "transcribe,append,refine:fix_grammar")
+    in one request; responds 500 with the partial result if a step fails.
+    """
+    available = pipeline.pool.transcriber.available_models
+    if model is not None and model not in available:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Model '{model}' is not available; choose one of {available}"
+        )
+    audio = await file.read() if file is not None else None
+    step_list = [step.strip() for step in steps.split(",") if step.strip()]
+    try:
+        result = await pipeline.run(step_list, audio=audio, text=text, model=model, provider=provider)
+    except PipelineError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    await EventBus.publish_async("pipeline_complete", result.model_dump())
+    if not result.ok:
+        return JSONResponse(status_code=500, content=result.model_dump())
+    return result
+
+@router.post("/jobs", status_code=202)
+async def create_job(
+    file: UploadFile | None = File(None),
+    text: str | None = Form(None),
+    model: str | None = Form(None),
+    template: str | None = Form(None),
+    provider: str | None = Form(None),
+    append: bool = Form(False),
+    job_manager: JobManager = Depends(get_job_manager)
+) -> Job:
+    """Start a transcribe/refine/append pipeline and return its job right away."""
+    available = job_manager.pool.transcriber.available_models
+    if model is not None and model not in available:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Model '{model}' is not available; choose one of {available}"
+        )
+    audio = await file.read() if file is not None else None
+    try:
+        return job_manager.submit(audio, text, model, template, provider, append)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except JobStoreFullError as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+
+@router.get("/jobs")
+def list_jobs(job_manager: JobManager = Depends(get_job_manager)) -> list[Job]:
+    return job_manager.list()
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+@router.delete("/jobs/{job_id}")
+def cancel_job(job_id: str, job_manager: JobManager = Depends(get_job_manager)) -> Job:
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+@router.get("/events")
+async def event_stream(
+    last_event_id: int | None = Query(None),
+    last_event_id_header: int | None = Header(None, alias="Last-Event-ID"),
+    pool: TranscriptionPool = Depends(get_transcription_pool),
+    event_log: EventLog = Depends(get_event_log)
+):
+    """
+    Server-Sent Events for everything published on the EventBus.
+
+    Browsers reconnect with a Last-Event-ID header; the query parameter does
+    the same for clients that can't set headers.
+    """
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+
+    async def events():
+        # New clients start from the state snapshot; reconnecting ones from their last id
+        last_id = resume_from if resume_from is not None else event_log.last_id
+        # How long EventSource waits before reconnecting (ms)
+        yield "retry: 3000\n\n"
+        yield _sse("state", {
+            "ready": pool.ready,
+            "in_flight": pool.in_flight,
+            "queue_depth": pool.queue_depth,
+            "last_event_id": event_log.last_id,
+        })
+        if resume_from is not None and event_log.since(resume_from)[1]:
+            # Older events fell out of the buffer (or the server restarted)
+            yield _sse("reset", {"last_event_id": resume_from})
+        async for event in event_log.follow(last_id):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield _sse(event.topic, event.data, event.id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
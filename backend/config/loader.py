@@ -1,3 +1,4 @@
+import os
 from functools import lru_cache
 from pathlib import Path
 
@@ -9,6 +10,8 @@ except ImportError:
 from .models import Settings
 
 CONFIG_PATH = Path("config/settings.toml")
+# Points at an alternative settings file (e.g. for benchmarks or tests)
+CONFIG_ENV_VAR = "DICTATOR_CONFIG"
 DEFAULT_CONFIG_PATHS = [
     Path("config/settings.example.toml"),
     Path("config.example.toml"),
@@ -16,7 +19,13 @@ DEFAULT_CONFIG_PATHS = [
 
 @lru_cache(maxsize=1)
 def load_settings() -> Settings:
-    config_file = CONFIG_PATH
+    override = os.environ.get(CONFIG_ENV_VAR)
+    if override:
+        config_file = Path(override)
+        if not config_file.exists():
+            raise FileNotFoundError(f"Configuration file not found at {config_file} (from ${CONFIG_ENV_VAR})")
+    else:
+        config_file = CONFIG_PATH
     if not config_file.exists():
         # Fallback to example config if actual config doesn't exist
         # This allows the app to run out of the box
@@ -19,6 +19,56 @@ class TranscriptionConfig(BaseModel):
     device: Literal["cpu", "cuda"] = "cpu"
     compute_type: Literal["int8", "float16", "float32"] = "int8"
     language: str = "en"
+    beam_size: int = 5
+    # Extra models kept resident and selectable per request (e.g. "base")
+    preload: list[str] = []
+    # Load models and run a dummy inference at startup
+    warmup: bool = False
+    # LRU-evict resident models beyond this estimate (0 = unlimited)
+    memory_budget_mb: int = 0
+
+class WorkersConfig(BaseModel):
+    mode: Literal["thread", "process"] = "thread"
+    count: int = 1
+    max_queue: int = 8
+    cpu_threads: int = 0
+
+class BatchingConfig(BaseModel):
+    enabled: bool = False
+    max_batch_size: int = 8
+    max_wait_ms: float = 10.0
+
+class StreamingConfig(BaseModel):
+    step_seconds: float = 1.0
+    window_seconds: float = 20.0
+    stability_margin: float = 1.0
+    beam_size: int = 1
+
+class EventsConfig(BaseModel):
+    # Recent events kept for clients resuming with Last-Event-ID
+    buffer_size: int = 1000
+    # Seconds between keep-alive comments on idle /api/events streams
+    keepalive_seconds: float = 15.0
+
+class JobsConfig(BaseModel):
+    # Jobs kept in memory; the oldest finished job is evicted to make room
+    max_jobs: int = 100
+    # Seconds a finished job's result stays available
+    ttl_seconds: float = 3600
+
+class ResultCacheConfig(BaseModel):
+    enabled: bool = True
+    # Entries kept in the in-memory LRU tier
+    max_entries: int = 256
+    # Optional on-disk tier (e.g. "./models/cache"); None keeps results in memory only
+    directory: Path | None = None
+    max_disk_mb: float = 256
+    # Expire entries after this many seconds (None = never)
+    ttl_seconds: float | None = None
+
+class CacheConfig(BaseModel):
+    transcription: ResultCacheConfig = ResultCacheConfig()
+    llm: ResultCacheConfig = ResultCacheConfig(ttl_seconds=24 * 3600)
 
 class VadConfig(BaseModel):
     enabled: bool = True
@@ -30,24 +80,93 @@ class SessionConfig(BaseModel):
     directory: Path = Path("./transcripts")
     date_format: str = "%Y-%m-%d"
     include_timestamps: bool = True
+    # Seconds between fsyncs of the session file; close() always fsyncs
+    fsync_interval: float = 1.0
+    # Wait for each entry to be written and fsynced before /session/append returns
+    durable: bool = False
+    # Most queued entries coalesced into a single write
+    max_batch: int = 256
+    # Full-text search index of session entries (SQLite FTS5)
+    index: bool = True
+    # Defaults to <directory>/.session-index.sqlite3
+    index_path: Path | None = None
 
 class AnthropicConfig(BaseModel):
     model: str = "claude-sonnet-4-20250514"
     max_tokens: int = 1024
+    # Seconds to wait for a response, including time queued behind
+    # max_concurrency (connecting uses [llm.http] connect_timeout)
+    timeout: float = 60.0
+    # Calls in flight at once; further calls wait their turn
+    max_concurrency: int = 4
 
 class OpenAIConfig(BaseModel):
     model: str = "gpt-4o"
     max_tokens: int = 1024
+    timeout: float = 60.0
+    max_concurrency: int = 4
 
 class OllamaConfig(BaseModel):
     base_url: str = "http://localhost:11434"
     model: str = "llama3.2"
+    # Local models can take a while to load on first use
+    timeout: float = 120.0
+    # Ollama runs few requests in parallel (OLLAMA_NUM_PARALLEL)
+    max_concurrency: int = 2
+    # How long Ollama keeps the model, and its cached prompt prefix, loaded
+    # after a request
+    keep_alive: str = "30m"
+
+class RoutingConfig(BaseModel):
+    # Providers tried in order when the requested one fails
+    fallback: list[Literal["anthropic", "openai", "ollama"]] = []
+    # Extra attempts per provider on timeouts, connection errors, 429 and 5xx
+    retries: int = 2
+    # Backoff before retry n is random up to min(max, base * 2**n) seconds
+    backoff_seconds: float = 0.5
+    backoff_max_seconds: float = 8.0
+    # Also start the next fallback provider if no answer after this many
+    # seconds, and take whichever answers first
+    hedge_after_seconds: float | None = None
+
+class PromptCacheConfig(BaseModel):
+    # Send each template's static instructions as a separate, cacheable
+    # system block ahead of the dictated text
+    enabled: bool = True
+    # Shorter prefixes are sent as part of the user message. Anthropic and
+    # OpenAI only cache prefixes of 1024 tokens or more (about 4 chars each)
+    min_prefix_chars: int = 4096
+
+class ChunkingConfig(BaseModel):
+    # Token budget per chunk for /api/refine/chunked. Keep it under the
+    # provider's max_tokens for templates that rewrite rather than condense
+    chunk_tokens: int = 750
+    # Characters per token used to estimate chunk sizes
+    chars_per_token: float = 4.0
+    # Reduce step run over the joined chunk outputs, by map template
+    reduce: dict[str, str] = {"summarize": "summarize_reduce"}
+
+class HTTPConfig(BaseModel):
+    # Connection pool shared by every LLM provider client
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    # Seconds an idle connection is kept open for reuse
+    keepalive_expiry: float = 60.0
+    # Negotiated per connection; needs the optional h2 package
+    http2: bool = True
+    connect_timeout: float = 5.0
+    # Open connections to configured providers at startup
+    warmup: bool = True
 
 class LLMConfig(BaseModel):
     default_provider: Literal["anthropic", "openai", "ollama"] = "ollama"
     anthropic: AnthropicConfig | None = None
     openai: OpenAIConfig | None = None
     ollama: OllamaConfig | None = None
+    http: HTTPConfig = HTTPConfig()
+    routing: RoutingConfig = RoutingConfig()
+    prompt_cache: PromptCacheConfig = PromptCacheConfig()
+    chunking: ChunkingConfig = ChunkingConfig()
 
 class ClusterConfig(BaseModel):
     enabled: bool = False
@@ -56,6 +175,10 @@ class ClusterConfig(BaseModel):
 class TemplatesConfig(BaseModel):
     directory: Path = Path("./prompts")
     default: str = "fix_grammar"
+    # Recompile templates when their files change (watchfiles if installed)
+    watch: bool = True
+    # Seconds between directory scans when watchfiles isn't installed
+    poll_seconds: float = 2.0
 
 class Settings(BaseModel):
     server: ServerConfig
@@ -66,3 +189,9 @@ class Settings(BaseModel):
     llm: LLMConfig
     cluster: ClusterConfig
     templates: TemplatesConfig
+    streaming: StreamingConfig = StreamingConfig()
+    workers: WorkersConfig = WorkersConfig()
+    batching: BatchingConfig = BatchingConfig()
+    cache: CacheConfig = CacheConfig()
+    events: EventsConfig = EventsConfig()
+    jobs: JobsConfig = JobsConfig()
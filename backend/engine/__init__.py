@@ -1,6 +1,21 @@
-from .llm import LLMEngine
-from .transcriber import Transcriber
+from .llm import ChunkedRefineResult, LLMEngine, RefineResult
+from .pool import PoolSaturatedError, TranscriptionPool
+from .router import ProviderRouter, Route, RoutingError
+from .streaming import StreamingSession
+from .transcriber import SegmentColumns, Transcriber, TranscriptionResult, WordColumns
 
-__all__ = ["Transcriber", "LLMEngine"]
-
-__all__ = ["Transcriber"]
+__all__ = [
+    "Transcriber",
+    "TranscriptionResult",
+    "SegmentColumns",
+    "WordColumns",
+    "LLMEngine",
+    "RefineResult",
+    "ChunkedRefineResult",
+    "ProviderRouter",
+    "Route",
+    "RoutingError",
+    "StreamingSession",
+    "TranscriptionPool",
+    "PoolSaturatedError",
+]
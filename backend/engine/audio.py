@@ -0,0 +1,130 @@
+import io
+import logging
+import wave
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+from backend.config.models import AudioConfig
+
+# Import PyAV conditionally; it ships with faster-whisper
+try:
+    import av
+except ImportError:
+    av = None
+
+logger = logging.getLogger(__name__)
+
+# Peak level that normalization scales audio to (-1 dBFS)
+NORMALIZE_PEAK = 10 ** (-1 / 20)
+# Below this peak the clip is treated as silence and left untouched
+SILENCE_PEAK = 1e-4
+
+PCM_DTYPES = {1: np.uint8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+
+def load_audio(source: str | Path | BinaryIO | bytes, config: AudioConfig) -> np.ndarray:
+    """
+    Decode audio into a mono float32 array at `config.sample_rate`.
+
+    PCM WAV is parsed directly with NumPy; anything else (webm/opus and ogg
+    from the browser recorder) goes through PyAV, whose resampler converts to
+    the target rate and layout while decoding. The result is peak-normalized
+    in place when `config.normalize` is set and can be handed to Whisper as is.
+    """
+    if isinstance(source, (str, Path)):
+        data = Path(source).read_bytes()
+    elif isinstance(source, bytes):
+        data = source
+    else:
+        data = source.read()
+
+    samples = None
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        samples = _decode_wav(data, config.sample_rate)
+    if samples is None:
+        samples = _decode_container(data, config.sample_rate)
+
+    if config.normalize:
+        normalize(samples)
+    return samples
+
+
+def _decode_wav(data: bytes, sample_rate: int) -> np.ndarray | None:
+    """Decode integer PCM WAV without a codec; returns None for other encodings."""
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        # e.g. IEEE float WAV, which the wave module rejects; PyAV handles it
+        return None
+    if width not in PCM_DTYPES:
+        return None
+
+    # View the frame bytes as integers without copying, then convert once
+    pcm = np.frombuffer(frames, dtype=PCM_DTYPES[width])
+    if channels > 1:
+        pcm = pcm[: len(pcm) - len(pcm) % channels].reshape(-1, channels)
+        samples = pcm.mean(axis=1, dtype=np.float32)
+    else:
+        samples = pcm.astype(np.float32)
+
+    if width == 1:
+        samples -= 128.0
+        samples *= 1 / 128.0
+    else:
+        samples *= 1 / float(2 ** (8 * width - 1))
+    return resample(samples, rate, sample_rate)
+
+
+def _decode_container(data: bytes, sample_rate: int) -> np.ndarray:
+    if av is None:
+        raise ImportError("PyAV is not installed. Please install faster-whisper, which depends on it")
+
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+    chunks = []
+    with av.open(io.BytesIO(data), mode="r", metadata_errors="ignore") as container:
+        for frame in container.decode(audio=0):
+            # Packed mono float frames come out as a (1, n) array; keep the row view
+            chunks.extend(out.to_ndarray()[0] for out in resampler.resample(frame))
+        chunks.extend(out.to_ndarray()[0] for out in resampler.resample(None))
+
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(chunks)
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Vectorized resampling of a mono float32 signal.
+
+    Integer downsampling ratios (48 kHz or 32 kHz to 16 kHz) average each group
+    of input samples, which doubles as a simple anti-aliasing filter. Other
+    ratios use linear interpolation.
+    """
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+
+    if source_rate > target_rate and source_rate % target_rate == 0:
+        factor = source_rate // target_rate
+        usable = len(samples) - len(samples) % factor
+        return samples[:usable].reshape(-1, factor).mean(axis=1, dtype=np.float32)
+
+    length = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(length, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def normalize(samples: np.ndarray) -> np.ndarray:
+    """Scale `samples` in place so the peak sits at -1 dBFS."""
+    if len(samples) == 0:
+        return samples
+    # max/min avoid materializing np.abs(samples)
+    peak = max(float(samples.max()), -float(samples.min()))
+    if peak > SILENCE_PEAK:
+        samples *= NORMALIZE_PEAK / peak
+    return samples
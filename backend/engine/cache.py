@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from backend.config.models import ResultCacheConfig
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts: bytes | str) -> str:
+    """Hash the given parts into a stable, content-addressed cache key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for JSON-serialisable results.
+
+    The memory tier is an LRU bounded by `max_entries`. The optional disk tier
+    stores one JSON file per key under `directory` and evicts the least
+    recently used files once their total size exceeds `max_disk_mb`. Entries
+    may expire after `ttl_seconds`. All methods are thread-safe; async callers
+    use `get_async`/`put_async`, which move disk access off the event loop.
+    """
+
+    def __init__(self, config: ResultCacheConfig):
+        self.max_entries = config.max_entries
+        self.ttl_seconds = config.ttl_seconds
+        self.directory = config.directory
+        self.max_disk_bytes = int(config.max_disk_mb * 1024 * 1024)
+        self._memory: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.directory.glob("*.json"))
+
+    def _expiry(self) -> float | None:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+        value = self._get_disk(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    async def get_async(self, key: str) -> Any | None:
+        # The memory tier answers in microseconds; only the disk tier needs a thread
+        if self.directory is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    def _get_disk(self, key: str, now: float) -> Any | None:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at <= now:
+            self._remove_file(path)
+            return None
+
+        # Touch so size-based eviction drops the least recently used files first
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted or replaced since it was read; count it as a miss
+            return None
+        self._put_memory(key, expires_at, entry["value"])
+        return entry["value"]
+
+    def put(self, key: str, value: Any):
+        expires_at = self._expiry()
+        self._put_memory(key, expires_at, value)
+
+        if self.directory is None:
+            return
+        path = self._path(key)
+        data = json.dumps({"expires_at": expires_at, "value": value})
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            previous = path.stat().st_size if path.exists() else 0
+            tmp.write_text(data, encoding="utf-8")
+            tmp.replace(path)
+            with self._lock:
+                self._disk_bytes += len(data.encode()) - previous
+            self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path}: {e}")
+
+    async def put_async(self, key: str, value: Any):
+        if self.directory is None:
+            self.put(key, value)
+        else:
+            await asyncio.to_thread(self.put, key, value)
+
+    def _put_memory(self, key: str, expires_at: float | None, value: Any):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _remove_file(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
+
+    def _evict_disk(self):
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            self._remove_file(path)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                self._remove_file(path)
@@ -0,0 +1,62 @@
+import re
+
+# Blank lines between paragraphs
+_PARAGRAPHS = re.compile(r"\n\s*\n")
+# Whitespace after a sentence's closing punctuation (and any closing quote)
+_SENTENCES = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"')\]]))\s+")
+
+
+def estimate_tokens(text: str, chars_per_token: float) -> int:
+    """Rough token count; close enough for budgeting without a tokenizer."""
+    return int(len(text) / chars_per_token) + 1
+
+
+def split_text(text: str, max_tokens: int, chars_per_token: float = 4.0) -> list[str]:
+    """
+    Split `text` into chunks of at most about `max_tokens` tokens.
+
+    Chunks break between paragraphs where possible, then between sentences,
+    and only split a sentence (between words) when it alone is over budget.
+    Consecutive pieces are packed into each chunk up to the budget.
+    """
+    max_chars = max(1, int(max_tokens * chars_per_token))
+    chunks: list[str] = []
+    current = ""
+    for piece, separator in _pieces(text.strip(), max_chars):
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _pieces(text: str, max_chars: int):
+    """Yield (piece, separator to join it to the previous one), each piece under `max_chars`."""
+    for paragraph in _PARAGRAPHS.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            yield paragraph, "\n\n"
+            continue
+        separator = "\n\n"
+        for sentence in _SENTENCES.split(paragraph):
+            if len(sentence) <= max_chars:
+                yield sentence, separator
+            else:
+                yield from _words(sentence, max_chars, separator)
+            separator = " "
+
+
+def _words(sentence: str, max_chars: int, separator: str):
+    current = ""
+    for word in sentence.split():
+        # A single word over budget goes in a chunk of its own
+        if current and len(current) + 1 + len(word) > max_chars:
+            yield current, separator
+            current, separator = "", " "
+        current = f"{current} {word}" if current else word
+    if current:
+        yield current, separator
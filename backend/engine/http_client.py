@@ -0,0 +1,102 @@
+import asyncio
+import logging
+
+import httpx
+
+from backend import metrics
+from backend.config.models import HTTPConfig
+
+# HTTP/2 needs the optional h2 package; without it connections use HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientManager:
+    """
+    One pooled `httpx.AsyncClient` shared by every LLM provider client.
+
+    The SDK clients are built on top of it, so connections to a provider are
+    kept alive and reused across refinements instead of paying a TCP and TLS
+    handshake each time. HTTP/2 is negotiated per connection, so plain-HTTP
+    Ollama keeps using HTTP/1.1. Per-provider timeouts come from `timeout()`
+    and are passed to the SDK clients, which apply them per request.
+
+    Closing the manager closes the pool; the next `client` access opens a new
+    one.
+    """
+
+    def __init__(self, config: HTTPConfig, transport: httpx.AsyncBaseTransport | None = None):
+        self.config = config
+        # Replaces the network transport (e.g. httpx.MockTransport)
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        metrics.LLM_HTTP_CONNECTIONS.set_function(self._connection_counts)
+
+    @property
+    def http2(self) -> bool:
+        return self.config.http2 and HTTP2_AVAILABLE
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry,
+            )
+            self._client = httpx.AsyncClient(
+                limits=limits,
+                http2=self.http2,
+                # The SDK clients send their own per-provider timeout with each request
+                timeout=self.timeout(60.0),
+                transport=self._transport,
+                event_hooks={"request": [self._on_request], "response": [self._on_response]},
+            )
+        return self._client
+
+    def timeout(self, seconds: float) -> httpx.Timeout:
+        return httpx.Timeout(seconds, connect=self.config.connect_timeout)
+
+    async def warm_up(self, urls: list[str]):
+        """Open a kept-alive connection to each URL so the first refinement skips the handshake."""
+        async def touch(url: str):
+            try:
+                await self.client.head(url, timeout=self.timeout(self.config.connect_timeout))
+                logger.info(f"Warmed up connection to {url}")
+            except httpx.HTTPError as e:
+                logger.warning(f"Could not warm up connection to {url}: {e}")
+
+        await asyncio.gather(*(touch(url) for url in urls))
+
+    def stats(self) -> dict:
+        counts = {labels["state"]: value for labels, value in self._connection_counts()}
+        return {"http2": self.http2, "connections": counts}
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _connection_counts(self) -> list[tuple[dict[str, str], float]]:
+        # httpx doesn't expose its pool; read httpcore's when it's there
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return [({"state": "active"}, len(connections) - idle), ({"state": "idle"}, idle)]
+
+    async def _on_request(self, request: httpx.Request):
+        host = request.url.host
+
+        async def trace(event: str, _info: dict):
+            if event == "connection.connect_tcp.complete":
+                metrics.LLM_HTTP_CONNECTS_TOTAL.inc(host=host)
+
+        request.extensions["trace"] = trace
+
+    async def _on_response(self, response: httpx.Response):
+        metrics.LLM_HTTP_REQUESTS_TOTAL.inc(host=response.request.url.host, http_version=response.http_version)
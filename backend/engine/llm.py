@@ -1,11 +1,21 @@
 import asyncio
+import json
 import logging
 import os
+import time
+from collections.abc import AsyncIterator
 
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from pydantic import BaseModel
 
+from backend import metrics
 from backend.config import Settings
 
+from .cache import ResultCache, make_key
+from .chunking import split_text
+from .http_client import HTTPClientManager
+from .router import ProviderRouter, Route
+from .templates import TemplateRegistry
+
 # Import clients conditionally to avoid hard dependencies if not used
 try:
     from anthropic import AsyncAnthropic
@@ -20,21 +30,83 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+ANTHROPIC_BASE_URL = "https://api.anthropic.com"
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+class RefineResult(BaseModel):
+    text: str
+    provider: str
+    model: str
+    # True when served from the response cache instead of the provider
+    cached: bool = False
+    # Providers tried, retries and fallback/hedging; None for cache hits
+    route: Route | None = None
+    # Token counts reported by the provider, including cached_input_tokens
+    # when part of the prompt was served from the provider's prompt cache
+    usage: dict[str, int] = {}
+
+class ChunkedRefineResult(BaseModel):
+    text: str
+    # Provider and model of the last call (the reduce step, if any)
+    provider: str
+    model: str
+    # Chunks the input was split into, and how many came from the cache
+    chunks: int
+    cached_chunks: int = 0
+    # Template that combined the chunk outputs, if any
+    reduce_template: str | None = None
+    # Reduce rounds run (the last one sees every remaining output)
+    reduce_rounds: int = 0
+    # Summed over every map and reduce call
+    usage: dict[str, int] = {}
+
+def _token_counts(**counts) -> dict[str, int]:
+    # Fields a provider (or SDK version) leaves out come back as None
+    return {name: value for name, value in counts.items() if isinstance(value, int)}
+
+def _anthropic_usage(usage) -> dict[str, int]:
+    """Anthropic counts cache reads and writes apart from input_tokens; fold them into the total."""
+    counts = _token_counts(
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        cached_input_tokens=getattr(usage, "cache_read_input_tokens", None),
+        cache_write_input_tokens=getattr(usage, "cache_creation_input_tokens", None),
+    )
+    if "input_tokens" in counts:
+        counts["input_tokens"] += counts.get("cached_input_tokens", 0) + counts.get("cache_write_input_tokens", 0)
+    return counts
+
+def _openai_usage(usage) -> dict[str, int]:
+    return _token_counts(
+        input_tokens=usage.prompt_tokens,
+        output_tokens=usage.completion_tokens,
+        cached_input_tokens=getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None),
+    )
+
+def _ollama_usage(response: dict) -> dict[str, int]:
+    # prompt_eval_count only covers tokens Ollama had to evaluate, so a
+    # reused prefix shows up as a smaller input count. There is no total
+    # prompt count to compare it with, hence no cached_input_tokens.
+    return {
+        "input_tokens": response.get("prompt_eval_count", 0),
+        "output_tokens": response.get("eval_count", 0),
+    }
+
 class LLMEngine:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.templates_dir = settings.templates.directory
-
-        # Ensure templates dir exists
-        if not self.templates_dir.exists():
-            logger.warning(f"Templates directory not found: {self.templates_dir}")
-            self.env = None
-        else:
-            self.env = Environment(loader=FileSystemLoader(self.templates_dir))
+        # Every template compiled up front; see TemplateRegistry.watch
+        self.templates = TemplateRegistry(settings.templates)
 
         self.anthropic_client = None
         self.openai_client = None
-        self.ollama_client = None
+        # Connection pool shared by the provider clients and Ollama requests
+        self.http = HTTPClientManager(settings.llm.http)
+        self.router = ProviderRouter(settings.llm)
+
+        cache_config = settings.cache.llm
+        self.cache = ResultCache(cache_config) if cache_config.enabled else None
 
     def _get_anthropic_client(self):
         if not AsyncAnthropic:
@@ -43,7 +115,13 @@ class LLMEngine:
             api_key = os.getenv("ANTHROPIC_API_KEY")
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-            self.anthropic_client = AsyncAnthropic(api_key=api_key)
+            self.anthropic_client = AsyncAnthropic(
+                api_key=api_key,
+                http_client=self.http.client,
+                timeout=self.http.timeout(self.settings.llm.anthropic.timeout),
+                # ProviderRouter retries, with fallback to other providers
+                max_retries=0
+            )
         return self.anthropic_client
 
     def _get_openai_client(self):
@@ -53,91 +131,534 @@ class LLMEngine:
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY environment variable not set")
-            self.openai_client = AsyncOpenAI(api_key=api_key)
+            self.openai_client = AsyncOpenAI(
+                api_key=api_key,
+                http_client=self.http.client,
+                timeout=self.http.timeout(self.settings.llm.openai.timeout),
+                # ProviderRouter retries, with fallback to other providers
+                max_retries=0
+            )
         return self.openai_client
 
-    def _get_ollama_client(self):
-        # Ollama typically uses OpenAI compatible API or raw HTTP
-        # For simplicity, we'll use OpenAI client pointing to Ollama base_url
-        if not AsyncOpenAI:
-            raise ImportError("openai package not installed (required for Ollama wrapper)")
-        if not self.ollama_client:
-            base_url = self.settings.llm.ollama.base_url
-            self.ollama_client = AsyncOpenAI(
-                base_url=f"{base_url}/v1",
-                api_key="ollama" # required but ignored
-            )
-        return self.ollama_client
+    async def warm_up(self):
+        """Open pooled connections to every configured provider that can be used."""
+        urls = []
+        llm = self.settings.llm
+        if llm.anthropic is not None and os.getenv("ANTHROPIC_API_KEY"):
+            urls.append(os.getenv("ANTHROPIC_BASE_URL", ANTHROPIC_BASE_URL))
+        if llm.openai is not None and os.getenv("OPENAI_API_KEY"):
+            urls.append(os.getenv("OPENAI_BASE_URL", OPENAI_BASE_URL))
+        if llm.ollama is not None:
+            urls.append(llm.ollama.base_url)
+        await self.http.warm_up(urls)
+
+    async def aclose(self):
+        """Close the provider clients and their shared connection pool."""
+        self.anthropic_client = None
+        self.openai_client = None
+        await self.http.aclose()
 
     def render_template(self, template_name: str, **kwargs) -> str:
-        if not self.env:
-            raise FileNotFoundError("Templates directory not configured or missing")
+        return self.templates.render(template_name, **kwargs)
+
+    def template_digest(self, template_name: str) -> str:
+        """
+        Hash of a template file's contents. Part of every response cache key,
+        so editing a template invalidates the responses it produced.
+        """
+        return self.templates.digest(template_name)
+
+    def _render_prompt(self, template_name: str, text: str) -> tuple[str, str, str]:
+        """Render a template; return the prompt, template digest and cacheable static prefix."""
+        compiled = self.templates.get(template_name)
+        prompt = compiled.template.render(text=text)
+        return prompt, compiled.info.sha256, self._static_prefix(prompt, compiled.prefix)
 
-        # Add .j2 extension if missing
-        if not template_name.endswith(".j2"):
-            template_name += ".j2"
+    def _static_prefix(self, prompt: str, prefix: str) -> str:
+        """
+        The part of `prompt` worth sending as a cached system block, or "".
+
+        That's the template's literal text before its first tag, provided it
+        is long enough to be worth caching and something follows it.
+        """
+        config = self.settings.llm.prompt_cache
+        if (
+            config.enabled
+            and len(prefix) >= config.min_prefix_chars
+            and prompt.startswith(prefix)
+            and prompt[len(prefix):].strip()
+        ):
+            return prefix
+        return ""
 
+    def _template_label(self, template_name: str) -> str:
+        """Metrics label for a template; names that don't resolve share one series."""
         try:
-            template = self.env.get_template(template_name)
-            return template.render(**kwargs)
-        except TemplateNotFound as e:
-            raise FileNotFoundError(f"Template '{template_name}' not found in {self.templates_dir}") from e
-        except TemplateNotFound:
-            raise FileNotFoundError(f"Template '{template_name}' not found in {self.templates_dir}") from None
+            return self.templates.get(template_name).info.name
+        except FileNotFoundError:
+            return "unknown"
 
-    async def refine_text(self, text: str, template_name: str, provider: str | None = None) -> str:
+    def _model_params(self, provider: str) -> tuple[str, int | None]:
+        if provider == "anthropic":
+            return self.settings.llm.anthropic.model, self.settings.llm.anthropic.max_tokens
+        elif provider == "openai":
+            return self.settings.llm.openai.model, self.settings.llm.openai.max_tokens
+        elif provider == "ollama":
+            # Ollama might ignore max_tokens or use options
+            return self.settings.llm.ollama.model, None
+        else:
+            raise ValueError(f"Unknown provider: {provider}")
+
+    async def refine(self, text: str, template_name: str, provider: str | None = None) -> RefineResult:
         """
         Refine text using an LLM and a prompt template.
-        """
-        # Render prompt
-        prompt = await asyncio.to_thread(self.render_template, template_name, text=text)
 
+        Responses are cached by rendered prompt, template digest, provider,
+        model and max_tokens.
+        """
         # Determine provider
         if not provider:
             provider = self.settings.llm.default_provider
 
+        # Render prompt
+        with metrics.timed(
+            metrics.REFINE_STAGE_SECONDS,
+            stage="template_render",
+            provider=provider,
+            template=self._template_label(template_name)
+        ):
+            prompt, digest, static = self._render_prompt(template_name, text)
+        return await self._refine_prompt(prompt, digest, static, template_name, provider)
+
+    async def refine_batch(
+        self,
+        text: str,
+        refinements: list[tuple[str, str | None]]
+    ) -> AsyncIterator[dict]:
+        """
+        Refine `text` with several (template, provider) pairs concurrently.
+
+        Each template is rendered once however many providers use it. Results
+        are yielded as they finish, tagged with their index in
+        `refinements`; a failed refinement yields an `error` instead of
+        stopping the others. Provider concurrency limits still apply.
+        """
+        started = time.perf_counter()
+        prompts: dict[str, tuple[str, str, str] | Exception] = {}
+        for template, _ in refinements:
+            if template not in prompts:
+                try:
+                    prompts[template] = self._render_prompt(template, text)
+                except Exception as e:
+                    prompts[template] = e
+
+        async def run(index: int, template: str, provider: str | None) -> dict:
+            provider = provider or self.settings.llm.default_provider
+            item = {"index": index, "template": template, "provider": provider}
+            try:
+                prompt = prompts[template]
+                if isinstance(prompt, Exception):
+                    raise prompt
+                result = await self._refine_prompt(*prompt, template, provider)
+                item.update(result.model_dump())
+            except Exception as e:
+                logger.error(f"Batch refinement with '{template}' ({provider}) failed: {e}")
+                item["error"] = str(e)
+            item["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return item
+
+        tasks = [
+            asyncio.create_task(run(index, template, provider))
+            for index, (template, provider) in enumerate(refinements)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def refine_chunked(
+        self,
+        text: str,
+        template_name: str,
+        provider: str | None = None,
+        reduce_template: str | None = None
+    ) -> ChunkedRefineResult:
+        """
+        Refine a text too long for one prompt, map-reduce style.
+
+        The text is split on paragraph and sentence boundaries into chunks of
+        about `[llm.chunking] chunk_tokens`, and the chunks are refined
+        concurrently, so latency follows the slowest chunk rather than the
+        total length. Outputs are joined in order. With a reduce template
+        (`reduce_template`, else the one configured for `template_name`) the
+        outputs are then combined: in rounds over budget-sized groups while
+        that keeps shrinking them, then in one final call.
+        """
+        config = self.settings.llm.chunking
+        provider = provider or self.settings.llm.default_provider
+        if reduce_template is None:
+            reduce_template = config.reduce.get(template_name.removesuffix(".j2"))
+        chunks = split_text(text, config.chunk_tokens, config.chars_per_token)
+        if not chunks:
+            raise ValueError("Nothing to refine")
+        labels = {"provider": provider, "template": self._template_label(template_name)}
+
+        logger.info(f"Refining {len(chunks)} chunks with template '{template_name}' using provider '{provider}'")
+        with metrics.timed(metrics.REFINE_STAGE_SECONDS, stage="chunk_map", **labels):
+            results = await self._refine_chunks(chunks, template_name, provider)
+        cached_chunks = sum(result.cached for result in results)
+        outputs = [result.text for result in results]
+
+        rounds = 0
+        if reduce_template:
+            reduce_results = []
+            with metrics.timed(metrics.REFINE_STAGE_SECONDS, stage="chunk_reduce", **labels):
+                groups = split_text("\n\n".join(outputs), config.chunk_tokens, config.chars_per_token)
+                previous = len(chunks)
+                while 1 < len(groups) < previous:
+                    previous = len(groups)
+                    round_results = await self._refine_chunks(groups, reduce_template, provider)
+                    reduce_results.extend(round_results)
+                    rounds += 1
+                    outputs = [result.text for result in round_results]
+                    groups = split_text("\n\n".join(outputs), config.chunk_tokens, config.chars_per_token)
+                final = await self._refine_chunks(["\n\n".join(outputs)], reduce_template, provider)
+                reduce_results.extend(final)
+                rounds += 1
+                outputs = [final[0].text]
+            results.extend(reduce_results)
+
+        usage: dict[str, int] = {}
+        for result in results:
+            for name, count in result.usage.items():
+                usage[name] = usage.get(name, 0) + count
+        return ChunkedRefineResult(
+            text="\n\n".join(outputs),
+            provider=results[-1].provider,
+            model=results[-1].model,
+            chunks=len(chunks),
+            cached_chunks=cached_chunks,
+            reduce_template=reduce_template or None,
+            reduce_rounds=rounds,
+            usage=usage,
+        )
+
+    async def _refine_chunks(self, chunks: list[str], template_name: str, provider: str) -> list[RefineResult]:
+        """
+        Refine chunks concurrently; results in chunk order. The first failure
+        cancels the rest.
+
+        At most the provider's `max_concurrency` chunks are in flight, so a
+        chunk's router timeout doesn't start while it waits behind the others.
+        """
+        prompts = [self._render_prompt(template_name, chunk) for chunk in chunks]
+        limit = asyncio.Semaphore(self.router.concurrency(provider))
+
+        async def refine(prompt: tuple[str, str, str]) -> RefineResult:
+            async with limit:
+                return await self._refine_prompt(*prompt, template_name, provider)
+
+        tasks = [asyncio.create_task(refine(prompt)) for prompt in prompts]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _refine_prompt(
+        self,
+        prompt: str,
+        digest: str,
+        static: str,
+        template_name: str,
+        provider: str
+    ) -> RefineResult:
+        """Answer a rendered prompt from the cache or through the router."""
+        model, max_tokens = self._model_params(provider)
+        labels = {"provider": provider, "template": self._template_label(template_name)}
+
+        key = None
+        if self.cache is not None:
+            key = make_key(prompt, digest, provider, model, str(max_tokens))
+            hit = await self.cache.get_async(key)
+            if hit is not None:
+                logger.info(f"Refinement cache hit for template '{template_name}' ({provider})")
+                metrics.REFINEMENTS_TOTAL.inc(cached="true", **labels)
+                return RefineResult(text=hit, provider=provider, model=model, cached=True)
+
+        async def complete(candidate: str) -> tuple[str, dict[str, int]]:
+            # Hedged attempts run side by side, so each gets its own usage
+            usage: dict[str, int] = {}
+            text = await self._complete(candidate, *self._model_params(candidate), prompt, static, usage)
+            return text, usage
+
         logger.info(f"Refining text with template '{template_name}' using provider '{provider}'")
+        with metrics.timed(metrics.REFINE_STAGE_SECONDS, stage="llm_network", **labels):
+            (refined, usage), route = await self.router.run(provider, complete)
+        metrics.REFINEMENTS_TOTAL.inc(cached="false", **labels)
+        _count_input_tokens(route.provider, usage)
+
+        if route.fallback:
+            # Cache the answer under the provider that gave it
+            model, max_tokens = self._model_params(route.provider)
+            key = make_key(prompt, digest, route.provider, model, str(max_tokens)) if key is not None else None
+        if key is not None:
+            await self.cache.put_async(key, refined)
+        return RefineResult(text=refined, provider=route.provider, model=model, route=route, usage=usage)
+
+    async def refine_stream(
+        self,
+        text: str,
+        template_name: str,
+        provider: str | None = None
+    ) -> AsyncIterator[dict]:
+        """
+        Refine text and yield events as the provider produces tokens.
+
+        Yields {"type": "token", "text": ...} for every streamed fragment,
+        then one {"type": "done", ...} event with the full text, token usage
+        and timing (time to first token and total, in milliseconds). Cache
+        hits arrive as a single token event.
+        """
+        started = time.perf_counter()
+        if not provider:
+            provider = self.settings.llm.default_provider
+        model, max_tokens = self._model_params(provider)
+        labels = {"provider": provider, "template": self._template_label(template_name)}
+
+        with metrics.timed(metrics.REFINE_STAGE_SECONDS, stage="template_render", **labels):
+            prompt, digest, static = self._render_prompt(template_name, text)
+
+        key = None
+        cached = None
+        if self.cache is not None:
+            key = make_key(prompt, digest, provider, model, str(max_tokens))
+            cached = await self.cache.get_async(key)
+
+        usage: dict[str, int] = {}
+        first_token_ms = None
+        parts = []
+        route = None
+        if cached is not None:
+            logger.info(f"Refinement cache hit for template '{template_name}' ({provider})")
+            first_token_ms = (time.perf_counter() - started) * 1000
+            parts.append(cached)
+            yield {"type": "token", "text": cached}
+        else:
+            logger.info(f"Streaming refinement with template '{template_name}' using provider '{provider}'")
+            network_started = time.perf_counter()
+            route = Route(requested=provider, provider=provider)
+            fragments = self.router.stream(
+                provider,
+                lambda candidate: self._stream(candidate, *self._model_params(candidate), prompt, static, usage),
+                route
+            )
+            async for fragment in fragments:
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - started) * 1000
+                    metrics.observe(
+                        metrics.REFINE_STAGE_SECONDS,
+                        time.perf_counter() - network_started,
+                        stage="llm_first_token",
+                        **labels
+                    )
+                parts.append(fragment)
+                yield {"type": "token", "text": fragment}
+            metrics.observe(
+                metrics.REFINE_STAGE_SECONDS,
+                time.perf_counter() - network_started,
+                stage="llm_network",
+                **labels
+            )
+            _count_input_tokens(route.provider, usage)
+        metrics.REFINEMENTS_TOTAL.inc(cached=str(cached is not None).lower(), **labels)
+
+        refined = "".join(parts)
+        if route is not None and route.fallback:
+            model, max_tokens = self._model_params(route.provider)
+            key = make_key(prompt, digest, route.provider, model, str(max_tokens)) if key is not None else None
+        if key is not None and cached is None:
+            await self.cache.put_async(key, refined)
+
+        total_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Refinement streamed in {total_ms:.0f}ms (first token after {first_token_ms or 0:.0f}ms)")
+        yield {
+            "type": "done",
+            "text": refined,
+            "provider": route.provider if route is not None else provider,
+            "model": model,
+            "cached": cached is not None,
+            "route": route.model_dump() if route is not None else None,
+            "usage": usage,
+            "timing": {
+                "first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+                "total_ms": round(total_ms, 1),
+            },
+        }
+
+    async def refine_text(self, text: str, template_name: str, provider: str | None = None) -> str:
+        """
+        Refine text using an LLM and a prompt template.
+        """
+        result = await self.refine(text, template_name, provider)
+        return result.text
+
+    async def _complete(
+        self,
+        provider: str,
+        model: str,
+        max_tokens: int | None,
+        prompt: str,
+        static: str = "",
+        usage: dict[str, int] | None = None
+    ) -> str:
+        """
+        One non-streaming call to the provider, filling in `usage`.
+
+        A non-empty `static` prefix of `prompt` goes in a system block the
+        provider can cache, and the rest in the user message.
+        """
+        if usage is None:
+            usage = {}
+        messages = _messages(prompt, static)
 
         if provider == "anthropic":
             client = self._get_anthropic_client()
-            model = self.settings.llm.anthropic.model
-            max_tokens = self.settings.llm.anthropic.max_tokens
 
             response = await client.messages.create(
                 model=model,
                 max_tokens=max_tokens,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+                messages=messages,
+                **_anthropic_system(static)
             )
+            usage.update(_anthropic_usage(response.usage))
             return response.content[0].text
 
         elif provider == "openai":
             client = self._get_openai_client()
-            model = self.settings.llm.openai.model
-            max_tokens = self.settings.llm.openai.max_tokens
 
             response = await client.chat.completions.create(
                 model=model,
                 max_tokens=max_tokens,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+                messages=_with_system(messages, static)
             )
+            if response.usage:
+                usage.update(_openai_usage(response.usage))
             return response.choices[0].message.content
 
         elif provider == "ollama":
-            client = self._get_ollama_client()
-            model = self.settings.llm.ollama.model
-            # Ollama might ignore max_tokens or use options
+            response = await self.http.client.post(
+                self._ollama_url(),
+                json=self._ollama_request(model, _with_system(messages, static), stream=False),
+                timeout=self.http.timeout(self.settings.llm.ollama.timeout)
+            )
+            response.raise_for_status()
+            data = response.json()
+            usage.update(_ollama_usage(data))
+            return data["message"]["content"]
 
-            response = await client.chat.completions.create(
+        else:
+            raise ValueError(f"Unknown provider: {provider}")
+
+    async def _stream(
+        self,
+        provider: str,
+        model: str,
+        max_tokens: int | None,
+        prompt: str,
+        static: str,
+        usage: dict[str, int]
+    ) -> AsyncIterator[str]:
+        """Yield text fragments from the provider's streaming API, filling in `usage`."""
+        messages = _messages(prompt, static)
+
+        if provider == "anthropic":
+            client = self._get_anthropic_client()
+
+            async with client.messages.stream(
+                model=model,
+                max_tokens=max_tokens,
+                messages=messages,
+                **_anthropic_system(static)
+            ) as stream:
+                async for fragment in stream.text_stream:
+                    yield fragment
+                final = await stream.get_final_message()
+            usage.update(_anthropic_usage(final.usage))
+
+        elif provider == "openai":
+            client = self._get_openai_client()
+
+            stream = await client.chat.completions.create(
                 model=model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+                max_tokens=max_tokens,
+                messages=_with_system(messages, static),
+                stream=True,
+                stream_options={"include_usage": True}
             )
-            return response.choices[0].message.content
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.usage:
+                    usage.update(_openai_usage(chunk.usage))
+
+        elif provider == "ollama":
+            async with self.http.client.stream(
+                "POST",
+                self._ollama_url(),
+                json=self._ollama_request(model, _with_system(messages, static), stream=True),
+                timeout=self.http.timeout(self.settings.llm.ollama.timeout)
+            ) as response:
+                response.raise_for_status()
+                # One JSON object per line; the last has done=true and the counts
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise RuntimeError(f"Ollama: {chunk['error']}")
+                    content = chunk.get("message", {}).get("content")
+                    if content:
+                        yield content
+                    if chunk.get("done"):
+                        usage.update(_ollama_usage(chunk))
 
         else:
             raise ValueError(f"Unknown provider: {provider}")
+
+    def _ollama_url(self) -> str:
+        # The native API, since the OpenAI-compatible one has no keep_alive
+        return f"{self.settings.llm.ollama.base_url}/api/chat"
+
+    def _ollama_request(self, model: str, messages: list[dict], stream: bool) -> dict:
+        return {
+            "model": model,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": self.settings.llm.ollama.keep_alive,
+        }
+
+
+def _messages(prompt: str, static: str) -> list[dict]:
+    """The user message: everything after the static prefix."""
+    return [{"role": "user", "content": prompt[len(static):]}]
+
+def _with_system(messages: list[dict], static: str) -> list[dict]:
+    if not static:
+        return messages
+    return [{"role": "system", "content": static}, *messages]
+
+def _anthropic_system(static: str) -> dict:
+    if not static:
+        return {}
+    return {"system": [{"type": "text", "text": static, "cache_control": {"type": "ephemeral"}}]}
+
+def _count_input_tokens(provider: str, usage: dict[str, int]):
+    if "input_tokens" not in usage:
+        return
+    cached = usage.get("cached_input_tokens", 0)
+    metrics.LLM_INPUT_TOKENS_TOTAL.inc(usage["input_tokens"] - cached, provider=provider, cached="false")
+    if cached:
+        metrics.LLM_INPUT_TOKENS_TOTAL.inc(cached, provider=provider, cached="true")
@@ -0,0 +1,270 @@
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import threading
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from backend.config import Settings
+from backend.event_bus import EventBus
+
+from .cache import ResultCache, make_key
+from .transcriber import Detail, Transcriber, TranscriptionBatcher, TranscriptionResult
+
+logger = logging.getLogger(__name__)
+
+# Per-process transcriber used when the pool runs in "process" mode
+_worker_transcriber: Transcriber | None = None
+
+
+def _init_worker(settings: Settings):
+    global _worker_transcriber
+    _worker_transcriber = Transcriber(settings)
+    if settings.transcription.warmup:
+        _worker_transcriber.warm_up()
+
+
+def _worker_models() -> tuple[int, list[str]]:
+    return os.getpid(), _worker_transcriber.registry.loaded
+
+
+def _run_in_worker(method: str, *args: Any) -> tuple[Any, tuple[int, list[str]]]:
+    # The worker's loaded models ride along so the parent can report them
+    return getattr(_worker_transcriber, method)(*args), _worker_models()
+
+
+def _list_in_worker(method: str, *args: Any) -> tuple[list, tuple[int, list[str]]]:
+    # Generators can't cross the process boundary; send back everything at once
+    return list(getattr(_worker_transcriber, method)(*args)), _worker_models()
+
+# Queued by a streaming worker when its generator is exhausted
+_END = object()
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, queue_depth: int):
+        super().__init__(f"Transcription queue is full ({queue_depth} waiting)")
+        self.queue_depth = queue_depth
+
+
+class TranscriptionPool:
+    """
+    Dedicated executor for transcription work with a bounded wait queue.
+
+    In "thread" mode the workers share one Transcriber (and one CTranslate2
+    model created with num_workers = count); in "process" mode each worker
+    process loads its own model. Admission is decided on the event loop, so no
+    locking is needed around the pending counter. A slot is released when the
+    work finishes on its worker, not when the caller stops waiting, so
+    cancelled requests can't pile up behind the admission limit. With
+    batching enabled, concurrent uploads are grouped by a TranscriptionBatcher
+    and run as one worker job, but each upload holds its own slot. Results are cached by audio content and
+    transcription settings, so a re-sent upload never reaches a worker.
+    """
+
+    def __init__(self, settings: Settings, transcriber: Transcriber):
+        self.config = settings.workers
+        self.transcriber = transcriber
+        self.default_model = settings.transcription.model
+        # True once a model has been loaded and has completed an inference
+        self.ready = False
+        self._pending = 0
+        # Process mode: models loaded in each worker, by pid, as last reported
+        self._worker_loaded: dict[int, list[str]] = {}
+
+        if self.config.mode == "process":
+            self.executor: Executor = ProcessPoolExecutor(
+                max_workers=self.config.count,
+                # CTranslate2 starts threads; never fork a process that has them
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(settings,),
+            )
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.config.count,
+                thread_name_prefix="transcribe",
+            )
+        self.batcher = None
+        if settings.batching.enabled:
+            self.batcher = TranscriptionBatcher(
+                settings.batching,
+                # Every upload in the batch already holds a slot
+                lambda audios: self._execute(len(audios), "transcribe_batch", audios),
+            )
+
+        cache_config = settings.cache.transcription
+        self.cache = ResultCache(cache_config) if cache_config.enabled else None
+
+        logger.info(f"Transcription pool: {self.config.count} {self.config.mode} worker(s), queue {self.config.max_queue}")
+
+    @property
+    def loaded_models(self) -> list[str]:
+        """Models resident in at least one worker."""
+        if self.config.mode != "process":
+            return self.transcriber.registry.loaded
+        # The parent process never loads a model; use what the workers reported
+        return list(dict.fromkeys(name for names in self._worker_loaded.values() for name in names))
+
+    def _record_worker(self, report: tuple[int, list[str]]):
+        pid, names = report
+        self._worker_loaded[pid] = names
+
+    @property
+    def capacity(self) -> int:
+        return self.config.count + self.config.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._pending - self.config.count)
+
+    async def submit(self, method: str, *args: Any) -> Any:
+        """Run a Transcriber method on a worker, or raise PoolSaturatedError."""
+        self._reserve()
+        return await self._execute(1, method, *args)
+
+    def _reserve(self):
+        if self._pending >= self.capacity:
+            raise PoolSaturatedError(self.queue_depth)
+        self._pending += 1
+        self._publish_queue()
+
+    def _release(self, slots: int = 1):
+        self._pending -= slots
+        self._publish_queue()
+
+    def _start(self, slots: int, fn: Callable, *args: Any) -> Future:
+        """Start `fn` on the executor; `slots` are released once it is done or cancelled."""
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._release(slots)
+            raise
+
+        def done(_):
+            # If the loop has closed there is nothing left to admit
+            with contextlib.suppress(RuntimeError):
+                loop.call_soon_threadsafe(self._release, slots)
+
+        future.add_done_callback(done)
+        return future
+
+    async def _execute(self, slots: int, method: str, *args: Any) -> Any:
+        # A cancelled caller cancels the job only if it hasn't started yet
+        if self.config.mode == "process":
+            result, report = await asyncio.wrap_future(self._start(slots, _run_in_worker, method, *args))
+            self._record_worker(report)
+            return result
+        return await asyncio.wrap_future(self._start(slots, getattr(self.transcriber, method), *args))
+
+    async def stream(self, method: str, *args: Any) -> AsyncIterator[Any]:
+        """
+        Run a Transcriber generator method on a worker and yield its items as
+        they are produced, or raise PoolSaturatedError.
+
+        The worker slot is held until the generator finishes; if the caller
+        stops early, the worker stops at the next item. In "process" mode the
+        items arrive together once the worker is done.
+        """
+        self._reserve()
+        loop = asyncio.get_running_loop()
+        items: asyncio.Queue = asyncio.Queue()
+        stopped = threading.Event()
+
+        def produce():
+            try:
+                for item in getattr(self.transcriber, method)(*args):
+                    if stopped.is_set():
+                        return
+                    loop.call_soon_threadsafe(items.put_nowait, item)
+            except Exception as e:
+                loop.call_soon_threadsafe(items.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(items.put_nowait, _END)
+
+        if self.config.mode == "process":
+            future = self._start(1, _list_in_worker, method, *args)
+        else:
+            future = self._start(1, produce)
+        try:
+            if self.config.mode == "process":
+                results, report = await asyncio.wrap_future(future)
+                self._record_worker(report)
+                for item in results:
+                    yield item
+                return
+            while (item := await items.get()) is not _END:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+
+    def _publish_queue(self):
+        # Runs on the event loop, including from executor done-callbacks
+        EventBus.publish_nowait("queue_depth", {"in_flight": self.in_flight, "queue_depth": self.queue_depth})
+
+    async def _mark_ready(self):
+        if not self.ready:
+            self.ready = True
+            await EventBus.publish_async("model_ready", {"ready": True, "models": self.loaded_models})
+
+    async def transcribe(self, audio: bytes, model: str | None = None, detail: Detail = "text") -> TranscriptionResult:
+        """
+        Transcribe uploaded audio bytes, batching with concurrent uploads when
+        enabled. Requests for segment detail run on their own.
+        """
+        key = None
+        if self.cache is not None:
+            fingerprint = self.transcriber.cache_fingerprint(model)
+            # Plain-text entries keep their existing keys
+            key = make_key(audio, fingerprint) if detail == "text" else make_key(audio, fingerprint, detail)
+            hit = await self.cache.get_async(key)
+            if hit is not None:
+                logger.info(f"Transcription cache hit for {len(audio)} bytes")
+                return TranscriptionResult(**hit, cached=True)
+
+        if self.batcher is None or model not in (None, self.default_model) or detail != "text":
+            result = await self.submit("transcribe", audio, model, detail)
+        else:
+            # Released with the batch's worker job, even if this caller gives up
+            self._reserve()
+            result = await self.batcher.submit(audio)
+        await self._mark_ready()
+
+        if key is not None:
+            await self.cache.put_async(key, result.model_dump(exclude={"cached", "timings"}))
+        return result
+
+    async def warm_up(self):
+        """Load and exercise the configured models on every worker."""
+        try:
+            if self.config.mode == "process":
+                # Worker processes warm themselves up in their initializer;
+                # one job per worker makes the executor start all of them.
+                loop = asyncio.get_running_loop()
+                reports = await asyncio.gather(*(
+                    loop.run_in_executor(self.executor, _worker_models) for _ in range(self.config.count)
+                ))
+                for report in reports:
+                    self._record_worker(report)
+            else:
+                await self.submit("warm_up")
+            await self._mark_ready()
+            logger.info("Transcription models warmed up")
+        except Exception as e:
+            logger.error(f"Model warm-up failed: {e}")
+            await EventBus.publish_async("model_error", {"detail": str(e)})
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,94 @@
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Approximate resident size of CTranslate2 Whisper weights at float16, in MB.
+# int8 roughly halves this and float32 doubles it.
+MODEL_SIZES_MB = {
+    "tiny": 75,
+    "base": 145,
+    "small": 485,
+    "medium": 1530,
+    "large-v1": 3090,
+    "large-v2": 3090,
+    "large-v3": 3090,
+    "large-v3-turbo": 1620,
+    "turbo": 1620,
+    "distil-small.en": 335,
+    "distil-medium.en": 790,
+    "distil-large-v2": 1510,
+    "distil-large-v3": 1510,
+}
+COMPUTE_TYPE_SCALE = {"int8": 0.5, "float16": 1.0, "float32": 2.0}
+DEFAULT_SIZE_MB = 500
+
+
+def estimate_model_mb(name: str, compute_type: str) -> float:
+    """Estimate the memory a model will occupy once loaded."""
+    base = MODEL_SIZES_MB.get(name.removesuffix(".en"), MODEL_SIZES_MB.get(name, DEFAULT_SIZE_MB))
+    return base * COMPUTE_TYPE_SCALE.get(compute_type, 1.0)
+
+
+class ModelRegistry:
+    """
+    Keeps loaded Whisper models resident, keyed by model name.
+
+    Models are created on first use by `loader`. When `memory_budget_mb` is
+    set, the least recently used models are evicted until the next one fits;
+    the model being requested is never evicted, so a single model larger than
+    the budget still loads. Loading happens outside the registry lock, with
+    one lock per model name, so a slow download of one model doesn't block
+    requests for models that are already resident.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], compute_type: str, memory_budget_mb: int = 0):
+        self._loader = loader
+        self.compute_type = compute_type
+        self.memory_budget_mb = memory_budget_mb
+        self._models: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: dict[str, threading.Lock] = {}
+
+    @property
+    def loaded(self) -> list[str]:
+        with self._lock:
+            return list(self._models)
+
+    @property
+    def resident_mb(self) -> float:
+        return sum(estimate_model_mb(name, self.compute_type) for name in self._models)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+            name_lock = self._loading.setdefault(name, threading.Lock())
+
+        # Concurrent requests for the same model wait for a single load
+        with name_lock:
+            with self._lock:
+                if name in self._models:
+                    self._models.move_to_end(name)
+                    return self._models[name]
+                self._evict_for(name)
+
+            model = self._loader(name)
+            with self._lock:
+                self._models[name] = model
+            return model
+
+    def _evict_for(self, name: str):
+        if not self.memory_budget_mb:
+            return
+        needed = estimate_model_mb(name, self.compute_type)
+        while self._models and self.resident_mb + needed > self.memory_budget_mb:
+            evicted, _ = self._models.popitem(last=False)
+            logger.info(f"Evicting Whisper model '{evicted}' to stay within {self.memory_budget_mb} MB")
@@ -0,0 +1,264 @@
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Literal, TypeVar
+
+import httpx
+from pydantic import BaseModel
+
+from backend import metrics
+from backend.config.models import LLMConfig
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Status codes worth another attempt at the same provider
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class Attempt(BaseModel):
+    provider: str
+    status: Literal["ok", "error", "timeout", "cancelled"]
+    duration_ms: float
+    error: str | None = None
+    # Started by hedging rather than after a failure
+    hedge: bool = False
+
+
+class Route(BaseModel):
+    requested: str
+    # Provider whose answer was used
+    provider: str
+    attempts: list[Attempt] = []
+    # Answered by a provider other than the requested one
+    fallback: bool = False
+    # A hedge request was started
+    hedged: bool = False
+
+
+class RoutingError(RuntimeError):
+    """Every provider in the chain failed."""
+
+    def __init__(self, route: Route):
+        last = route.attempts[-1]
+        super().__init__(f"{last.provider}: {last.error}")
+        self.route = route
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    # The anthropic and openai SDK errors carry the HTTP status; httpx's
+    # HTTPStatusError (raw Ollama requests) has it on the response
+    status = getattr(error, "status_code", None)
+    if status is None and isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS or status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+class ProviderRouter:
+    """
+    Sends LLM calls to a provider, with limits, retries, fallback and hedging.
+
+    Each provider has a semaphore of `max_concurrency` slots and a `timeout`
+    covering both the wait for a slot and the call itself. Transient failures
+    are retried with jittered exponential backoff; anything else, or running
+    out of retries, moves on to the next provider in `[llm.routing]
+    fallback`. With `hedge_after_seconds` set, the next provider is started
+    alongside a slow one and the first answer wins. Every attempt is
+    recorded in the returned `Route`.
+    """
+
+    def __init__(self, config: LLMConfig):
+        self.config = config
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def chain(self, provider: str) -> list[str]:
+        fallback = [
+            p for p in self.config.routing.fallback
+            if p != provider and getattr(self.config, p) is not None
+        ]
+        return [provider, *dict.fromkeys(fallback)]
+
+    def concurrency(self, provider: str) -> int:
+        """How many calls to `provider` may run at once."""
+        return self._provider_config(provider, "max_concurrency", 4)
+
+    def semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(self.concurrency(provider))
+        return self._semaphores[provider]
+
+    async def run(self, provider: str, call: Callable[[str], Awaitable[T]]) -> tuple[T, Route]:
+        """Run `call(provider)` along the fallback chain; return its result and the route taken."""
+        chain = self.chain(provider)
+        route = Route(requested=provider, provider=provider)
+        hedge_after = self.config.routing.hedge_after_seconds
+        tasks: dict[asyncio.Task, str] = {}
+        remaining = iter(chain)
+        error: Exception | None = None
+
+        def start(hedge: bool = False) -> str | None:
+            next_provider = next(remaining, None)
+            if next_provider is not None:
+                task = asyncio.create_task(self._call_with_retries(next_provider, call, route, hedge))
+                tasks[task] = next_provider
+            return next_provider
+
+        start()
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=hedge_after,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Nothing back yet: hedge with the next provider
+                    hedge = start(hedge=True)
+                    if hedge is not None:
+                        route.hedged = True
+                        logger.info(f"No answer from '{provider}' after {hedge_after}s; hedging with '{hedge}'")
+                    else:
+                        hedge_after = None
+                    continue
+                for task in done:
+                    served_by = tasks.pop(task)
+                    if task.exception() is None:
+                        route.provider = served_by
+                        route.fallback = served_by != provider
+                        return task.result(), route
+                    error = task.exception()
+                    logger.warning(f"Provider '{served_by}' failed: {route.attempts[-1].error}")
+                if not tasks:
+                    start()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        raise RoutingError(route) from error
+
+    async def stream(
+        self,
+        provider: str,
+        call: Callable[[str], AsyncIterator[str]],
+        route: Route
+    ) -> AsyncIterator[str]:
+        """
+        Like `run` for streaming calls, filling in `route` as it goes.
+
+        Retries and fallback only apply until the first fragment arrives;
+        after that a failure is raised to the caller. Streams aren't hedged.
+        """
+        routing = self.config.routing
+        error: Exception | None = None
+        for candidate in self.chain(provider):
+            timeout = self._provider_config(candidate, "timeout", 60.0)
+            for attempt in range(routing.retries + 1):
+                started = time.perf_counter()
+                fragments = call(candidate)
+                streaming = False
+                try:
+                    async with contextlib.AsyncExitStack() as stack:
+                        # The slot is held until the stream is finished
+                        first = await asyncio.wait_for(self._first_fragment(candidate, fragments, stack), timeout)
+                        streaming = True
+                        route.provider = candidate
+                        route.fallback = candidate != provider
+                        if first is not None:
+                            yield first
+                            async for fragment in fragments:
+                                yield fragment
+                    self._record(route, candidate, "ok", started)
+                    return
+                except asyncio.CancelledError:
+                    self._record(route, candidate, "cancelled", started)
+                    raise
+                except Exception as e:
+                    status = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                    self._record(route, candidate, status, started, e)
+                    with contextlib.suppress(Exception):
+                        await fragments.aclose()
+                    if streaming:
+                        raise
+                    error = e
+                    if attempt == routing.retries or not is_retryable(e):
+                        break
+                    await asyncio.sleep(self._backoff(attempt))
+            logger.warning(f"Provider '{candidate}' failed: {route.attempts[-1].error}")
+        raise RoutingError(route) from error
+
+    async def _call_with_retries(
+        self,
+        provider: str,
+        call: Callable[[str], Awaitable[T]],
+        route: Route,
+        hedge: bool
+    ) -> T:
+        routing = self.config.routing
+        timeout = self._provider_config(provider, "timeout", 60.0)
+        for attempt in range(routing.retries + 1):
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(self._call_limited(provider, call), timeout)
+            except asyncio.CancelledError:
+                self._record(route, provider, "cancelled", started, hedge=hedge)
+                raise
+            except Exception as e:
+                status = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                self._record(route, provider, status, started, e, hedge)
+                if attempt == routing.retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(attempt)
+                logger.info(f"Retrying '{provider}' in {delay:.2f}s after: {e}")
+                await asyncio.sleep(delay)
+            else:
+                self._record(route, provider, "ok", started, hedge=hedge)
+                return result
+
+    async def _call_limited(self, provider: str, call: Callable[[str], Awaitable[T]]) -> T:
+        async with self.semaphore(provider):
+            return await call(provider)
+
+    async def _first_fragment(
+        self,
+        provider: str,
+        fragments: AsyncIterator[str],
+        stack: contextlib.AsyncExitStack
+    ) -> str | None:
+        await stack.enter_async_context(self.semaphore(provider))
+        return await anext(fragments, None)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: random up to the capped exponential delay."""
+        routing = self.config.routing
+        return random.uniform(0, min(routing.backoff_max_seconds, routing.backoff_seconds * 2 ** attempt))
+
+    def _record(
+        self,
+        route: Route,
+        provider: str,
+        status: str,
+        started: float,
+        error: Exception | None = None,
+        hedge: bool = False
+    ):
+        route.attempts.append(Attempt(
+            provider=provider,
+            status=status,
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+            # TimeoutError has no message
+            error=(str(error) or type(error).__name__) if error is not None else None,
+            hedge=hedge,
+        ))
+        metrics.LLM_ATTEMPTS_TOTAL.inc(provider=provider, status=status)
+
+    def _provider_config(self, provider: str, field: str, default):
+        return getattr(getattr(self.config, provider, None), field, default)
@@ -0,0 +1,211 @@
+import io
+import logging
+import threading
+
+import numpy as np
+
+from backend.config.models import StreamingConfig
+
+from .transcriber import Transcriber
+
+try:
+    import av
+except ImportError:
+    av = None
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+class _ChunkReader(io.RawIOBase):
+    """Blocking, non-seekable file object fed with audio chunks as they arrive."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def feed(self, chunk: bytes):
+        with self._cond:
+            self._buffer.extend(chunk)
+            self._cond.notify()
+
+    def finish(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def readinto(self, b) -> int:
+        with self._cond:
+            while not self._buffer and not self._closed:
+                self._cond.wait()
+            n = min(len(b), len(self._buffer))
+            b[:n] = self._buffer[:n]
+            del self._buffer[:n]
+            return n
+
+
+class StreamingSession:
+    """
+    Incremental transcription of a growing recording.
+
+    Chunks produced by MediaRecorder are decoded on a background thread into a
+    16 kHz mono buffer. Each `step()` runs Whisper on the window that follows the
+    last committed segment; segments that end well before the window edge and
+    agree with the previous pass are committed as final, the rest is reported
+    as a partial hypothesis. Committed audio is dropped from the buffer, so
+    memory and per-step copying stay bounded by the window, not the recording.
+    """
+
+    def __init__(self, transcriber: Transcriber, config: StreamingConfig):
+        self.transcriber = transcriber
+        self.config = config
+
+        # Uncommitted audio; the first chunk starts at absolute sample _base
+        self._samples: list[np.ndarray] = []
+        self._base = 0
+        self._num_samples = 0
+        self._lock = threading.Lock()
+        self._reader = _ChunkReader()
+        self._decoder: threading.Thread | None = None
+        self._decode_error: Exception | None = None
+
+        self._committed = 0  # sample offset of the end of the last final segment
+        self._window_start = 0  # sample offset of the window handed out by next_window
+        self._processed = 0  # sample count seen by the last step
+        self._previous: list[str] = []
+        self._last_partial = ""
+        self.final_texts: list[str] = []
+
+    @property
+    def duration(self) -> float:
+        return self._num_samples / SAMPLE_RATE
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.final_texts).strip()
+
+    def feed(self, chunk: bytes):
+        """Queue an encoded audio chunk for decoding."""
+        if self._decoder is None:
+            if av is None:
+                raise ImportError("PyAV is not installed (it ships with faster-whisper)")
+            self._decoder = threading.Thread(target=self._decode, daemon=True)
+            self._decoder.start()
+        self._reader.feed(chunk)
+
+    def push_samples(self, samples: np.ndarray):
+        """Append already-decoded 16 kHz mono float32 samples."""
+        with self._lock:
+            self._samples.append(samples)
+            self._num_samples += len(samples)
+
+    def finish(self):
+        """Signal end of input and wait for the decoder to drain."""
+        self._reader.finish()
+        if self._decoder is not None:
+            self._decoder.join()
+        if self._decode_error is not None:
+            raise self._decode_error
+
+    def close(self):
+        """Release the decoder thread without waiting on it."""
+        self._reader.finish()
+
+    def _decode(self):
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+        try:
+            with av.open(self._reader, mode="r", metadata_errors="ignore") as container:
+                for frame in container.decode(audio=0):
+                    for resampled in resampler.resample(frame):
+                        self.push_samples(resampled.to_ndarray().reshape(-1))
+                for resampled in resampler.resample(None):
+                    self.push_samples(resampled.to_ndarray().reshape(-1))
+        except Exception as e:
+            logger.error(f"Streaming decode failed: {e}")
+            self._decode_error = e
+
+    def has_new_audio(self) -> bool:
+        return self._num_samples - self._processed >= self.config.step_seconds * SAMPLE_RATE
+
+    def _window(self) -> np.ndarray:
+        """The audio after the last committed segment, as one array; committed audio is released."""
+        with self._lock:
+            while self._samples and self._base + len(self._samples[0]) <= self._committed:
+                self._base += len(self._samples.pop(0))
+            if not self._samples:
+                self._base = self._num_samples
+                window = np.zeros(0, dtype=np.float32)
+            else:
+                audio = np.concatenate(self._samples) if len(self._samples) > 1 else self._samples[0]
+                start = max(self._committed - self._base, 0)
+                # Copy so the committed head isn't kept alive by the view
+                window = audio[start:].copy() if start else audio
+                self._samples = [window]
+                self._base += start
+            self._processed = self._base + len(window)
+        return window
+
+    def step(self, final: bool = False) -> list[dict]:
+        """Transcribe the uncommitted window and return the events to send."""
+        window = self.next_window()
+        segments = self.transcriber.transcribe_segments(window, beam_size=self.config.beam_size) if len(window) else []
+        return self.advance(window, segments, final)
+
+    def next_window(self) -> np.ndarray:
+        """
+        The audio to transcribe next. With `advance`, lets the caller run the
+        inference elsewhere (e.g. on a TranscriptionPool worker) instead of `step`.
+        """
+        window = self._window()
+        self._window_start = self._committed
+        return window
+
+    def advance(self, window: np.ndarray, raw_segments: list, final: bool = False) -> list[dict]:
+        """Commit stable segments of `window`'s transcription and return the events to send."""
+        offset = self._window_start / SAMPLE_RATE
+        window_end = offset + len(window) / SAMPLE_RATE
+        segments = [
+            (offset + seg.start, offset + seg.end, seg.text.strip())
+            for seg in raw_segments
+            if seg.text.strip()
+        ]
+
+        if final:
+            stable = len(segments)
+        else:
+            stable = 0
+            horizon = window_end - self.config.stability_margin
+            for i, (_, end, text) in enumerate(segments):
+                if end > horizon or i >= len(self._previous) or self._previous[i] != text:
+                    break
+                stable = i + 1
+            # Never let the window grow past its limit without committing something
+            if stable == 0 and len(window) >= self.config.window_seconds * SAMPLE_RATE:
+                stable = max(len(segments) - 1, 1) if segments else 0
+                if not segments:
+                    self._committed += len(window)
+
+        events = []
+        for start, end, text in segments[:stable]:
+            self.final_texts.append(text)
+            events.append({"type": "final", "text": text, "start": round(start, 2), "end": round(end, 2)})
+        if stable:
+            self._committed = min(int(segments[stable - 1][1] * SAMPLE_RATE), self._num_samples)
+
+        self._previous = [text for _, _, text in segments[stable:]]
+        partial = " ".join(text for _, _, text in segments[stable:])
+        if not final and partial != self._last_partial:
+            events.append({"type": "partial", "text": partial})
+        self._last_partial = partial
+
+        if final:
+            events.append({"type": "done", "text": self.text})
+        return events
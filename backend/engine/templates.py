@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import logging
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, Template, TemplateSyntaxError
+from pydantic import BaseModel
+
+from backend.config.models import TemplatesConfig
+from backend.event_bus import EventBus
+
+# Optional: inotify/FSEvents-backed watching instead of polling
+try:
+    from watchfiles import awatch
+except ImportError:
+    awatch = None
+
+logger = logging.getLogger(__name__)
+
+# Start of the first Jinja tag, comment or expression
+_FIRST_TAG = re.compile(r"\{[{%#]")
+
+
+class TemplateInfo(BaseModel):
+    name: str
+    # sha256 of the file contents; part of every response cache key
+    sha256: str
+    size: int
+    modified: datetime
+    # Length of the literal text before the first Jinja tag, which is the
+    # same in every prompt rendered from the template
+    prefix_chars: int
+
+
+class CompiledTemplate:
+    def __init__(self, template: Template, info: TemplateInfo, prefix: str, stamp: tuple[int, int]):
+        self.template = template
+        self.info = info
+        self.prefix = prefix
+        # (mtime_ns, size) the template was compiled from
+        self.stamp = stamp
+
+
+class TemplateRegistry:
+    """
+    Every `.j2` in the templates directory, compiled once and kept in memory.
+
+    Rendering is a dict lookup plus the compiled template's render call, so
+    it runs inline on the event loop. `watch()` keeps the registry in sync
+    with the directory, recompiling only files whose mtime or size changed
+    (via watchfiles when installed, else by polling). Until a watcher is
+    running, each lookup checks the file's stamp instead, so edits are still
+    seen when the registry is used outside the server.
+    """
+
+    def __init__(self, config: TemplatesConfig):
+        self.config = config
+        self.directory = config.directory
+        self.env = Environment(loader=FileSystemLoader(self.directory), auto_reload=False)
+        self._templates: dict[str, CompiledTemplate] = {}
+        self._watching = False
+        if not self.directory.exists():
+            logger.warning(f"Templates directory not found: {self.directory}")
+        self.reload()
+
+    def reload(self) -> list[str]:
+        """Recompile added or changed templates and drop deleted ones; return the names touched."""
+        names = {path.stem for path in self.directory.glob("*.j2")} if self.directory.exists() else set()
+        changed = []
+        for name in set(self._templates) - names:
+            del self._templates[name]
+            changed.append(name)
+        for name in names:
+            current = self._templates.get(name)
+            if self._refresh(name, current) is not current:
+                changed.append(name)
+        if changed:
+            # Templates that {% include %} a changed one must not see a stale copy
+            if self.env.cache is not None:
+                self.env.cache.clear()
+            logger.info(f"Templates reloaded: {', '.join(sorted(changed))}")
+            # reload() also runs on the event loop under watch()
+            EventBus.publish_nowait("templates_changed", {"changed": sorted(changed)})
+        return changed
+
+    def list(self) -> list[TemplateInfo]:
+        return [compiled.info for _, compiled in sorted(self._templates.items())]
+
+    def get(self, name: str) -> CompiledTemplate:
+        name = name.removesuffix(".j2")
+        compiled = self._templates.get(name)
+        # Only plain names; nothing outside the templates directory
+        if not self._watching and Path(name).name == name:
+            compiled = self._refresh(name, compiled)
+        if compiled is None:
+            raise FileNotFoundError(f"Template '{name}.j2' not found in {self.directory}")
+        return compiled
+
+    def render(self, name: str, **kwargs) -> str:
+        return self.get(name).template.render(**kwargs)
+
+    def digest(self, name: str) -> str:
+        return self.get(name).info.sha256
+
+    async def watch(self):
+        """Keep the registry in sync with the directory until cancelled."""
+        self._watching = True
+        try:
+            if awatch is not None and self.directory.exists():
+                async for _ in awatch(self.directory):
+                    self.reload()
+            else:
+                while True:
+                    await asyncio.sleep(self.config.poll_seconds)
+                    await asyncio.to_thread(self.reload)
+        finally:
+            self._watching = False
+
+    def _refresh(self, name: str, compiled: CompiledTemplate | None) -> CompiledTemplate | None:
+        """Return `compiled`, recompiled first if its file changed (None if the file is gone)."""
+        path = self.directory / f"{name}.j2"
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._templates.pop(name, None)
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if compiled is not None and compiled.stamp == stamp:
+            return compiled
+
+        data = path.read_bytes()
+        try:
+            source = data.decode()
+            template = self.env.from_string(source)
+        except (UnicodeDecodeError, TemplateSyntaxError) as e:
+            # Keep serving the last good version while the file is being edited
+            logger.error(f"Template '{name}' failed to compile: {e}")
+            return compiled
+        match = _FIRST_TAG.search(source)
+        prefix = source[:match.start()] if match else source
+        info = TemplateInfo(
+            name=name,
+            sha256=hashlib.sha256(data).hexdigest(),
+            size=stat.st_size,
+            modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            prefix_chars=len(prefix),
+        )
+        compiled = CompiledTemplate(template, info, prefix, stamp)
+        self._templates[name] = compiled
+        return compiled
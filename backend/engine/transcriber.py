@@ -1,59 +1,502 @@
+import asyncio
+import bisect
+import json
 import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator
 from pathlib import Path
-from typing import BinaryIO
+from typing import BinaryIO, Literal
+
+import numpy as np
+from pydantic import BaseModel
 
 from backend.config import Settings
+from backend.config.models import BatchingConfig
+
+from .audio import load_audio
+from .registry import ModelRegistry
 
 try:
-    from faster_whisper import WhisperModel
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+    from faster_whisper.transcribe import Segment
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
 except ImportError:
+    BatchedInferencePipeline = None
     WhisperModel = None
+    Segment = None
+    VadOptions = None
+    get_speech_timestamps = None
 
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 16000
+# Whisper's context window; longer clips cannot share a batch slot
+MAX_BATCH_CLIP_SECONDS = 30.0
+
+# How much of the decoder's output a transcription returns: the text only,
+# per-segment metadata too, or per-word timings as well
+Detail = Literal["text", "segments", "words"]
+
+class WordColumns(BaseModel):
+    """Word timings as parallel arrays, one element per word."""
+    start: list[float] = []
+    end: list[float] = []
+    text: list[str] = []
+    probability: list[float] = []
+    # Index of the word's segment in the enclosing SegmentColumns
+    segment: list[int] = []
+
+class SegmentColumns(BaseModel):
+    """Segment metadata as parallel arrays, one element per segment."""
+    start: list[float] = []
+    end: list[float] = []
+    text: list[str] = []
+    # Mean token log-probability; closer to 0 is more confident
+    avg_logprob: list[float] = []
+    # Probability that the segment is silence or noise rather than speech
+    no_speech_prob: list[float] = []
+    # Only with word timestamps
+    words: WordColumns | None = None
+
+    def append(self, segment: "Segment"):
+        index = len(self.start)
+        self.start.append(round(segment.start, 3))
+        self.end.append(round(segment.end, 3))
+        self.text.append(segment.text.strip())
+        self.avg_logprob.append(round(segment.avg_logprob, 4))
+        self.no_speech_prob.append(round(segment.no_speech_prob, 4))
+        if segment.words is not None:
+            if self.words is None:
+                self.words = WordColumns()
+            for word in segment.words:
+                self.words.start.append(round(word.start, 3))
+                self.words.end.append(round(word.end, 3))
+                self.words.text.append(word.word)
+                self.words.probability.append(round(word.probability, 4))
+                self.words.segment.append(index)
+
+    @classmethod
+    def of(cls, segment: "Segment") -> "SegmentColumns":
+        """A single segment in columnar form, as streamed by `Transcriber.iter_segments`."""
+        columns = cls()
+        columns.append(segment)
+        return columns
+
+class TranscriptionResult(BaseModel):
+    text: str
+    language: str | None = None
+    # Confidence of the language detection; for detail "segments" or "words"
+    language_probability: float | None = None
+    duration: float | None = None
+    # Seconds of silence dropped by VAD before decoding; None when VAD is off
+    vad_skipped_seconds: float | None = None
+    # True when served from the result cache instead of running inference
+    cached: bool = False
+    # Seconds spent per stage: decode, model_load, inference, segment_join
+    timings: dict[str, float] = {}
+    # Per-segment metadata, for detail "segments" or "words"
+    segments: SegmentColumns | None = None
+
 class Transcriber:
     def __init__(self, settings: Settings):
         self.settings = settings.transcription
-        self.model = None
+        self.audio = settings.audio
+        if self.audio.sample_rate != SAMPLE_RATE or self.audio.channels != 1:
+            raise ValueError(
+                f"Whisper expects {SAMPLE_RATE} Hz mono audio; "
+                f"set [audio] sample_rate = {SAMPLE_RATE} and channels = 1"
+            )
+        self.workers = settings.workers
+        self.batching = settings.batching
+        self.vad = settings.vad
+        self.registry = ModelRegistry(
+            self._create_model,
+            compute_type=self.settings.compute_type,
+            memory_budget_mb=self.settings.memory_budget_mb
+        )
+
+    @property
+    def available_models(self) -> list[str]:
+        """Models that may be requested per call: the default plus [transcription] preload."""
+        return [self.settings.model, *(m for m in self.settings.preload if m != self.settings.model)]
 
-    def load_model(self):
+    def _create_model(self, name: str):
         if WhisperModel is None:
             raise ImportError("faster-whisper is not installed. Please install it with 'pip install faster-whisper'")
 
-        if self.model is None:
-            logger.info(f"Loading Whisper model: {self.settings.model} on {self.settings.device}")
-            # Initialize the model
-            # Note: download_root can be configured if needed, defaults to cache
-            self.model = WhisperModel(
-                self.settings.model,
-                device=self.settings.device,
-                compute_type=self.settings.compute_type
-            )
-            logger.info("Model loaded")
+        logger.info(f"Loading Whisper model: {name} on {self.settings.device}")
+        # Note: download_root can be configured if needed, defaults to cache
+        model = WhisperModel(
+            name,
+            device=self.settings.device,
+            compute_type=self.settings.compute_type,
+            cpu_threads=self.workers.cpu_threads,
+            # Threads in a thread-mode pool share this model instance
+            num_workers=self.workers.count if self.workers.mode == "thread" else 1
+        )
+        logger.info("Model loaded")
+        return model
+
+    def load_model(self, name: str | None = None):
+        """Return a resident model, loading it through the registry if needed."""
+        return self.registry.get(name or self.settings.model)
+
+    def _load_model_timed(self, name: str | None, timings: dict[str, float]):
+        # Only report model_load when this call actually had to load the model
+        name = name or self.settings.model
+        if self.registry.is_loaded(name):
+            return self.load_model(name)
+        started = time.perf_counter()
+        model = self.load_model(name)
+        timings["model_load"] = time.perf_counter() - started
+        return model
 
-    def transcribe(self, audio_path: str | Path) -> str:
-    def transcribe(self, audio_path: str | Path | BinaryIO) -> str:
-        self.load_model()
+    def warm_up(self):
+        """
+        Load the default and preloaded models and run one short inference on
+        each, so the first real request doesn't pay for loading and buffer
+        allocation.
+        """
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        for name in self.available_models:
+            model = self.load_model(name)
+            segments, _ = model.transcribe(silence, language=self._language(), beam_size=1, vad_filter=False)
+            list(segments)  # the generator does the actual decoding
+            logger.info(f"Warmed up Whisper model: {name}")
 
-        logger.info(f"Transcribing audio file: {audio_path}")
+    def cache_fingerprint(self, model_name: str | None = None) -> str:
+        """Describe every setting besides the audio that shapes a transcription result."""
+        return json.dumps({
+            "model": model_name or self.settings.model,
+            "transcription": self.settings.model_dump(mode="json"),
+            "audio": self.audio.model_dump(mode="json"),
+            "vad": self.vad.model_dump(mode="json"),
+        }, sort_keys=True)
 
+    def _language(self) -> str | None:
         # language=None means auto-detect if set to "auto" in config,
         # but faster-whisper expects None for auto, or a code string.
         lang = self.settings.language
-        if lang == "auto":
-            lang = None
+        return None if lang == "auto" else lang
+
+    def _vad_options(self) -> dict | None:
+        """Silero VAD parameters from [vad], or None when VAD is disabled."""
+        if not self.vad.enabled:
+            return None
+        return {
+            "threshold": self.vad.threshold,
+            "min_speech_duration_ms": int(self.vad.min_speech_duration * 1000),
+            "min_silence_duration_ms": int(self.vad.min_silence_duration * 1000),
+        }
+
+    def transcribe(
+        self,
+        audio_path: str | Path | BinaryIO | bytes | np.ndarray,
+        model_name: str | None = None,
+        detail: Detail = "text"
+    ) -> TranscriptionResult:
+        """
+        Transcribe audio in one pass.
+
+        With `detail` "segments" the result also carries each segment's
+        timestamps and confidence, collected from the decoder's generator as
+        it runs; "words" adds word timings, which faster-whisper aligns
+        during the same pass.
+        """
+        timings: dict[str, float] = {}
+        segments, info, vad_options = self._start(audio_path, model_name, detail == "words", timings)
 
-        # faster-whisper accepts str (path) or file-like object.
-        # If it's a Path object, convert to str.
-        audio_input = str(audio_path) if isinstance(audio_path, Path) else audio_path
+        started = time.perf_counter()
+        texts = []
+        columns = SegmentColumns() if detail != "text" else None
+        # Segments are generated lazily; the decoder runs while iterating
+        for segment in segments:
+            texts.append(segment.text)
+            if columns is not None:
+                columns.append(segment)
+        timings["inference"] += time.perf_counter() - started
 
-        segments, info = self.model.transcribe(
-            audio_input,
-            language=lang,
-            beam_size=5
+        started = time.perf_counter()
+        text = " ".join(texts)
+        timings["segment_join"] = time.perf_counter() - started
+
+        return TranscriptionResult(
+            text=text.strip(),
+            language=info.language,
+            language_probability=info.language_probability if detail != "text" else None,
+            duration=info.duration,
+            vad_skipped_seconds=self._vad_skipped(info, vad_options),
+            timings=timings,
+            segments=columns
         )
 
+    def iter_segments(
+        self,
+        audio_path: str | Path | BinaryIO | bytes | np.ndarray,
+        model_name: str | None = None,
+        word_timestamps: bool = False
+    ) -> Iterator[dict]:
+        """
+        Transcribe audio, yielding events as the decoder produces them.
+
+        First an "info" event with the detected language and duration (known
+        before decoding starts), then a "segment" event per segment in
+        columnar form, then a "done" event with the text and stage timings.
+        """
+        timings: dict[str, float] = {}
+        segments, info, vad_options = self._start(audio_path, model_name, word_timestamps, timings)
+        yield {
+            "type": "info",
+            "language": info.language,
+            "language_probability": info.language_probability,
+            "duration": info.duration,
+            "vad_skipped_seconds": self._vad_skipped(info, vad_options),
+        }
+
+        started = time.perf_counter()
+        texts = []
+        for index, segment in enumerate(segments):
+            texts.append(segment.text)
+            yield {"type": "segment", "index": index, **SegmentColumns.of(segment).model_dump(exclude_none=True)}
+        timings["inference"] += time.perf_counter() - started
+        yield {"type": "done", "text": " ".join(texts).strip(), "timings": timings}
+
+    def _start(
+        self,
+        audio_path: str | Path | BinaryIO | bytes | np.ndarray,
+        model_name: str | None,
+        word_timestamps: bool,
+        timings: dict[str, float]
+    ):
+        """Load the model and audio and start decoding; return (segment generator, info, VAD options)."""
+        model = self._load_model_timed(model_name, timings)
+
+        if isinstance(audio_path, np.ndarray):
+            audio = audio_path
+        else:
+            # Decode, resample and normalize up front so Whisper gets a ready
+            # float32 array and decode time is measured on its own
+            started = time.perf_counter()
+            audio = load_audio(audio_path, self.audio)
+            timings["decode"] = time.perf_counter() - started
+        logger.info(f"Transcribing {len(audio) / SAMPLE_RATE:.2f}s of audio")
+
+        started = time.perf_counter()
+        vad_options = self._vad_options()
+        options = {"word_timestamps": True} if word_timestamps else {}
+        segments, info = model.transcribe(
+            audio,
+            language=self._language(),
+            beam_size=self.settings.beam_size,
+            vad_filter=vad_options is not None,
+            vad_parameters=vad_options,
+            **options
+        )
+        # Language detection (and VAD) happen before the generator is returned
+        timings["inference"] = time.perf_counter() - started
         logger.info(f"Detected language '{info.language}' with probability {info.language_probability}")
+        return segments, info, vad_options
+
+    def _vad_skipped(self, info, vad_options: dict | None) -> float | None:
+        if vad_options is None:
+            return None
+        skipped = round(info.duration - info.duration_after_vad, 3)
+        logger.info(f"VAD skipped {skipped:.2f}s of {info.duration:.2f}s")
+        return skipped
+
+    def transcribe_batch(self, audios: list[bytes]) -> list[TranscriptionResult | Exception]:
+        """
+        Transcribe several independent clips in one batched pass.
+
+        Each clip is decoded on its own; a clip that fails to decode gets its
+        exception in its slot of the returned list and the rest are batched
+        as usual, so one corrupt upload doesn't fail the others.
+
+        Clips are decoded, laid end to end and handed to faster-whisper's
+        BatchedInferencePipeline with one clip_timestamp per clip (or, with VAD
+        enabled, one per speech region of each clip), so the encoder and
+        decoder see them as a single batch. Segments are mapped back to their
+        clip by start time. Falls back to one-by-one decoding when batching
+        cannot apply (single clip, language auto-detection shared across
+        clips, or a clip longer than Whisper's 30s window).
+        """
+        shared: dict[str, float] = {}
+        model = self._load_model_timed(None, shared)
+
+        results: list[TranscriptionResult | Exception | None] = [None] * len(audios)
+        decoded = []
+        arrays = []
+        decode_times = []
+        for i, audio in enumerate(audios):
+            started = time.perf_counter()
+            try:
+                arrays.append(load_audio(audio, self.audio))
+            except Exception as e:
+                logger.warning(f"Dropping clip {i} from batch, failed to decode: {e}")
+                results[i] = e
+                continue
+            decoded.append(i)
+            decode_times.append(time.perf_counter() - started)
+        if arrays:
+            for i, result in zip(decoded, self._transcribe_arrays(model, arrays, decode_times, shared)):
+                results[i] = result
+        return results
+
+    def _transcribe_arrays(
+        self,
+        model,
+        arrays: list[np.ndarray],
+        decode_times: list[float],
+        shared: dict[str, float]
+    ) -> list[TranscriptionResult | Exception]:
+        lang = self._language()
+        if (
+            len(arrays) == 1
+            or lang is None
+            or BatchedInferencePipeline is None
+            or any(len(a) > MAX_BATCH_CLIP_SECONDS * SAMPLE_RATE for a in arrays)
+        ):
+            results: list[TranscriptionResult | Exception] = []
+            for array, elapsed in zip(arrays, decode_times):
+                try:
+                    result = self.transcribe(array)
+                except Exception as e:
+                    results.append(e)
+                    continue
+                result.timings = {**shared, **result.timings, "decode": elapsed}
+                results.append(result)
+            return results
+
+        vad_options = self._vad_options()
+        offsets = []
+        clips = []
+        skipped = []
+        position = 0
+        for array in arrays:
+            offsets.append(position / SAMPLE_RATE)
+            if vad_options is None:
+                regions = [{"start": 0, "end": len(array)}]
+            else:
+                regions = get_speech_timestamps(array, VadOptions(**vad_options))
+            for region in regions:
+                clips.append({
+                    "start": (position + region["start"]) / SAMPLE_RATE,
+                    "end": (position + region["end"]) / SAMPLE_RATE,
+                })
+            speech = sum(region["end"] - region["start"] for region in regions)
+            skipped.append(round((len(array) - speech) / SAMPLE_RATE, 3))
+            position += len(array)
+
+        texts: list[list[str]] = [[] for _ in arrays]
+        started = time.perf_counter()
+        segments = []
+        if clips:
+            logger.info(f"Transcribing batch of {len(arrays)} clips ({position / SAMPLE_RATE:.2f}s)")
+            segments, _ = BatchedInferencePipeline(model=model).transcribe(
+                np.concatenate(arrays),
+                language=lang,
+                beam_size=self.settings.beam_size,
+                vad_filter=False,
+                clip_timestamps=clips,
+                # One clip per VAD region, so there can be many more than uploads
+                batch_size=min(len(clips), self.batching.max_batch_size)
+            )
+        segments = list(segments)
+        # The whole batch shares one inference pass
+        shared["inference"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for segment in segments:
+            index = bisect.bisect_right(offsets, segment.start + 1e-3) - 1
+            texts[max(index, 0)].append(segment.text.strip())
+        joined = [" ".join(parts).strip() for parts in texts]
+        shared["segment_join"] = time.perf_counter() - started
+
+        return [
+            TranscriptionResult(
+                text=text,
+                language=lang,
+                duration=len(array) / SAMPLE_RATE,
+                vad_skipped_seconds=skipped[i] if vad_options is not None else None,
+                timings={**shared, "decode": decode_times[i]},
+            )
+            for i, (text, array) in enumerate(zip(joined, arrays))
+        ]
+
+    def transcribe_segments(self, audio: np.ndarray, beam_size: int = 5) -> list[Segment]:
+        """Transcribe an in-memory 16 kHz window and return its raw segments."""
+        model = self.load_model()
+
+        vad_options = self._vad_options()
+        segments, _ = model.transcribe(
+            audio,
+            language=self._language(),
+            beam_size=beam_size,
+            condition_on_previous_text=False,
+            vad_filter=vad_options is not None,
+            vad_parameters=vad_options
+        )
+        return list(segments)
+
+
+class TranscriptionBatcher:
+    """
+    Groups concurrent transcription requests into micro-batches.
+
+    The first request in an empty batch starts a `max_wait_ms` timer; the batch
+    is flushed when the timer fires or `max_batch_size` requests are waiting.
+    Each batch is handed to `run_batch` and the results are fanned back out to
+    the awaiting callers in order; an exception in a caller's slot is raised
+    to that caller only.
+    """
+
+    def __init__(
+        self,
+        config: BatchingConfig,
+        run_batch: Callable[[list[bytes]], Awaitable[list[TranscriptionResult | Exception]]]
+    ):
+        self.config = config
+        self._run_batch = run_batch
+        self._pending: list[tuple[bytes, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, audio: bytes) -> TranscriptionResult:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((audio, future))
+
+        if len(self._pending) >= self.config.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.config.max_wait_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: list[tuple[bytes, asyncio.Future]]):
+        try:
+            results = await self._run_batch([audio for audio, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
 
-        text = " ".join([segment.text for segment in segments])
-        return text.strip()
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            # A clip that failed on its own only fails its own request
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
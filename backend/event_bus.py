@@ -1,37 +1,299 @@
+import asyncio
+import inspect
 import logging
+import threading
+import time
+from collections import deque
 from collections.abc import Callable
-from typing import Any
+from fnmatch import fnmatchcase
+from typing import Any, Literal, NamedTuple
 
 logger = logging.getLogger(__name__)
 
+# What a subscriber's queue does when a new event arrives while it is full:
+# drop_oldest discards the oldest queued event, coalesce replaces a queued
+# event of the same topic (falling back to drop_oldest), and block makes the
+# publisher wait for room.
+OverflowPolicy = Literal["drop_oldest", "coalesce", "block"]
+
+
+class Event(NamedTuple):
+    topic: str
+    data: Any
+    published_at: float
+
+
+class Subscription:
+    """
+    One subscriber: a topic pattern, a bounded queue and a delivery task.
+
+    The queue and counters are only touched on the bus loop. Sync callbacks
+    run in a worker thread so a slow one (e.g. the TUI marshalling onto its
+    own thread) only delays its own queue.
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        callback: Callable,
+        max_queue: int,
+        overflow: OverflowPolicy,
+        with_topic: bool
+    ):
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        self.pattern = pattern
+        self.callback = callback
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.with_topic = with_topic
+        self.is_async = inspect.iscoroutinefunction(callback)
+
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_latency = 0.0
+        self._pending: deque[Event] = deque()
+        self._busy = False
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = None
+
+    def matches(self, topic: str) -> bool:
+        return fnmatchcase(topic, self.pattern)
+
+    def offer(self, event: Event, force: bool = False) -> bool:
+        """Queue `event`; returns False if full under the block policy (unless forced)."""
+        if len(self._pending) >= self.max_queue:
+            if self.overflow == "block" and not force:
+                self._space.clear()
+                return False
+            if self.overflow == "coalesce" and self._replace(event):
+                self.coalesced += 1
+                return True
+            self._pending.popleft()
+            self.dropped += 1
+        self._pending.append(event)
+        self._idle.clear()
+        self._ready.set()
+        return True
+
+    async def put(self, event: Event):
+        while not self.offer(event):
+            await self._space.wait()
+
+    def _replace(self, event: Event) -> bool:
+        for i, queued in enumerate(self._pending):
+            if queued.topic == event.topic:
+                del self._pending[i]
+                self._pending.append(event)
+                return True
+        return False
+
+    async def run(self):
+        while True:
+            if not self._pending:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            event = self._pending.popleft()
+            self._space.set()
+            self._busy = True
+            args = (event.topic, event.data) if self.with_topic else (event.data,)
+            try:
+                if self.is_async:
+                    await self.callback(*args)
+                else:
+                    await asyncio.to_thread(self.callback, *args)
+            except Exception as e:
+                logger.error(f"Error in subscriber for {event.topic}: {e}")
+            finally:
+                self._busy = False
+                self.delivered += 1
+                self.last_latency = time.monotonic() - event.published_at
+                if not self._pending:
+                    self._idle.set()
+
+    async def wait_idle(self):
+        while self._pending or self._busy:
+            await self._idle.wait()
+
+    def stats(self) -> dict:
+        oldest = self._pending[0].published_at if self._pending else None
+        return {
+            "pattern": self.pattern,
+            "overflow": self.overflow,
+            "queued": len(self._pending),
+            "max_queue": self.max_queue,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            # Age of the oldest event still waiting; how far behind the subscriber is
+            "lag_seconds": time.monotonic() - oldest if oldest is not None else 0.0,
+            "last_latency_seconds": self.last_latency,
+        }
+
+
 class EventBus:
+    """
+    Process-wide publish/subscribe bus.
+
+    Delivery runs on a dedicated event loop thread, so `publish` only hands
+    the event to each matching subscriber's queue and returns; it never runs
+    callbacks itself. Topics are matched with shell-style wildcards
+    (`transcription.*`, `*`).
+    """
+
     _instance = None
-    _subscribers: dict[str, list[Callable]] = {}
+    _subscriptions: list[Subscription] = []
+    _loop: asyncio.AbstractEventLoop | None = None
+    _thread: threading.Thread | None = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._subscribers = {}
+            cls._subscriptions = []
         return cls._instance
 
     @classmethod
-    def subscribe(cls, event_type: str, callback: Callable[[Any], None]):
-        if event_type not in cls._subscribers:
-            cls._subscribers[event_type] = []
-        cls._subscribers[event_type].append(callback)
-        logger.debug(f"Subscribed to {event_type}")
+    def _ensure_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._lock:
+            if cls._loop is None:
+                loop = asyncio.new_event_loop()
+                cls._thread = threading.Thread(target=loop.run_forever, name="event-bus", daemon=True)
+                cls._thread.start()
+                cls._loop = loop
+            return cls._loop
+
+    @classmethod
+    def subscribe(
+        cls,
+        event_type: str,
+        callback: Callable[..., Any],
+        max_queue: int = 100,
+        overflow: OverflowPolicy = "drop_oldest",
+        with_topic: bool = False
+    ) -> Subscription:
+        """
+        Call `callback(data)` (or `callback(topic, data)` with `with_topic`)
+        for events whose topic matches the `event_type` pattern. Callbacks may
+        be sync or async.
+        """
+        loop = cls._ensure_loop()
+        subscription = Subscription(event_type, callback, max_queue, overflow, with_topic)
+        subscription._task = asyncio.run_coroutine_threadsafe(subscription.run(), loop)
+        with cls._lock:
+            cls._subscriptions.append(subscription)
+        logger.debug("Subscribed to %s", event_type)
+        return subscription
+
+    @classmethod
+    def unsubscribe(cls, subscription: Subscription):
+        with cls._lock:
+            if subscription in cls._subscriptions:
+                cls._subscriptions.remove(subscription)
+        if subscription._task is not None:
+            subscription._task.cancel()
+
+    @classmethod
+    def _route(cls, event_type: str, data: Any) -> tuple[Event, list[Subscription]]:
+        with cls._lock:
+            targets = [s for s in cls._subscriptions if s.matches(event_type)]
+        # Lazy formatting: the payload is only rendered when debug logging is on
+        logger.debug("Published %s to %d subscribers: %r", event_type, len(targets), data)
+        return Event(event_type, data, time.monotonic()), targets
+
+    @classmethod
+    def _offer_all(cls, event: Event, targets: list[Subscription], force: bool = False):
+        for subscription in targets:
+            subscription.offer(event, force)
 
     @classmethod
     def publish(cls, event_type: str, data: Any = None):
-        if event_type in cls._subscribers:
-            for callback in cls._subscribers[event_type]:
-                try:
-                    callback(data)
-                except Exception as e:
-                    logger.error(f"Error in subscriber for {event_type}: {e}")
-        logger.debug(f"Published {event_type}: {data}")
+        """
+        Queue an event for every matching subscriber and return.
+
+        Only subscribers with the block policy and a full queue make this
+        wait; from async code use `publish_async` so the wait doesn't stall
+        the caller's event loop, or `publish_nowait` from sync code that runs
+        on one.
+        """
+        event, targets = cls._route(event_type, data)
+        if not targets:
+            return
+        loop = cls._loop
+        blocking = [s for s in targets if s.overflow == "block"]
+        if not blocking or threading.current_thread() is cls._thread:
+            # On the bus loop itself a blocking put would deadlock; overflow drops instead
+            loop.call_soon_threadsafe(cls._offer_all, event, targets, True)
+            return
+        loop.call_soon_threadsafe(cls._offer_all, event, [s for s in targets if s.overflow != "block"])
+        for subscription in blocking:
+            asyncio.run_coroutine_threadsafe(subscription.put(event), loop).result()
+
+    @classmethod
+    def publish_nowait(cls, event_type: str, data: Any = None):
+        """
+        Like `publish`, but never waits: blocking subscribers with a full
+        queue get the event once they make room, while the caller moves on.
+        """
+        event, targets = cls._route(event_type, data)
+        if not targets:
+            return
+        loop = cls._loop
+        if threading.current_thread() is cls._thread:
+            cls._offer_all(event, targets, force=True)
+            return
+        loop.call_soon_threadsafe(cls._offer_all, event, [s for s in targets if s.overflow != "block"])
+        for subscription in targets:
+            if subscription.overflow == "block":
+                asyncio.run_coroutine_threadsafe(subscription.put(event), loop)
+
+    @classmethod
+    async def publish_async(cls, event_type: str, data: Any = None):
+        """Like `publish`, but waits for blocking subscribers without blocking the loop."""
+        event, targets = cls._route(event_type, data)
+        if not targets:
+            return
+        loop = cls._loop
+        if asyncio.get_running_loop() is loop:
+            cls._offer_all(event, targets, force=True)
+            return
+        loop.call_soon_threadsafe(cls._offer_all, event, [s for s in targets if s.overflow != "block"])
+        for subscription in targets:
+            if subscription.overflow == "block":
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(subscription.put(event), loop))
+
+    @classmethod
+    def stats(cls) -> list[dict]:
+        """Queue depth, drops and lag for every subscriber."""
+        with cls._lock:
+            subscriptions = list(cls._subscriptions)
+        return [s.stats() for s in subscriptions]
+
+    @classmethod
+    def flush(cls, timeout: float | None = None):
+        """Wait until every event published so far has been delivered (mostly for testing)."""
+        if cls._loop is None:
+            return
+        with cls._lock:
+            subscriptions = list(cls._subscriptions)
+
+        async def wait_all():
+            for subscription in subscriptions:
+                await subscription.wait_idle()
+
+        asyncio.run_coroutine_threadsafe(wait_all(), cls._loop).result(timeout)
 
     @classmethod
     def clear(cls):
         """Clear all subscribers (mostly for testing)."""
-        cls._subscribers = {}
+        with cls._lock:
+            subscriptions, cls._subscriptions = cls._subscriptions, []
+        for subscription in subscriptions:
+            if subscription._task is not None:
+                subscription._task.cancel()
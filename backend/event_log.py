@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any, NamedTuple
+
+from backend.config.models import EventsConfig
+from backend.event_bus import EventBus
+
+# Bus queue in front of the log; recording is cheap, so this only absorbs bursts
+SUBSCRIBER_QUEUE = 10_000
+
+
+class LoggedEvent(NamedTuple):
+    id: int
+    topic: str
+    data: Any
+
+
+class EventLog:
+    """
+    Numbered ring buffer of every EventBus event, for streaming to clients.
+
+    Subscribes to all topics; each event gets the next integer id so a client
+    that reconnects with the last id it saw can be sent exactly what it
+    missed, as long as that is still in the buffer. Clients on the server's
+    event loop are woken from the bus loop with call_soon_threadsafe.
+    """
+
+    def __init__(self, config: EventsConfig):
+        self.config = config
+        self._events: deque[LoggedEvent] = deque(maxlen=config.buffer_size)
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self.subscription = EventBus.subscribe(
+            "*", self._record, max_queue=SUBSCRIBER_QUEUE, with_topic=True
+        )
+
+    def close(self):
+        EventBus.unsubscribe(self.subscription)
+
+    async def _record(self, topic: str, data: Any):
+        with self._lock:
+            self._events.append(LoggedEvent(self._next_id, topic, data))
+            self._next_id += 1
+            waiters = list(self._waiters)
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(waiter.set)
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    def since(self, last_id: int) -> tuple[list[LoggedEvent], bool]:
+        """
+        Events after `last_id`, and whether some were lost in between.
+
+        An id newer than anything logged comes from before a server restart;
+        the client gets the whole buffer and is told about the gap.
+        """
+        with self._lock:
+            oldest = self._events[0].id if self._events else self._next_id
+            if last_id >= self._next_id:
+                return list(self._events), True
+            return [e for e in self._events if e.id > last_id], last_id + 1 < oldest
+
+    async def follow(self, last_id: int | None = None) -> AsyncIterator[LoggedEvent | None]:
+        """
+        Yield events after `last_id` (or from now on) as they are logged.
+
+        Yields None after `keepalive_seconds` without events, so the caller
+        can keep idle connections open. Check `since` first to detect gaps.
+        """
+        waiter = asyncio.Event()
+        entry = (asyncio.get_running_loop(), waiter)
+        with self._lock:
+            self._waiters.add(entry)
+        if last_id is None:
+            last_id = self.last_id
+        try:
+            while True:
+                # Clear before reading so an event logged in between still wakes us
+                waiter.clear()
+                events, _ = self.since(last_id)
+                for event in events:
+                    last_id = event.id
+                    yield event
+                try:
+                    await asyncio.wait_for(waiter.wait(), self.config.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._waiters.discard(entry)
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from backend.config.models import JobsConfig
+from backend.engine import LLMEngine, TranscriptionPool
+from backend.event_bus import EventBus
+from backend.output import SessionLogger
+from backend.pipeline import Pipeline, StepResult
+
+logger = logging.getLogger(__name__)
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+FINISHED: set[str] = {"succeeded", "failed", "cancelled"}
+
+
+class JobStoreFullError(RuntimeError):
+    def __init__(self, max_jobs: int):
+        super().__init__(f"Too many unfinished jobs ({max_jobs})")
+        self.max_jobs = max_jobs
+
+
+class JobResult(BaseModel):
+    # Final text: the refinement if one ran, else the transcription
+    text: str | None = None
+    transcription: str | None = None
+    refined: str | None = None
+    session_file: str | None = None
+
+
+class Job(BaseModel):
+    id: str
+    status: JobStatus = "queued"
+    # Pipeline stage currently running (transcribe, refine, append)
+    stage: str | None = None
+    stages: list[str]
+    model: str | None = None
+    template: str | None = None
+    provider: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None = None
+    result: JobResult = Field(default_factory=JobResult)
+    error: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobStore:
+    """
+    Bounded in-memory job table.
+
+    Finished jobs are kept for `ttl_seconds` so clients can collect results;
+    when the table is full the oldest finished job makes room. Only touched on
+    the event loop, so it needs no locking.
+    """
+
+    def __init__(self, config: JobsConfig):
+        self.config = config
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def add(self, job: Job):
+        self.expire()
+        if len(self._jobs) >= self.config.max_jobs:
+            oldest = next((j for j in self._jobs.values() if j.finished), None)
+            if oldest is None:
+                raise JobStoreFullError(self.config.max_jobs)
+            del self._jobs[oldest.id]
+        self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Job | None:
+        self.expire()
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        self.expire()
+        return list(self._jobs.values())
+
+    def expire(self):
+        cutoff = _now() - timedelta(seconds=self.config.ttl_seconds)
+        for job in [j for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job.id]
+
+
+class JobManager:
+    """
+    Runs transcribe -> refine -> append pipelines in the background.
+
+    `submit` stores the job and returns it immediately; the pipeline runs as
+    an asyncio task that updates the job in place and publishes
+    `job_progress` on every stage change and `job_complete` when it ends, so
+    clients of /api/events see progress without polling.
+    """
+
+    def __init__(
+        self,
+        config: JobsConfig,
+        pool: TranscriptionPool,
+        llm_engine: LLMEngine,
+        session_logger: SessionLogger
+    ):
+        self.store = JobStore(config)
+        self.pool = pool
+        self.llm_engine = llm_engine
+        self.session_logger = session_logger
+        self.pipeline = Pipeline(pool, llm_engine, session_logger)
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def submit(
+        self,
+        audio: bytes | None = None,
+        text: str | None = None,
+        model: str | None = None,
+        template: str | None = None,
+        provider: str | None = None,
+        append: bool = False
+    ) -> Job:
+        if (audio is None) == (text is None):
+            raise ValueError("A job needs either audio or text")
+
+        stages = (["transcribe"] if audio is not None else []) + (["refine"] if template else [])
+        if append:
+            stages.append("append")
+        if not stages:
+            raise ValueError("Nothing to do: text jobs need a template or append")
+
+        now = _now()
+        job = Job(
+            id=uuid.uuid4().hex,
+            stages=stages,
+            model=model,
+            template=template,
+            provider=provider,
+            created_at=now,
+            updated_at=now,
+        )
+        self.store.add(job)
+        task = asyncio.create_task(self._run(job, audio, text))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        self._publish(job)
+        logger.info(f"Job {job.id} queued: {' -> '.join(stages)}")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self.store.get(job_id)
+
+    def list(self) -> list[Job]:
+        return self.store.list()
+
+    def cancel(self, job_id: str) -> Job | None:
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        task = self._tasks.get(job_id)
+        if task is not None and not job.finished:
+            task.cancel()
+            # Mark it right away; the task may be parked in a worker thread
+            self._finish(job, "cancelled")
+        return job
+
+    def shutdown(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+    async def _run(self, job: Job, audio: bytes | None, text: str | None):
+        steps = [f"refine:{job.template}" if stage == "refine" else stage for stage in job.stages]
+        try:
+            job.status = "running"
+            result = await self.pipeline.run(
+                steps,
+                audio=audio,
+                text=text,
+                model=job.model,
+                provider=job.provider,
+                on_step=lambda step: self._stage(job, step),
+            )
+        except asyncio.CancelledError:
+            self._finish(job, "cancelled")
+            return
+
+        for step in result.steps:
+            if step.status == "failed":
+                job.error = step.error
+                self._finish(job, "failed")
+                return
+        job.result.text = result.text
+        self._finish(job, "succeeded")
+
+    def _stage(self, job: Job, step: StepResult):
+        kind = step.step.partition(":")[0]
+        if step.status == "running":
+            job.stage = kind
+        elif step.status == "ok":
+            if kind == "transcribe":
+                job.result.transcription = step.output
+            elif kind == "refine":
+                job.result.refined = step.output
+            else:
+                job.result.session_file = step.output
+        job.updated_at = _now()
+        self._publish(job)
+
+    def _finish(self, job: Job, status: JobStatus):
+        if job.finished:
+            return
+        job.status = status
+        job.updated_at = job.finished_at = _now()
+        EventBus.publish_nowait("job_complete", job.model_dump(mode="json"))
+        logger.info(f"Job {job.id} {status}")
+
+    def _publish(self, job: Job):
+        EventBus.publish_nowait("job_progress", job.model_dump(mode="json"))
@@ -1,10 +1,13 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from backend.api import routes
 from backend.api.routes import router
 from backend.config import load_settings
+from backend.metrics import ServerTimingMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -14,10 +17,26 @@ logging.basicConfig(
 
 settings = load_settings()
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Buffer events from the start, so Last-Event-ID can replay warm-up and early jobs
+    routes.get_event_log(settings)
+    warmup = routes.start_warmup(settings) if settings.transcription.warmup else None
+    backfill = routes.start_session_index(settings)
+    llm_warmup = routes.start_llm_warmup(settings) if settings.llm.http.warmup else None
+    template_watch = routes.start_template_watch(settings) if settings.templates.watch else None
+    yield
+    for task in (warmup, backfill, llm_warmup, template_watch):
+        if task is not None:
+            task.cancel()
+    routes.shutdown()
+    await routes.close_llm_engine()
+
 app = FastAPI(
     title="The Dictator",
     description="Local-first voice dictation API",
-    version="0.0.1"
+    version="0.0.1",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -34,7 +53,10 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the frontend read timing and queue headers across origins
+    expose_headers=["Server-Timing", "X-Queue-Depth", "X-Cache"],
 )
+app.add_middleware(ServerTimingMiddleware)
 
 app.include_router(router, prefix="/api")
 
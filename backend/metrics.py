@@ -0,0 +1,312 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds in seconds; spans sub-millisecond cache hits to long LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # label values -> (per-bucket counts, sum, count)
+        self._series: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._series.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                le = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {count}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function: Callable[[], list[tuple[dict[str, str], float]]] | None = None
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], list[tuple[dict[str, str], float]]]):
+        """Read the current (labels, value) pairs from `function` at render time."""
+        self._function = function
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            values = dict(self._values)
+        if self._function is not None:
+            for labels, value in self._function():
+                values[self._key(labels)] = value
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "dictator_http_request_seconds",
+    "HTTP request latency by handler and status.",
+    ("method", "handler", "status"),
+)
+TRANSCRIPTION_STAGE_SECONDS = REGISTRY.histogram(
+    "dictator_transcription_stage_seconds",
+    "Time spent in each transcription stage (upload_receive, decode, model_load, inference, segment_join).",
+    ("stage",),
+)
+REFINE_STAGE_SECONDS = REGISTRY.histogram(
+    "dictator_refine_stage_seconds",
+    "Time spent in each refinement stage (template_render, llm_first_token, llm_network, chunk_map, chunk_reduce).",
+    ("stage", "provider", "template"),
+)
+SESSION_APPEND_SECONDS = REGISTRY.histogram(
+    "dictator_session_append_seconds",
+    "Time spent queueing an entry for the session file (including the wait for durable appends).",
+)
+SESSION_WRITE_SECONDS = REGISTRY.histogram(
+    "dictator_session_write_seconds",
+    "Time the session writer spends writing one coalesced batch of entries.",
+)
+TRANSCRIPTIONS_TOTAL = REGISTRY.counter(
+    "dictator_transcriptions_total",
+    "Transcriptions served, by whether the result came from the cache.",
+    ("cached",),
+)
+REFINEMENTS_TOTAL = REGISTRY.counter(
+    "dictator_refinements_total",
+    "Refinements served, by provider, template and cache use.",
+    ("provider", "template", "cached"),
+)
+LLM_ATTEMPTS_TOTAL = REGISTRY.counter(
+    "dictator_llm_attempts_total",
+    "LLM provider calls by outcome (ok, error, timeout, cancelled), including retries and hedges.",
+    ("provider", "status"),
+)
+LLM_INPUT_TOKENS_TOTAL = REGISTRY.counter(
+    "dictator_llm_input_tokens_total",
+    "Prompt tokens sent to LLM providers, by whether the provider served them from its prompt cache.",
+    ("provider", "cached"),
+)
+LLM_HTTP_CONNECTIONS = REGISTRY.gauge(
+    "dictator_llm_http_connections",
+    "Connections in the shared LLM provider pool, by state (active, idle).",
+    ("state",),
+)
+LLM_HTTP_CONNECTS_TOTAL = REGISTRY.counter(
+    "dictator_llm_http_connects_total",
+    "New connections opened to LLM providers (each one a TCP and, for https, TLS handshake).",
+    ("host",),
+)
+LLM_HTTP_REQUESTS_TOTAL = REGISTRY.counter(
+    "dictator_llm_http_requests_total",
+    "Requests sent to LLM providers, by host and negotiated HTTP version.",
+    ("host", "http_version"),
+)
+
+# Stage timings of the current HTTP request, emitted as its Server-Timing header
+_server_timings: ContextVar[list[tuple[str, float]] | None] = ContextVar("server_timings", default=None)
+
+
+def add_server_timing(name: str, seconds: float):
+    """Add an entry to the current request's Server-Timing header, if any."""
+    timings = _server_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def observe(histogram: Histogram, seconds: float, **labels: str):
+    """Record a duration in `histogram` and in the request's Server-Timing header."""
+    histogram.observe(seconds, **labels)
+    add_server_timing(labels.get("stage", histogram.name.removeprefix("dictator_").removesuffix("_seconds")), seconds)
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Time the enclosed block and record it with `observe`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(histogram, time.perf_counter() - started, **labels)
+
+
+def _format_server_timing(timings: list[tuple[str, float]]) -> str:
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that times every HTTP request.
+
+    Stages recorded through `observe`/`timed` while the request is handled are
+    collected in a context variable and sent back as a `Server-Timing` header,
+    together with the total time until the response started. Each request is
+    also recorded in `dictator_http_request_seconds`. Streaming responses
+    start before their body is produced, so stages recorded while streaming
+    only reach the histograms.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings: list[tuple[str, float]] = []
+        token = _server_timings.set(timings)
+        status = "500"
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                entries = [*timings, ("total", time.perf_counter() - started)]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _format_server_timing(entries).encode("latin-1")))
+                # Expose the entries to the Resource Timing API of cross-origin pages
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _server_timings.reset(token)
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                # Label by endpoint name so path parameters don't explode cardinality
+                handler=getattr(route, "name", "unmatched"),
+                status=status,
+            )
@@ -1,4 +1,6 @@
 from .gui import VoxPadApp
+from .history import SessionHistory
+from .search import SessionIndex
 from .session_logger import SessionLogger
 
-__all__ = ["SessionLogger", "VoxPadApp"]
+__all__ = ["SessionHistory", "SessionIndex", "SessionLogger", "VoxPadApp"]
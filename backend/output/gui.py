@@ -60,16 +60,27 @@ class VoxPadApp(App):
 
         self.query_one("#logs", RichLog).write("GUI initialized.")
 
-        # Subscribe to events
-        EventBus.subscribe("log", self.on_log_event)
-        EventBus.subscribe("transcription_complete", self.on_transcription_complete)
+        # Subscribe to events; the bus delivers from a worker thread, so
+        # publishers never wait on the UI and a log flood drops the oldest lines
+        self._subscriptions = [
+            EventBus.subscribe("log", self.on_log_event, max_queue=500, overflow="drop_oldest"),
+            EventBus.subscribe("transcription_complete", self.on_transcription_complete),
+            EventBus.subscribe("refine_complete", self.on_refine_complete),
+        ]
 
     def on_log_event(self, data):
         # Schedule the update on the main thread
         self.call_from_thread(self._write_log, f"[dim]{datetime.now().strftime('%H:%M:%S')}[/dim] {data}")
 
     def on_transcription_complete(self, data):
-        self.call_from_thread(self._write_log, f"[bold green]Transcription Complete:[/bold green] {data}")
+        text = data["text"] if isinstance(data, dict) else data
+        self.call_from_thread(self._write_log, f"[bold green]Transcription Complete:[/bold green] {text}")
+
+    def on_refine_complete(self, data):
+        self.call_from_thread(
+            self._write_log,
+            f"[bold magenta]Refined ({data['template']}):[/bold magenta] {data['text']}"
+        )
 
     def _write_log(self, message: str):
         try:
@@ -101,8 +112,9 @@ class VoxPadApp(App):
 
     def shutdown(self) -> None:
         """Clean up resources."""
+        for subscription in getattr(self, "_subscriptions", []):
+            EventBus.unsubscribe(subscription)
         logger.info("GUI shut down")
-        # Ensure we clean up any resources if needed
 
     def on_unmount(self) -> None:
         self.shutdown()
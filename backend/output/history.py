@@ -0,0 +1,111 @@
+import bisect
+import mmap
+import os
+import threading
+from collections.abc import Iterator
+from datetime import date
+from pathlib import Path
+
+from backend.config import Settings
+from backend.output.session_logger import SessionEntry, find_entry_markers, format_entry
+
+
+class _FileIndex:
+    """Where each entry of one session file starts; only ever appended to."""
+
+    def __init__(self):
+        self.size = 0
+        self.offsets: list[int] = []
+        self.text_starts: list[int] = []
+        self.times: list[str] = []
+
+    def add(self, offset: int, text_start: int, time: str):
+        self.offsets.append(offset)
+        self.text_starts.append(text_start)
+        self.times.append(time)
+
+
+class SessionHistory:
+    """
+    Reads entries back from session files.
+
+    Each file gets an offset index of its `### HH:MM:SS` entries, built by
+    scanning the file once and extended as the `SessionLogger` listener
+    reports new entries (or, for writes it didn't see, by scanning just the
+    new tail). Reads mmap the file and slice out only the requested entries,
+    so polling a long day for new entries touches only the pages at its end.
+    """
+
+    def __init__(self, settings: Settings):
+        self.directory = settings.session.directory
+        self.date_format = settings.session.date_format
+        self._indexes: dict[Path, _FileIndex] = {}
+        self._lock = threading.Lock()
+
+    def get_session_file(self, day: date) -> Path:
+        return self.directory / (day.strftime(self.date_format) + ".md")
+
+    def index_entries(self, entries: list[SessionEntry]):
+        """SessionLogger listener: extend the offset index with written entries."""
+        with self._lock:
+            for entry in entries:
+                index = self._indexes.get(entry.file)
+                # Files nobody has read yet are indexed on first read instead
+                if index is None or entry.time is None or entry.offset != index.size:
+                    continue
+                marker = f"\n### {entry.time}\n".encode()
+                index.add(entry.offset, entry.offset + len(marker), entry.time)
+                index.size = entry.offset + len(format_entry(entry.text, entry.time).encode("utf-8"))
+
+    def read(self, day: date, since: int | str | None = None) -> Iterator[dict]:
+        """
+        Yield the entries of `day`'s session file, oldest first.
+
+        `since` is either an entry number from a previous read (entries after
+        it are returned) or an `HH:MM:SS` time (entries written after it).
+        Raises FileNotFoundError if there is no session for `day`.
+        """
+        path = self.get_session_file(day)
+        with open(path, "rb") as f, self._lock:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            index = self._refresh(path, mm)
+            # The lists are append-only, so this prefix stays valid after the lock is released
+            count = len(index.offsets)
+
+        try:
+            if since is None:
+                first = 0
+            elif isinstance(since, int):
+                first = since
+            else:
+                first = bisect.bisect_right(index.times, since, hi=count)
+
+            day_str = day.isoformat()
+            for i in range(first, count):
+                end = index.offsets[i + 1] if i + 1 < count else size
+                # Entries end with a newline that is not part of the text
+                text = mm[index.text_starts[i]:end].removesuffix(b"\n").decode("utf-8", errors="replace")
+                yield {
+                    "number": i + 1,
+                    "date": day_str,
+                    "time": index.times[i],
+                    "offset": index.offsets[i],
+                    "text": text,
+                }
+        finally:
+            mm.close()
+
+    def _refresh(self, path: Path, mm: mmap.mmap) -> _FileIndex:
+        """Bring the file's index up to the mapped size; caller holds the lock."""
+        index = self._indexes.get(path)
+        if index is None or len(mm) < index.size:
+            # First read, or the file was rewritten rather than appended to
+            index = self._indexes[path] = _FileIndex()
+        if len(mm) > index.size:
+            for offset, text_start, time in find_entry_markers(mm, index.size):
+                index.add(offset, text_start, time)
+            index.size = len(mm)
+        return index
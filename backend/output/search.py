@@ -0,0 +1,244 @@
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from backend.config import Settings
+from backend.output.session_logger import (
+    SessionEntry,
+    format_entry,
+    parse_entries,
+    parse_header_date,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    indexed_bytes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    file TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT,
+    offset INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_date ON entries (date, time);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    text, content='entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# Words, optionally with a trailing * for prefix matching
+_QUERY_TERM = re.compile(r"\w+\*?")
+
+
+class SearchHit(BaseModel):
+    date: str
+    time: str | None
+    file: str
+    offset: int
+    text: str
+    snippet: str
+    score: float
+
+
+class SearchResults(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: list[SearchHit]
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query that matches every term.
+
+    Terms are quoted so punctuation and FTS5 operators in user input can't
+    cause syntax errors; a trailing `*` keeps prefix matching.
+    """
+    terms = []
+    for term in _QUERY_TERM.findall(query):
+        word = term.rstrip("*")
+        terms.append(f'"{word}"*' if term.endswith("*") else f'"{word}"')
+    return " ".join(terms)
+
+
+class SessionIndex:
+    """
+    SQLite FTS5 index of session entries.
+
+    Entries arrive incrementally through `index_entries`, registered as a
+    `SessionLogger` listener, and `backfill` picks up whatever is on disk but
+    not yet indexed. Session files are append-only, so each file only records
+    how many of its bytes have been indexed and backfill parses from there.
+    """
+
+    def __init__(self, settings: Settings):
+        self.directory = settings.session.directory
+        self.date_format = settings.session.date_format
+        self.path = settings.session.index_path or self.directory / ".session-index.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Shared by the session writer thread and request threads
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def backfill(self) -> int:
+        """Index the unindexed tail of every session file; returns the entry count."""
+        added = 0
+        for path in sorted(self.directory.glob("*.md")):
+            try:
+                added += self._index_file(path)
+            except OSError as e:
+                logger.error(f"Failed to index {path}: {e}")
+        if added:
+            logger.info(f"Indexed {added} session entries from {self.directory}")
+        return added
+
+    def index_entries(self, entries: list[SessionEntry]):
+        """SessionLogger listener: index freshly written entries."""
+        with self._lock, self._db:
+            for path in dict.fromkeys(entry.file for entry in entries):
+                batch = [entry for entry in entries if entry.file == path]
+                state = self._file_state(path)
+                if state is None or batch[0].offset > state[1]:
+                    # New file, or entries written before the listener was attached
+                    self._index_file(path)
+                    continue
+                fresh = [entry for entry in batch if entry.offset >= state[1]]
+                if fresh:
+                    self._insert(path, fresh)
+
+    def search(
+        self,
+        query: str,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> SearchResults:
+        """Rank entries matching all terms of `query` by BM25, best first."""
+        match = build_match_query(query)
+        if not match:
+            return SearchResults(query=query, total=0, limit=limit, offset=offset, results=[])
+
+        where = "entries_fts MATCH ?"
+        params: list = [match]
+        if date_from:
+            where += " AND e.date >= ?"
+            params.append(date_from)
+        if date_to:
+            where += " AND e.date <= ?"
+            params.append(date_to)
+
+        with self._lock:
+            total = self._db.execute(
+                f"SELECT count(*) FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid WHERE {where}",
+                params,
+            ).fetchone()[0]
+            rows = self._db.execute(
+                f"""
+                SELECT e.file, e.date, e.time, e.offset, e.text,
+                       snippet(entries_fts, 0, '**', '**', '…', 16) AS snippet,
+                       bm25(entries_fts) AS score
+                FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid
+                WHERE {where}
+                ORDER BY score, e.date DESC, e.time DESC
+                LIMIT ? OFFSET ?
+                """,
+                [*params, limit, offset],
+            ).fetchall()
+
+        results = [
+            # bm25() is lower-is-better; flip it so higher scores rank first
+            SearchHit(**{**dict(row), "score": -row["score"]})
+            for row in rows
+        ]
+        return SearchResults(query=query, total=total, limit=limit, offset=offset, results=results)
+
+    def _file_state(self, path: Path) -> tuple[str, int] | None:
+        row = self._db.execute("SELECT date, indexed_bytes FROM files WHERE name = ?", (path.name,)).fetchone()
+        return (row["date"], row["indexed_bytes"]) if row else None
+
+    def _index_file(self, path: Path) -> int:
+        with self._lock, self._db:
+            state = self._file_state(path)
+            start = state[1] if state else 0
+            with open(path, "rb") as f:
+                size = f.seek(0, 2)
+                if size < start:
+                    # Rewritten rather than appended to; start over
+                    self._delete_file(path)
+                    state, start = None, 0
+                if size == start:
+                    return 0
+                date = state[0] if state else self._file_date(path, f)
+                f.seek(start)
+                data = f.read(size - start)
+
+            entries = list(parse_entries(data, path, date, start))
+            self._insert(path, entries, indexed_bytes=size, date=date)
+            return len(entries)
+
+    def _delete_file(self, path: Path):
+        rows = self._db.execute("SELECT id, text FROM entries WHERE file = ?", (path.name,)).fetchall()
+        # External-content FTS tables need the old text to remove their terms
+        self._db.executemany(
+            "INSERT INTO entries_fts (entries_fts, rowid, text) VALUES ('delete', ?, ?)",
+            [(row["id"], row["text"]) for row in rows],
+        )
+        self._db.execute("DELETE FROM entries WHERE file = ?", (path.name,))
+        self._db.execute("DELETE FROM files WHERE name = ?", (path.name,))
+
+    def _file_date(self, path: Path, f) -> str:
+        f.seek(0)
+        date = parse_header_date(f.read(64))
+        if date:
+            return date
+        try:
+            return datetime.strptime(path.stem, self.date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            return datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d")
+
+    def _insert(
+        self,
+        path: Path,
+        entries: list[SessionEntry],
+        indexed_bytes: int | None = None,
+        date: str | None = None
+    ):
+        """Insert entries and advance the file's indexed byte count; caller holds the lock."""
+        for entry in entries:
+            cursor = self._db.execute(
+                "INSERT INTO entries (file, date, time, offset, text) VALUES (?, ?, ?, ?, ?)",
+                (path.name, entry.date, entry.time, entry.offset, entry.text),
+            )
+            self._db.execute("INSERT INTO entries_fts (rowid, text) VALUES (?, ?)", (cursor.lastrowid, entry.text))
+
+        if indexed_bytes is None:
+            last = entries[-1]
+            indexed_bytes = last.offset + len(format_entry(last.text, last.time).encode("utf-8"))
+        self._db.execute(
+            """
+            INSERT INTO files (name, date, indexed_bytes) VALUES (?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET indexed_bytes = excluded.indexed_bytes
+            """,
+            (path.name, date or entries[0].date, indexed_bytes),
+        )
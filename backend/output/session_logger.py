@@ -1,34 +1,316 @@
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
+from typing import BinaryIO, NamedTuple
 
+from backend import metrics
 from backend.config import Settings
 
+logger = logging.getLogger(__name__)
+
+
+# "### HH:MM:SS" line that opens a timestamped entry
+_ENTRY_MARKER = re.compile(rb"\n### (\d{2}:\d{2}:\d{2})\n")
+_HEADER = re.compile(rb"# Session Log: (\d{4}-\d{2}-\d{2})\n")
+
+
+class SessionEntry(NamedTuple):
+    """An entry as stored in a session file; `offset` is its byte offset."""
+    date: str
+    time: str | None
+    file: Path
+    offset: int
+    text: str
+
+
+def format_header(date: str) -> str:
+    return f"# Session Log: {date}\n"
+
+
+def segments_file(session_file: Path) -> Path:
+    """The JSON Lines sidecar holding segment metadata for a session file's entries."""
+    return session_file.with_name(f"{session_file.stem}.segments.jsonl")
+
+
+def format_entry(text: str, timestamp: str | None) -> str:
+    return f"\n### {timestamp}\n{text}\n" if timestamp else f"\n{text}\n"
+
+
+def parse_header_date(data: bytes) -> str | None:
+    """Return the YYYY-MM-DD date of a session file's header line, if present."""
+    match = _HEADER.match(data)
+    return match.group(1).decode() if match else None
+
+
+def find_entry_markers(buffer, start: int = 0, end: int | None = None) -> Iterator[tuple[int, int, str]]:
+    """
+    Yield `(offset, text_start, time)` for each timestamped entry in `buffer[start:end]`.
+
+    Works on any bytes-like buffer, including an mmap, without copying it.
+    """
+    for marker in _ENTRY_MARKER.finditer(buffer, start, len(buffer) if end is None else end):
+        yield marker.start(), marker.end(), marker.group(1).decode()
+
+
+def parse_entries(data: bytes, file: Path, date: str, start: int = 0) -> Iterator[SessionEntry]:
+    """
+    Parse timestamped entries out of `data`, the bytes of `file` from `start` on.
+
+    Offsets are absolute within the file. Files written without timestamps have
+    no entry boundaries, so their whole body comes back as one entry.
+    """
+    markers = list(_ENTRY_MARKER.finditer(data))
+    if not markers:
+        header = _HEADER.match(data)
+        body_start = header.end() if header else 0
+        text = data[body_start:].decode("utf-8", errors="replace").strip()
+        if text:
+            yield SessionEntry(date, None, file, start + body_start, text)
+        return
+
+    for marker, following in zip(markers, [*markers[1:], None]):
+        end = following.start() if following else len(data)
+        # Entries end with a newline that is not part of the text
+        text = data[marker.end():end].removesuffix(b"\n").decode("utf-8", errors="replace")
+        yield SessionEntry(date, marker.group(1).decode(), file, start + marker.start(), text)
+
+
+class _Entry(NamedTuple):
+    path: Path
+    date: str
+    time: str | None
+    text: str
+    # Resolved once the entry has been written and fsynced (durable appends only)
+    ack: Future | None
+    # Columnar segment metadata for the sidecar file, if any
+    segments: dict | None = None
+
+
+# Queued by flush() and close(); forces an fsync and resolves its future
+_BARRIER = "barrier"
+_STOP = "stop"
+
 
 class SessionLogger:
+    """
+    Appends entries to the day's markdown session file.
+
+    `append` only formats the entry and puts it on a queue; a single writer
+    thread owns the file handle, coalesces whatever is queued into one write,
+    and fsyncs every `fsync_interval` seconds (or immediately for durable
+    appends). The date is taken when the entry is enqueued, so the file rolls
+    over at midnight even if the queue is still draining.
+
+    Listeners added with `add_listener` are called from the writer thread with
+    each batch of `SessionEntry`s once it is written.
+
+    Entries appended with `segments` also get a line in the day's
+    `.segments.jsonl` sidecar, keyed by the entry's byte offset in the
+    markdown file, so the markdown stays readable.
+    """
+
     def __init__(self, settings: Settings):
         self.directory = settings.session.directory
         self.date_format = settings.session.date_format
         self.include_timestamps = settings.session.include_timestamps
+        self.durable = settings.session.durable
+        self.fsync_interval = settings.session.fsync_interval
+        self.max_batch = settings.session.max_batch
 
         # Ensure directory exists
         self.directory.mkdir(parents=True, exist_ok=True)
 
-    def get_session_file(self) -> Path:
-        filename = datetime.now().strftime(self.date_format) + ".md"
+        self._queue: queue.Queue = queue.Queue()
+        self._listeners: list[Callable[[list[SessionEntry]], None]] = []
+        self._file: BinaryIO | None = None
+        self._file_path: Path | None = None
+        self._offset = 0
+        self._dirty = False
+        self._last_sync = time.monotonic()
+        self._closed = False
+        # Orders enqueues against close(), so nothing lands behind the stop marker
+        self._state_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name="session-writer", daemon=True)
+        self._writer.start()
+
+    def get_session_file(self, now: datetime | None = None) -> Path:
+        filename = (now or datetime.now()).strftime(self.date_format) + ".md"
         return self.directory / filename
 
-    def append(self, text: str) -> Path:
-        filepath = self.get_session_file()
-        timestamp = datetime.now().strftime("%H:%M:%S") if self.include_timestamps else ""
+    def add_listener(self, listener: Callable[[list[SessionEntry]], None]):
+        self._listeners.append(listener)
 
-        # If file doesn't exist, start with a header
-        if not filepath.exists():
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(f"# Session Log: {datetime.now().strftime('%Y-%m-%d')}\n")
+    def append(self, text: str, durable: bool | None = None, segments: dict | None = None) -> Path:
+        """
+        Queue `text` for today's session file and return the file's path.
 
-        entry = f"\n### {timestamp}\n{text}\n" if timestamp else f"\n{text}\n"
+        With `durable` (or [session] durable = true) this blocks until the
+        entry has been written and fsynced, and re-raises any write error.
+        `segments` (the transcription's columnar segment metadata) is
+        written to the sidecar alongside the entry. Text that can't be
+        encoded as UTF-8 (e.g. lone surrogates) raises ValueError.
+        """
+        # Fail here rather than in the writer thread
+        text.encode("utf-8")
 
-        with open(filepath, "a", encoding="utf-8") as f:
-            f.write(entry)
+        now = datetime.now()
+        filepath = self.get_session_file(now)
+        timestamp = now.strftime("%H:%M:%S") if self.include_timestamps else None
 
+        ack = Future() if (self.durable if durable is None else durable) else None
+        self._put(_Entry(filepath, now.strftime("%Y-%m-%d"), timestamp, text, ack, segments))
+        if ack is not None:
+            ack.result()
         return filepath
+
+    def flush(self, timeout: float | None = None):
+        """Block until everything queued so far is written and fsynced."""
+        barrier: Future = Future()
+        self._put((_BARRIER, barrier))
+        barrier.result(timeout)
+
+    def close(self):
+        """Drain the queue, fsync and close the file. Safe to call twice."""
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put((_STOP, None))
+        self._writer.join()
+
+    def _put(self, item):
+        with self._state_lock:
+            if self._closed:
+                raise RuntimeError("SessionLogger is closed")
+            if not self._writer.is_alive():
+                raise RuntimeError("Session writer thread has stopped")
+            self._queue.put(item)
+
+    # --- Writer thread ---
+
+    def _run(self):
+        while True:
+            timeout = max(self.fsync_interval - (time.monotonic() - self._last_sync), 0.01)
+            try:
+                item = self._queue.get(timeout=timeout if self._dirty else None)
+            except queue.Empty:
+                self._sync()
+                continue
+
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if self._write_batch(batch):
+                self._close_file()
+                return
+
+    def _write_batch(self, batch: list) -> bool:
+        """Write a batch; returns True once the stop marker has been seen."""
+        entries = [item for item in batch if isinstance(item, _Entry)]
+        controls = [item for item in batch if not isinstance(item, _Entry)]
+        acks = [entry.ack for entry in entries if entry.ack is not None]
+        acks += [future for kind, future in controls if kind == _BARRIER]
+        stop = any(kind == _STOP for kind, _ in controls)
+
+        started = time.perf_counter()
+        written: list[SessionEntry] = []
+        try:
+            # Group consecutive entries by file so each group is one write
+            groups: list[list[_Entry]] = []
+            for entry in entries:
+                if groups and groups[-1][0].path == entry.path:
+                    groups[-1].append(entry)
+                else:
+                    groups.append([entry])
+            for group in groups:
+                handle = self._open(group[0].path, group[0].date)
+                chunks = []
+                sidecar = []
+                offset = self._offset
+                for entry in group:
+                    chunk = format_entry(entry.text, entry.time).encode("utf-8")
+                    written.append(SessionEntry(entry.date, entry.time, entry.path, offset, entry.text))
+                    if entry.segments is not None:
+                        record = {"time": entry.time, "offset": offset, "segments": entry.segments}
+                        sidecar.append(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+                    chunks.append(chunk)
+                    offset += len(chunk)
+                handle.write(b"".join(chunks))
+                handle.flush()
+                self._offset = offset
+                self._dirty = True
+                if sidecar:
+                    # Rare and small, so opened per batch rather than held open
+                    with open(segments_file(group[0].path), "ab") as f:
+                        f.write(b"".join(sidecar))
+                        if acks or stop:
+                            f.flush()
+                            os.fsync(f.fileno())
+
+            if acks or stop or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+        except Exception as e:
+            # Only this batch fails; the writer keeps serving later appends
+            logger.error(f"Failed to write session entries: {e}")
+            self._close_file()
+            for ack in acks:
+                ack.set_exception(e)
+            return stop
+
+        if entries:
+            metrics.SESSION_WRITE_SECONDS.observe(time.perf_counter() - started)
+        for ack in acks:
+            ack.set_result(None)
+        for listener in self._listeners:
+            try:
+                listener(written)
+            except Exception as e:
+                logger.error(f"Session listener failed: {e}")
+        return stop
+
+    def _open(self, path: Path, date: str) -> BinaryIO:
+        if self._file is not None and self._file_path == path:
+            return self._file
+
+        # Date rolled over (or first write): finish the previous day's file
+        self._close_file()
+        # Held open across batches and closed in _close_file
+        self._file = open(path, "ab")  # noqa: SIM115
+        self._file_path = path
+        # Start new files with a header; append mode positions at the end
+        self._offset = self._file.tell()
+        if self._offset == 0:
+            header = format_header(date).encode("utf-8")
+            self._file.write(header)
+            self._offset = len(header)
+        return self._file
+
+    def _sync(self):
+        if self._file is not None and self._dirty:
+            os.fsync(self._file.fileno())
+        self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def _close_file(self):
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            self._sync()
+            self._file.close()
+        except OSError as e:
+            logger.error(f"Failed to close session file {self._file_path}: {e}")
+        self._file = None
+        self._file_path = None
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from typing import Literal
+
+from pydantic import BaseModel
+
+from backend import metrics
+from backend.engine import LLMEngine, TranscriptionPool
+from backend.output import SessionLogger
+
+logger = logging.getLogger(__name__)
+
+StepStatus = Literal["pending", "running", "ok", "failed", "skipped"]
+
+
+class PipelineError(ValueError):
+    """The step list can't be run (unknown step, or nothing to feed a step)."""
+
+
+class StepResult(BaseModel):
+    step: str
+    status: StepStatus = "pending"
+    # Text produced by transcribe/refine, or the session file written by append
+    output: str | None = None
+    # Milliseconds from the start of the pipeline, and spent in the step
+    start_ms: float | None = None
+    duration_ms: float | None = None
+    error: str | None = None
+
+
+class PipelineResult(BaseModel):
+    # Output of the last transcribe/refine step (or the input text)
+    text: str | None
+    steps: list[StepResult]
+    total_ms: float
+
+    @property
+    def ok(self) -> bool:
+        return all(step.status == "ok" for step in self.steps)
+
+
+def parse_steps(steps: list[str], has_audio: bool, has_text: bool) -> list[tuple[str, str | None]]:
+    """
+    Validate `steps` and split them into (kind, argument) pairs.
+
+    `transcribe` must come first and needs audio; `refine:<template>` and
+    `append` need text from the input or an earlier step.
+    """
+    parsed = []
+    has_source = has_text
+    for i, step in enumerate(steps):
+        kind, _, argument = step.partition(":")
+        if kind == "transcribe":
+            if i != 0 or not has_audio:
+                raise PipelineError("'transcribe' must be the first step and needs an audio file")
+            has_source = True
+        elif kind == "refine":
+            if not argument:
+                raise PipelineError("'refine' needs a template, e.g. 'refine:fix_grammar'")
+        elif kind != "append":
+            raise PipelineError(f"Unknown pipeline step '{step}'")
+        if kind != "transcribe" and not has_source:
+            raise PipelineError(f"'{step}' has no text to work on; start with 'transcribe' or send text")
+        parsed.append((kind, argument or None))
+    if not parsed:
+        raise PipelineError("No pipeline steps given")
+    return parsed
+
+
+class Pipeline:
+    """
+    Runs transcribe/refine/append steps server-side as a small DAG.
+
+    Each step works on the text of the closest preceding transcribe or
+    refine step. `append` produces no text, so nothing waits for it: in
+    `transcribe, append, refine:fix_grammar` the raw text is written to the
+    session file while the refinement is already running.
+    """
+
+    def __init__(self, pool: TranscriptionPool, llm_engine: LLMEngine, session_logger: SessionLogger):
+        self.pool = pool
+        self.llm_engine = llm_engine
+        self.session_logger = session_logger
+
+    async def run(
+        self,
+        steps: list[str],
+        audio: bytes | None = None,
+        text: str | None = None,
+        model: str | None = None,
+        provider: str | None = None,
+        on_step: Callable[[StepResult], None] | None = None
+    ) -> PipelineResult:
+        parsed = parse_steps(steps, audio is not None, text is not None)
+        results = [StepResult(step=step) for step in steps]
+        started = time.perf_counter()
+
+        async def source_text() -> str:
+            return text
+
+        async def run_step(index: int, kind: str, argument: str | None, source) -> str | None:
+            result = results[index]
+            try:
+                input_text = await source
+            except Exception:
+                result.status = "skipped"
+                raise
+
+            result.status = "running"
+            step_started = time.perf_counter()
+            result.start_ms = (step_started - started) * 1000
+            if on_step is not None:
+                on_step(result)
+            try:
+                output = await self._run_step(kind, argument, audio, input_text, model, provider)
+            except Exception as e:
+                logger.error(f"Pipeline step '{result.step}' failed: {e}")
+                result.status = "failed"
+                result.error = str(e)
+                raise
+            finally:
+                result.duration_ms = (time.perf_counter() - step_started) * 1000
+                metrics.add_server_timing(f"step{index}_{kind}", result.duration_ms / 1000)
+            result.status = "ok"
+            result.output = output
+            if on_step is not None:
+                on_step(result)
+            return output
+
+        # Text-producing steps chain on each other; append steps branch off
+        source = asyncio.ensure_future(source_text())
+        tasks = []
+        for index, (kind, argument) in enumerate(parsed):
+            task = asyncio.ensure_future(run_step(index, kind, argument, source))
+            tasks.append(task)
+            if kind != "append":
+                source = task
+
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        # A step whose worker job was cancelled (e.g. on shutdown) has no exception() to ask for
+        finished = source.done() and not source.cancelled() and source.exception() is None
+        last_text = source.result() if finished else None
+        return PipelineResult(
+            text=last_text,
+            steps=results,
+            total_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    async def _run_step(
+        self,
+        kind: str,
+        argument: str | None,
+        audio: bytes | None,
+        text: str | None,
+        model: str | None,
+        provider: str | None
+    ) -> str:
+        if kind == "transcribe":
+            result = await self.pool.transcribe(audio, model)
+            for stage, seconds in result.timings.items():
+                metrics.observe(metrics.TRANSCRIPTION_STAGE_SECONDS, seconds, stage=stage)
+            metrics.TRANSCRIPTIONS_TOTAL.inc(cached=str(result.cached).lower())
+            return result.text
+        if kind == "refine":
+            result = await self.llm_engine.refine(text, argument, provider)
+            return result.text
+        path = await asyncio.to_thread(self.session_logger.append, text)
+        return str(path)
@@ -1,11 +1,14 @@
 const API_URL = "http://localhost:8765/api";
+const WS_URL = API_URL.replace(/^http/, "ws");
 const STORAGE_KEY = "dictator.offline.transcript";
 
 const state = {
     isRecording: false,
     isOffline: true,
     transcript: "",
-    autosaveTimer: null
+    autosaveTimer: null,
+    stream: null,
+    apiReady: false
 };
 
 const recorder = new AudioRecorder();
@@ -44,7 +47,9 @@ async function toggleRecording() {
 
 async function startRecording() {
     try {
-        await recorder.start();
+        state.stream = await openTranscriptionStream();
+        const onChunk = state.stream ? (chunk) => state.stream.send(chunk) : null;
+        await recorder.start(onChunk);
         state.isRecording = true;
         updateUI();
     } catch (err) {
@@ -61,6 +66,17 @@ async function stopRecording() {
 
     try {
         const audioBlob = await recorder.stop();
+        const stream = state.stream;
+        state.stream = null;
+
+        if (stream) {
+            try {
+                await finishTranscriptionStream(stream);
+                return;
+            } catch (err) {
+                console.warn("Streaming transcription failed, falling back to upload:", err);
+            }
+        }
         if (audioBlob) {
             await transcribe(audioBlob);
         }
@@ -87,13 +103,81 @@ async function transcribe(audioBlob) {
         const data = await res.json();
         state.transcript = data.text;
         ui.transcript.value = state.transcript;
-        ui.status.textContent = "Transcribed";
+        const timing = formatServerTiming(res.headers.get("Server-Timing"));
+        ui.status.textContent = timing ? `Transcribed (${timing})` : "Transcribed";
     } catch (err) {
         console.error(err);
         ui.status.textContent = "Error during transcription";
     }
 }
 
+// "decode;dur=18.4, inference;dur=842.0" -> "decode 18ms · inference 842ms"
+function formatServerTiming(header) {
+    if (!header) return "";
+    return header.split(",")
+        .map(entry => entry.trim().match(/^([\w-]+);dur=([\d.]+)$/))
+        .filter(Boolean)
+        .map(([, name, dur]) => `${name.replace("_", " ")} ${Math.round(Number(dur))}ms`)
+        .join(" · ");
+}
+
+// --- Streaming transcription ---
+
+function openTranscriptionStream() {
+    return new Promise((resolve) => {
+        let ws;
+        try {
+            ws = new WebSocket(`${WS_URL}/ws/transcribe`);
+        } catch {
+            resolve(null);
+            return;
+        }
+        // `error` keeps a failure that arrives before finishTranscriptionStream waits
+        const stream = { ws, finalText: "", done: null, error: null };
+
+        ws.onopen = () => resolve(stream);
+        ws.onerror = () => resolve(null);
+        ws.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.type === "final") {
+                stream.finalText = `${stream.finalText} ${message.text}`.trim();
+                ui.transcript.value = stream.finalText;
+            } else if (message.type === "partial") {
+                ui.transcript.value = `${stream.finalText} ${message.text}`.trim();
+            } else if (message.type === "done" && stream.done) {
+                stream.done.resolve(message.text);
+            } else if (message.type === "error") {
+                stream.error = new Error(message.detail);
+                if (stream.done) stream.done.reject(stream.error);
+            }
+        };
+        ws.onclose = (event) => {
+            // e.g. 1013 when the server's transcription pool is full
+            stream.error ??= new Error(`Stream closed before completion (${event.code})`);
+            if (stream.done) stream.done.reject(stream.error);
+        };
+        stream.send = (chunk) => {
+            if (ws.readyState === WebSocket.OPEN) ws.send(chunk);
+        };
+    });
+}
+
+async function finishTranscriptionStream(stream) {
+    ui.status.textContent = "Finalizing...";
+    const text = await new Promise((resolve, reject) => {
+        if (stream.error || stream.ws.readyState !== WebSocket.OPEN) {
+            reject(stream.error ?? new Error("Stream is not open"));
+            return;
+        }
+        stream.done = { resolve, reject };
+        stream.ws.send(JSON.stringify({ type: "stop" }));
+    });
+    state.transcript = text;
+    ui.transcript.value = state.transcript;
+    updateStats(state.transcript);
+    ui.status.textContent = "Transcribed";
+}
+
 function getAudioExtension(mimeType) {
     if (!mimeType) return "wav";
 
@@ -142,7 +226,7 @@ async function refineText(templateName) {
     ui.status.textContent = `Refining (${templateName})...`;
 
     try {
-        const res = await fetch(`${API_URL}/refine`, {
+        const res = await fetch(`${API_URL}/refine/stream`, {
             method: "POST",
             headers: { "Content-Type": "application/json" },
             body: JSON.stringify({
@@ -153,17 +237,87 @@ async function refineText(templateName) {
 
         if (!res.ok) throw new Error(await res.text());
 
-        const data = await res.json();
-        ui.transcript.value = data.text;
+        let refined = "";
+        for await (const { event, data } of readServerEvents(res)) {
+            if (event === "token") {
+                refined += data.text;
+                ui.transcript.value = refined;
+            } else if (event === "done") {
+                refined = data.text;
+                ui.transcript.value = refined;
+            } else if (event === "error") {
+                throw new Error(data.detail);
+            }
+        }
+
         ui.status.textContent = "Refined";
-        state.transcript = data.text;
+        state.transcript = refined;
+        updateStats(state.transcript);
     } catch (err) {
         console.error(err);
+        ui.transcript.value = text;
         ui.status.textContent = "Refinement failed";
         alert("Refinement failed. Check backend logs and API keys.");
     }
 }
 
+// Run several steps (e.g. "refine:fix_grammar,append") in one round trip
+async function runPipeline(steps) {
+    if (state.isOffline) {
+        ui.status.textContent = "Offline-only: pipeline disabled";
+        return;
+    }
+    const text = ui.transcript.value;
+    if (!text) return;
+
+    ui.status.textContent = `Running ${steps}...`;
+    const form = new FormData();
+    form.append("steps", steps);
+    form.append("text", text);
+
+    try {
+        const res = await fetch(`${API_URL}/pipeline`, { method: "POST", body: form });
+        const data = await res.json();
+        const timings = data.steps.map((step) => `${step.step} ${Math.round(step.duration_ms ?? 0)}ms`);
+        console.log("Pipeline steps:", timings.join(", "));
+        if (data.text) {
+            state.transcript = data.text;
+            ui.transcript.value = data.text;
+            updateStats(data.text);
+        }
+        if (!res.ok) throw new Error(data.steps.find((step) => step.error)?.error ?? res.statusText);
+        ui.status.textContent = `Done: ${timings.join(", ")}`;
+    } catch (err) {
+        console.error(err);
+        ui.status.textContent = "Pipeline failed";
+    }
+}
+
+// Parse a text/event-stream response body into {event, data} messages
+async function* readServerEvents(res) {
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) return;
+        buffer += value;
+
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = "message";
+            let data = "";
+            for (const line of message.split("\n")) {
+                if (line.startsWith("event: ")) event = line.slice(7);
+                else if (line.startsWith("data: ")) data += line.slice(6);
+            }
+            yield { event, data: data ? JSON.parse(data) : {} };
+        }
+    }
+}
+
 function copyToClipboard() {
     const text = ui.transcript.value;
     if (!text) return;
@@ -231,7 +385,9 @@ function updateOfflineMode() {
     } else if (!state.isRecording) {
         ui.btnRefine.disabled = false;
     }
-    ui.apiStatus.textContent = state.isOffline ? "API: Local-only" : ui.apiStatus.textContent;
+    if (state.isOffline || ui.status.classList.contains('connected')) {
+        setApiState(state.apiReady);
+    }
 }
 
 // --- UI Updates ---
@@ -253,26 +409,80 @@ function updateUI() {
 
 // --- Initialization ---
 
-async function checkAPI() {
-    try {
-        const res = await fetch(`${API_URL}/health`);
-        if (res.ok) {
-            if (ui.status.textContent === "Disconnected" || ui.status.textContent === "API Disconnected") {
-                ui.status.textContent = "Connected";
-            }
-            ui.status.classList.remove('disconnected');
-            ui.status.classList.add('connected');
-            ui.apiStatus.textContent = state.isOffline ? "API: Local-only" : "API: OK";
-        } else {
-            throw new Error();
+function setConnected(connected) {
+    if (connected) {
+        if (ui.status.textContent === "Disconnected" || ui.status.textContent === "API Disconnected") {
+            ui.status.textContent = "Connected";
         }
-    } catch {
+        ui.status.classList.remove('disconnected');
+        ui.status.classList.add('connected');
+    } else {
         ui.status.classList.remove('connected');
         ui.status.classList.add('disconnected');
         ui.apiStatus.textContent = "API: Offline";
     }
 }
 
+function setApiState(ready, queueDepth = 0) {
+    let apiState = ready ? "API: OK" : "API: Loading model";
+    if (queueDepth > 0) apiState += ` (${queueDepth} queued)`;
+    ui.apiStatus.textContent = state.isOffline ? "API: Local-only" : apiState;
+}
+
+async function checkAPI() {
+    try {
+        const res = await fetch(`${API_URL}/health`);
+        if (!res.ok) throw new Error();
+        setConnected(true);
+        const data = await res.json();
+        state.apiReady = data.ready;
+        setApiState(data.ready);
+    } catch {
+        setConnected(false);
+    }
+}
+
+// Server-pushed state instead of polling /health. EventSource reconnects on
+// its own and sends Last-Event-ID, so events missed while away are replayed.
+function connectEvents() {
+    const source = new EventSource(`${API_URL}/events`);
+    const on = (name, handler) => source.addEventListener(name, (e) => handler(JSON.parse(e.data)));
+
+    source.onopen = () => setConnected(true);
+    source.onerror = () => setConnected(false);
+    on("state", (data) => {
+        state.apiReady = data.ready;
+        setApiState(data.ready, data.queue_depth);
+    });
+    on("model_ready", () => {
+        state.apiReady = true;
+        setApiState(true);
+    });
+    on("model_error", (data) => console.error("Model warm-up failed:", data.detail));
+    on("queue_depth", (data) => setApiState(state.apiReady, data.queue_depth));
+    on("templates_changed", () => loadTemplates());
+    // Too much was missed to replay; fall back to a fresh snapshot
+    on("reset", () => checkAPI());
+    return source;
+}
+
+// Fill the template picker from the server; the options in index.html are
+// only a fallback for when the API is unreachable
+async function loadTemplates() {
+    try {
+        const res = await fetch(`${API_URL}/templates`);
+        if (!res.ok) return;
+        const data = await res.json();
+        const selected = ui.selectTemplate.value || data.default;
+        ui.selectTemplate.replaceChildren(...data.templates.map(({ name }) => {
+            const label = name.split("_").map((word) => word[0].toUpperCase() + word.slice(1)).join(" ");
+            return new Option(label, name, false, name === selected);
+        }));
+    } catch (err) {
+        console.error("Could not load templates:", err);
+    }
+}
+
 // MIDI Callback
 function handleAction(action) {
     console.log("MIDI Action:", action);
@@ -284,6 +494,11 @@ function handleAction(action) {
         return;
     }
 
+    if (action.startsWith("pipeline:")) {
+        runPipeline(action.slice("pipeline:".length));
+        return;
+    }
+
     if (action.startsWith("open_browser:")) {
         // Just inform user, browser cannot reliably open new tabs from MIDI background event
         // without user interaction in some contexts, but let's try
@@ -365,5 +580,10 @@ if (savedTranscript) {
 }
 setAutosaveStatus("Idle");
 updateOfflineMode();
-checkAPI();
-setInterval(checkAPI, 5000);
+loadTemplates();
+if (window.EventSource) {
+    connectEvents();
+} else {
+    checkAPI();
+    setInterval(checkAPI, 5000);
+}
@@ -5,7 +5,7 @@ class AudioRecorder {
         this.mimeType = "";
     }
 
-    async start() {
+    async start(onChunk = null, timeslice = 1000) {
         const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
         this.mimeType = this.#pickMimeType();
         const options = this.mimeType ? { mimeType: this.mimeType } : undefined;
@@ -14,9 +14,15 @@ class AudioRecorder {
 
         this.mediaRecorder.ondataavailable = (event) => {
             this.audioChunks.push(event.data);
+            if (onChunk && event.data.size > 0) onChunk(event.data);
         };
 
-        this.mediaRecorder.start();
+        // With a chunk callback, emit data every `timeslice` ms for streaming
+        if (onChunk) {
+            this.mediaRecorder.start(timeslice);
+        } else {
+            this.mediaRecorder.start();
+        }
     }
 
     stop() {
@@ -0,0 +1,460 @@
+"""
+End-to-end benchmark for The Dictator backend.
+
+Starts the API with a throwaway config (or targets a running one with --url),
+serves a stub LLM speaking Ollama's chat API, and drives
+/api/transcribe, /api/refine and /api/session/append at a configurable
+concurrency. Reports throughput, p50/p95/p99 latency and peak RSS, and writes
+the results as JSON so runs can be compared between commits.
+
+Usage:
+    python scripts/benchmark.py --concurrency 4 --requests 20
+    python scripts/benchmark.py --scenarios refine session_append --compare benchmarks/results/<old>.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+try:
+    import av
+except ImportError:
+    av = None
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = PROJECT_DIR / "benchmarks" / "results"
+SAMPLE_RATE = 16000
+SCENARIOS = ("transcribe", "refine", "session_append")
+
+SAMPLE_TEXT = (
+    "so i was thinking we could move the standup to ten thirty and um "
+    "maybe split the design review into two shorter sessions next week"
+)
+
+
+# --- Fixtures ---
+
+def make_speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    """
+    Synthesize a voice-like signal: a gliding glottal pitch with formant-shaped
+    harmonics, chopped into syllables and words with pauses in between. It
+    has speech's spectral and temporal shape, so VAD and Whisper do the same
+    amount of work as on real dictation.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t) + 10 * np.sin(2 * np.pi * 5.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    formants = np.array([700.0, 1200.0, 2600.0])
+    voice = np.zeros(n)
+    for k in range(1, 25):
+        # Weight each harmonic by its distance to the nearest formant
+        freq = k * pitch
+        gain = np.exp(-(((freq[:, None] - formants) / 150.0) ** 2)).sum(axis=1) + 0.02
+        voice += gain * np.sin(k * phase) / k
+
+    # ~4 syllables per second, words separated by short and occasional long pauses
+    syllables = np.clip(np.sin(2 * np.pi * 4.0 * t + rng.uniform(0, np.pi)), 0, None) ** 0.6
+    words = np.ones(n)
+    position = 0
+    while position < n:
+        word = int(rng.uniform(0.3, 0.9) * SAMPLE_RATE)
+        pause = int(rng.choice([0.12, 0.2, 0.8], p=[0.6, 0.3, 0.1]) * SAMPLE_RATE)
+        words[position + word:position + word + pause] = 0
+        position += word + pause
+
+    signal = voice * syllables * words
+    signal += rng.normal(0, 0.003, n)
+    signal /= np.abs(signal).max() + 1e-9
+    return (signal * 0.5).astype(np.float32)
+
+
+def encode_wav(samples: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def encode_webm(samples: np.ndarray) -> bytes:
+    """Encode as webm/opus, the format MediaRecorder produces in Chrome."""
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=48000, layout="mono")
+        frame = av.AudioFrame.from_ndarray(samples.reshape(1, -1), format="flt", layout="mono")
+        frame.rate = SAMPLE_RATE
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=48000)
+        for resampled in [*resampler.resample(frame), *resampler.resample(None)]:
+            for packet in stream.encode(resampled):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def build_fixtures(lengths: list[float], formats: list[str]) -> list[tuple[str, str, bytes]]:
+    fixtures = []
+    for i, seconds in enumerate(lengths):
+        samples = make_speech_like(seconds, seed=i)
+        for fmt in formats:
+            if fmt == "webm" and av is None:
+                print("PyAV not installed; skipping webm fixtures")
+                continue
+            data = encode_wav(samples) if fmt == "wav" else encode_webm(samples)
+            fixtures.append((f"{seconds:g}s.{fmt}", f"audio/{fmt}", data))
+    return fixtures
+
+
+# --- Stub LLM ---
+
+def start_stub_llm(delay_ms: float) -> ThreadingHTTPServer:
+    """Serve /api/chat like Ollama's native API."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt = body["messages"][-1]["content"]
+            reply = prompt[-200:].strip().capitalize()
+            time.sleep(delay_ms / 1000)
+            counts = {"prompt_eval_count": len(prompt.split()), "eval_count": len(reply.split())}
+
+            if body.get("stream", True):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for word in reply.split(" "):
+                    chunk = {"model": body["model"], "message": {"role": "assistant", "content": word + " "},
+                             "done": False}
+                    self.wfile.write(f"{json.dumps(chunk)}\n".encode())
+                done = {"model": body["model"], "message": {"role": "assistant", "content": ""}, "done": True,
+                        **counts}
+                self.wfile.write(f"{json.dumps(done)}\n".encode())
+                return
+
+            payload = json.dumps({
+                "model": body["model"],
+                "message": {"role": "assistant", "content": reply},
+                "done": True,
+                **counts,
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --- Backend process ---
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def toml_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return json.dumps(str(value))
+
+
+def write_config(path: Path, tables: dict[str, dict]):
+    lines = []
+    for table, values in tables.items():
+        lines.append(f"[{table}]")
+        lines.extend(f"{key} = {toml_value(value)}" for key, value in values.items())
+        lines.append("")
+    path.write_text("\n".join(lines))
+
+
+def start_backend(args, workdir: Path, llm_url: str) -> tuple[subprocess.Popen, str]:
+    port = free_port()
+    config = workdir / "settings.toml"
+    write_config(config, {
+        "server": {"host": "127.0.0.1", "port": port},
+        "audio": {},
+        # Warm up only when transcription is measured; it needs the model
+        "transcription": {"model": args.model, "language": "en", "warmup": "transcribe" in args.scenarios},
+        "vad": {},
+        "session": {"directory": workdir / "transcripts"},
+        "llm": {"default_provider": "ollama"},
+        "llm.ollama": {"base_url": llm_url, "model": "bench"},
+        "cluster": {},
+        "templates": {"directory": PROJECT_DIR / "prompts", "default": "fix_grammar"},
+        "workers": {"count": args.workers, "max_queue": max(args.concurrency * 2, 8)},
+        "batching": {"enabled": args.batching},
+        "cache.transcription": {"enabled": args.with_cache},
+        "cache.llm": {"enabled": args.with_cache},
+    })
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=PROJECT_DIR,
+        env={**os.environ, "DICTATOR_CONFIG": str(config)},
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+def wait_until_ready(base_url: str, timeout: float, endpoint: str, process: subprocess.Popen | None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Backend exited with code {process.returncode} before becoming ready")
+        try:
+            if httpx.get(f"{base_url}{endpoint}", timeout=2).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Backend at {base_url} was not ready after {timeout:.0f}s")
+
+
+def peak_rss_mb(pid: int) -> float | None:
+    """Peak resident set size of a process (Linux VmHWM)."""
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+# --- Load generation ---
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Linearly interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, make_request, total: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+                if response.status_code >= 400:
+                    errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+                    continue
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "name": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 3),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "max": round(latencies[-1], 2) if latencies else None,
+        },
+    }
+    print(
+        f"{name:<28} {result['throughput_rps']:>8.2f} req/s   "
+        f"p50 {result['latency_ms']['p50']:>9.1f}ms   p95 {result['latency_ms']['p95']:>9.1f}ms   "
+        f"p99 {result['latency_ms']['p99']:>9.1f}ms   errors {sum(errors.values())}"
+    )
+    return result
+
+
+async def run_all(args, base_url: str, fixtures) -> list[dict]:
+    results = []
+    timeout = httpx.Timeout(300.0)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        if "transcribe" in args.scenarios:
+            for label, content_type, data in fixtures:
+                async def transcribe(client, _i, label=label, content_type=content_type, data=data):
+                    files = {"file": (f"bench-{label}", data, content_type)}
+                    return await client.post("/api/transcribe", files=files)
+
+                await transcribe(client, -1)  # warm-up, not measured
+                results.append(await run_scenario(
+                    client, f"transcribe[{label}]", transcribe, args.requests, args.concurrency
+                ))
+
+        if "refine" in args.scenarios:
+            async def refine(client, i):
+                # Vary the text so the response cache can't short-circuit runs that enable it
+                text = f"{SAMPLE_TEXT} ({i})" if not args.with_cache else SAMPLE_TEXT
+                return await client.post("/api/refine", json={"text": text, "template": args.template})
+
+            results.append(await run_scenario(client, "refine", refine, args.requests, args.concurrency))
+
+        if "session_append" in args.scenarios:
+            async def append(client, i):
+                return await client.post("/api/session/append", json={"text": f"{SAMPLE_TEXT} #{i}"})
+
+            results.append(await run_scenario(client, "session_append", append, args.requests, args.concurrency))
+    return results
+
+
+# --- Reporting ---
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline_path: Path):
+    baseline = json.loads(baseline_path.read_text())
+    previous = {s["name"]: s for s in baseline["scenarios"]}
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    for scenario in current["scenarios"]:
+        old = previous.get(scenario["name"])
+        if old is None:
+            continue
+
+        def delta(new, before):
+            if not before or new is None:
+                return "   n/a"
+            return f"{(new - before) / before * 100:+6.1f}%"
+
+        print(
+            f"{scenario['name']:<28} throughput {delta(scenario['throughput_rps'], old['throughput_rps'])}   "
+            f"p50 {delta(scenario['latency_ms']['p50'], old['latency_ms']['p50'])}   "
+            f"p95 {delta(scenario['latency_ms']['p95'], old['latency_ms']['p95'])}   "
+            f"p99 {delta(scenario['latency_ms']['p99'], old['latency_ms']['p99'])}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark an already running backend instead of starting one")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per scenario")
+    parser.add_argument("--lengths", type=float, nargs="+", default=[2.0, 8.0, 20.0], help="Fixture lengths (s)")
+    parser.add_argument("--formats", nargs="+", choices=["wav", "webm"], default=["wav", "webm"])
+    parser.add_argument("--model", default="tiny", help="Whisper model for the started backend")
+    parser.add_argument("--workers", type=int, default=1, help="[workers] count for the started backend")
+    parser.add_argument("--batching", action="store_true", help="Enable [batching] on the started backend")
+    parser.add_argument("--with-cache", action="store_true", help="Keep result caches enabled")
+    parser.add_argument("--template", default="fix_grammar")
+    parser.add_argument("--llm-delay-ms", type=float, default=50.0, help="Latency of the stub LLM")
+    parser.add_argument("--ready-timeout", type=float, default=600.0, help="Seconds to wait for model warm-up")
+    parser.add_argument("--output", type=Path, help="Where to write the JSON results")
+    parser.add_argument("--compare", type=Path, help="Previous JSON results to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fixtures = build_fixtures(args.lengths, args.formats) if "transcribe" in args.scenarios else []
+
+    stub = start_stub_llm(args.llm_delay_ms)
+    llm_url = f"http://127.0.0.1:{stub.server_address[1]}"
+    process = None
+    with tempfile.TemporaryDirectory(prefix="dictator-bench-") as tmp:
+        try:
+            if args.url:
+                base_url = args.url.rstrip("/")
+                print(f"Benchmarking {base_url} (refine hits its configured provider, not the stub)")
+            else:
+                process, base_url = start_backend(args, Path(tmp), llm_url)
+                print(f"Started backend at {base_url} (model {args.model}, stub LLM at {llm_url})")
+            # /api/ready waits for the Whisper model; /api/health only for the server
+            endpoint = "/api/ready" if "transcribe" in args.scenarios else "/api/health"
+            wait_until_ready(base_url, args.ready_timeout, endpoint, process)
+
+            scenarios = asyncio.run(run_all(args, base_url, fixtures))
+            server_rss = peak_rss_mb(process.pid) if process else None
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+            stub.shutdown()
+
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "options": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "model": None if args.url else args.model,
+            "workers": None if args.url else args.workers,
+            "batching": args.batching,
+            "with_cache": args.with_cache,
+            "llm_delay_ms": args.llm_delay_ms,
+        },
+        "fixtures": [{"name": label, "bytes": len(data)} for label, _, data in fixtures],
+        "scenarios": scenarios,
+        "peak_rss_mb": {
+            "server": round(server_rss, 1) if server_rss is not None else None,
+            # ru_maxrss is in KB on Linux
+            "client": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+    }
+    print(f"\nPeak RSS: server {results['peak_rss_mb']['server']} MB, client {results['peak_rss_mb']['client']} MB")
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{results['commit'] or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
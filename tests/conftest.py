@@ -1,10 +1,22 @@
 """
 Pytest configuration and fixtures for The Dictator tests.
 """
+import io
+import wave
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
+from backend.config.models import (
+    AudioConfig,
+    BatchingConfig,
+    TranscriptionConfig,
+    VadConfig,
+    WorkersConfig,
+)
+
 
 @pytest.fixture
 def project_root() -> Path:
@@ -22,3 +34,41 @@ def config_dir(project_root: Path) -> Path:
 def prompts_dir(project_root: Path) -> Path:
     """Return the prompts directory."""
     return project_root / "prompts"
+
+
+@pytest.fixture
+def make_transcriber():
+    """Build a Transcriber whose default Whisper model is the given mock."""
+    from backend.engine import Transcriber
+
+    def factory(whisper_model, vad: VadConfig | None = None, batch_size: int = 8, **transcription) -> Transcriber:
+        settings = MagicMock()
+        settings.transcription = TranscriptionConfig(**transcription)
+        settings.audio = AudioConfig()
+        settings.vad = vad or VadConfig()
+        settings.workers = WorkersConfig()
+        settings.batching = BatchingConfig(max_batch_size=batch_size)
+        with patch("backend.engine.transcriber.WhisperModel", return_value=whisper_model):
+            transcriber = Transcriber(settings)
+            transcriber.load_model()
+        return transcriber
+
+    return factory
+
+
+@pytest.fixture
+def make_wav():
+    """Encode a 220 Hz tone as 16-bit PCM WAV bytes."""
+
+    def factory(seconds: float, sample_rate: int = 16000, channels: int = 1) -> bytes:
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(channels)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            t = np.arange(int(seconds * sample_rate)) / sample_rate
+            tone = (np.sin(2 * np.pi * 220 * t) * 8000).astype("<i2")
+            wav.writeframes(np.repeat(tone, channels).tobytes())
+        return buffer.getvalue()
+
+    return factory
@@ -0,0 +1,130 @@
+"""
+Tests for micro-batched transcription.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from backend.config.models import BatchingConfig, VadConfig
+from backend.engine.transcriber import SAMPLE_RATE, TranscriptionBatcher
+
+
+@pytest.mark.asyncio
+async def test_batcher_groups_concurrent_requests():
+    batches = []
+
+    async def run_batch(audios):
+        batches.append(audios)
+        return [audio.decode().upper() for audio in audios]
+
+    batcher = TranscriptionBatcher(BatchingConfig(max_batch_size=8, max_wait_ms=20), run_batch)
+    results = await asyncio.gather(*(batcher.submit(word.encode()) for word in ["a", "b", "c"]))
+
+    assert results == ["A", "B", "C"]
+    assert batches == [[b"a", b"b", b"c"]]
+
+
+@pytest.mark.asyncio
+async def test_batcher_flushes_at_max_batch_size_and_propagates_errors():
+    calls = []
+
+    async def run_batch(audios):
+        calls.append(len(audios))
+        raise RuntimeError("model exploded")
+
+    batcher = TranscriptionBatcher(BatchingConfig(max_batch_size=2, max_wait_ms=10_000), run_batch)
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.submit(b"a"), batcher.submit(b"b"), return_exceptions=True),
+        timeout=1,
+    )
+
+    assert calls == [2]
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_transcribe_batch_maps_segments_back_to_clips(make_transcriber):
+    transcriber = make_transcriber(MagicMock(), vad=VadConfig(enabled=False), language="en")
+
+    clips = {b"one": np.zeros(2 * SAMPLE_RATE, dtype=np.float32), b"two": np.zeros(3 * SAMPLE_RATE, dtype=np.float32)}
+    pipeline = MagicMock()
+    pipeline.transcribe.return_value = (
+        [
+            SimpleNamespace(start=0.0, text=" First clip."),
+            SimpleNamespace(start=2.0, text=" Second"),
+            SimpleNamespace(start=3.5, text=" clip."),
+        ],
+        MagicMock(),
+    )
+
+    with (
+        patch("backend.engine.transcriber.load_audio", side_effect=lambda data, config: clips[data]),
+        patch("backend.engine.transcriber.BatchedInferencePipeline", return_value=pipeline),
+    ):
+        results = transcriber.transcribe_batch([b"one", b"two"])
+
+    assert [r.text for r in results] == ["First clip.", "Second clip."]
+    kwargs = pipeline.transcribe.call_args[1]
+    assert kwargs["clip_timestamps"] == [{"start": 0.0, "end": 2.0}, {"start": 2.0, "end": 5.0}]
+    assert kwargs["vad_filter"] is False
+    assert len(pipeline.transcribe.call_args[0][0]) == 5 * SAMPLE_RATE
+
+
+def test_transcribe_batch_sends_only_speech_regions(make_transcriber):
+    transcriber = make_transcriber(MagicMock(), vad=VadConfig(), language="en")
+
+    clips = {b"one": np.zeros(4 * SAMPLE_RATE, dtype=np.float32), b"two": np.zeros(2 * SAMPLE_RATE, dtype=np.float32)}
+    speech = {
+        4 * SAMPLE_RATE: [{"start": SAMPLE_RATE, "end": 2 * SAMPLE_RATE}],
+        2 * SAMPLE_RATE: [],
+    }
+    pipeline = MagicMock()
+    pipeline.transcribe.return_value = ([SimpleNamespace(start=1.0, text=" Hi")], MagicMock())
+
+    with (
+        patch("backend.engine.transcriber.load_audio", side_effect=lambda data, config: clips[data]),
+        patch("backend.engine.transcriber.get_speech_timestamps", side_effect=lambda a, options: speech[len(a)]),
+        patch("backend.engine.transcriber.BatchedInferencePipeline", return_value=pipeline),
+    ):
+        results = transcriber.transcribe_batch([b"one", b"two"])
+
+    assert pipeline.transcribe.call_args[1]["clip_timestamps"] == [{"start": 1.0, "end": 2.0}]
+    assert [r.text for r in results] == ["Hi", ""]
+    assert [r.vad_skipped_seconds for r in results] == [3.0, 2.0]
+
+
+def test_corrupt_clip_fails_only_its_own_request(make_transcriber, make_wav):
+    from av.error import InvalidDataError
+
+    transcriber = make_transcriber(MagicMock(), vad=VadConfig(), language="en", batch_size=2)
+    # Many speech regions in one clip: more batch entries than uploads
+    regions = [{"start": n * 8000, "end": n * 8000 + 4000} for n in range(4)]
+    pipeline = MagicMock()
+    pipeline.transcribe.return_value = ([SimpleNamespace(start=0.0, text=" Fine")], MagicMock())
+
+    with (
+        patch("backend.engine.transcriber.get_speech_timestamps", return_value=regions),
+        patch("backend.engine.transcriber.BatchedInferencePipeline", return_value=pipeline),
+    ):
+        results = transcriber.transcribe_batch([make_wav(2.0), b"garbage not audio", make_wav(2.0)])
+
+    assert [r.text for r in (results[0], results[2])] == ["Fine", ""]
+    assert isinstance(results[1], InvalidDataError)
+    kwargs = pipeline.transcribe.call_args[1]
+    assert len(kwargs["clip_timestamps"]) == 8
+    assert len(pipeline.transcribe.call_args[0][0]) == 4 * SAMPLE_RATE
+    assert kwargs["batch_size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batcher_sends_each_clip_its_own_error():
+    async def run_batch(audios):
+        return [ValueError("bad audio") if audio == b"bad" else audio.decode() for audio in audios]
+
+    batcher = TranscriptionBatcher(BatchingConfig(max_batch_size=2, max_wait_ms=10_000), run_batch)
+    good, bad = await asyncio.gather(batcher.submit(b"ok"), batcher.submit(b"bad"), return_exceptions=True)
+
+    assert good == "ok"
+    assert isinstance(bad, ValueError)
@@ -0,0 +1,105 @@
+"""
+Tests for the content-addressed result cache.
+"""
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.config.models import BatchingConfig, CacheConfig, ResultCacheConfig, WorkersConfig
+from backend.engine.cache import ResultCache, make_key
+from backend.engine.pool import TranscriptionPool
+from backend.engine.transcriber import TranscriptionResult
+
+
+def test_make_key_separates_parts():
+    assert make_key("ab", "c") != make_key("a", "bc")
+    assert make_key(b"audio", "model") == make_key("audio", "model")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(ResultCacheConfig(max_entries=2))
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_entries_expire_after_ttl():
+    cache = ResultCache(ResultCacheConfig(ttl_seconds=0.01))
+    cache.put("a", {"text": "hi"})
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_restart_and_evicts_by_size(tmp_path):
+    config = ResultCacheConfig(directory=tmp_path, max_disk_mb=150 / (1024 * 1024))
+    cache = ResultCache(config)
+    cache.put("old", "x" * 50)
+    os.utime(tmp_path / "old.json", (0, 0))
+    cache.put("new", "y" * 50)
+
+    assert not (tmp_path / "old.json").exists()
+    assert ResultCache(config).get("new") == "y" * 50
+
+
+def test_disk_entry_removed_after_read_is_a_miss(tmp_path):
+    config = ResultCacheConfig(directory=tmp_path)
+    ResultCache(config).put("key", "value")
+    cache = ResultCache(config)
+
+    # Another process evicts the file between the read and the touch
+    with patch("backend.engine.cache.os.utime", side_effect=FileNotFoundError):
+        assert cache.get("key") is None
+    assert cache.misses == 1
+
+
+def make_pool(transcriber) -> TranscriptionPool:
+    settings = MagicMock()
+    settings.workers = WorkersConfig(mode="thread", count=1, max_queue=1)
+    settings.batching = BatchingConfig()
+    settings.cache = CacheConfig()
+    return TranscriptionPool(settings, transcriber)
+
+
+@pytest.mark.asyncio
+async def test_pool_serves_repeated_audio_from_cache():
+    transcriber = MagicMock()
+    transcriber.cache_fingerprint.return_value = "settings-v1"
+    transcriber.transcribe.return_value = TranscriptionResult(text="Hello", vad_skipped_seconds=0.5)
+    pool = make_pool(transcriber)
+
+    try:
+        first = await pool.transcribe(b"audio")
+        second = await pool.transcribe(b"audio")
+        assert first.cached is False
+        assert second.cached is True
+        assert second.text == "Hello"
+        assert second.vad_skipped_seconds == 0.5
+        transcriber.transcribe.assert_called_once()
+
+        # A settings change produces a different fingerprint and a fresh run
+        transcriber.cache_fingerprint.return_value = "settings-v2"
+        assert (await pool.transcribe(b"audio")).cached is False
+        assert transcriber.transcribe.call_count == 2
+    finally:
+        pool.shutdown()
+
+
+def test_fingerprint_tracks_transcription_config(make_transcriber):
+    default = make_transcriber(MagicMock())
+    wider_beam = make_transcriber(MagicMock(), beam_size=8)
+
+    assert default.cache_fingerprint() == default.cache_fingerprint("small")
+    assert default.cache_fingerprint() != wider_beam.cache_fingerprint()
+    assert default.cache_fingerprint() != default.cache_fingerprint("base")
+
+    # Audio preprocessing changes what the model hears
+    unnormalized = make_transcriber(MagicMock())
+    unnormalized.audio = unnormalized.audio.model_copy(update={"normalize": False})
+    assert default.cache_fingerprint() != unnormalized.cache_fingerprint()
@@ -0,0 +1,24 @@
+"""
+Tests for splitting long texts into token-budgeted chunks.
+"""
+from backend.engine.chunking import estimate_tokens, split_text
+
+
+def test_chunks_break_on_paragraphs_then_sentences():
+    text = "First paragraph here.\n\nSecond one. It has two sentences!\n\n\nThird."
+    # Everything fits: one chunk, paragraphs kept
+    assert split_text(text, 100) == ["First paragraph here.\n\nSecond one. It has two sentences!\n\nThird."]
+
+    chunks = split_text(text, 6)
+    assert chunks == ["First paragraph here.", "Second one.", "It has two sentences!", "Third."]
+    assert all(estimate_tokens(chunk, 4.0) <= 6 for chunk in chunks)
+    assert split_text("  \n\n ", 10) == []
+
+
+def test_overlong_sentences_split_between_words():
+    sentence = " ".join(["word"] * 50) + "."
+    chunks = split_text(f"Short intro. {sentence}", 10)
+    assert chunks[0] == "Short intro."
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    # No words lost or reordered
+    assert " ".join(chunks[1:]) == sentence
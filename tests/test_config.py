@@ -3,6 +3,8 @@ Tests for configuration loading.
 """
 from pathlib import Path
 
+import pytest
+
 
 def test_example_config_exists(config_dir: Path):
     """Verify the example config file exists."""
@@ -38,3 +40,24 @@ def test_config_caching():
     settings_2 = load_settings()
 
     assert settings_1 is settings_2, "Settings should be cached and return same instance"
+
+
+def test_config_path_can_be_overridden(tmp_path: Path, monkeypatch):
+    """DICTATOR_CONFIG points the loader at another settings file."""
+    from backend.config import load_settings
+
+    source = Path(__file__).parent.parent / "config" / "settings.example.toml"
+    custom = tmp_path / "bench.toml"
+    custom.write_text(source.read_text().replace('model = "small"', 'model = "tiny"', 1))
+    monkeypatch.setenv("DICTATOR_CONFIG", str(custom))
+    load_settings.cache_clear()
+    try:
+        assert load_settings().transcription.model == "tiny"
+
+        monkeypatch.setenv("DICTATOR_CONFIG", str(tmp_path / "missing.toml"))
+        load_settings.cache_clear()
+        with pytest.raises(FileNotFoundError):
+            load_settings()
+    finally:
+        monkeypatch.delenv("DICTATOR_CONFIG")
+        load_settings.cache_clear()
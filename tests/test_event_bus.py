@@ -0,0 +1,219 @@
+"""
+Tests for the asynchronous EventBus.
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.config.models import EventsConfig
+from backend.event_bus import EventBus
+from backend.event_log import EventLog
+
+
+@pytest.fixture(autouse=True)
+def clean_bus():
+    EventBus.clear()
+    yield
+    EventBus.clear()
+
+
+def test_publish_does_not_wait_for_slow_subscribers():
+    release = threading.Event()
+    fast = []
+    EventBus.subscribe("transcription_complete", lambda data: release.wait(5))
+    EventBus.subscribe("transcription_complete", fast.append)
+
+    started = time.perf_counter()
+    for i in range(3):
+        EventBus.publish("transcription_complete", i)
+    assert time.perf_counter() - started < 0.5
+
+    # The slow subscriber only holds up its own queue
+    deadline = time.monotonic() + 5
+    while len(fast) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert fast == [0, 1, 2]
+
+    release.set()
+    EventBus.flush(5)
+
+
+def test_wildcard_topics_and_async_callbacks():
+    received = []
+
+    async def on_event(topic, data):
+        await asyncio.sleep(0)
+        received.append((topic, data))
+
+    EventBus.subscribe("refine_*", on_event, with_topic=True)
+    EventBus.publish("refine_complete", {"text": "hi"})
+    EventBus.publish("transcription_complete", {"text": "ignored"})
+    EventBus.flush(5)
+
+    assert received == [("refine_complete", {"text": "hi"})]
+
+
+def _fill_while_blocked(**subscribe):
+    release = threading.Event()
+    received = []
+
+    def on_event(data):
+        release.wait(5)
+        received.append(data)
+
+    subscription = EventBus.subscribe("*", on_event, max_queue=2, **subscribe)
+    return subscription, release, received
+
+
+def test_drop_oldest_overflow_tracks_drops_and_lag():
+    subscription, release, received = _fill_while_blocked(overflow="drop_oldest")
+    EventBus.publish("a", 0)
+    time.sleep(0.05)  # let the subscriber pick up event 0 and block on it
+    for i in range(1, 5):
+        EventBus.publish("a", i)
+    time.sleep(0.05)
+
+    [stats] = EventBus.stats()
+    assert stats["queued"] == 2
+    assert stats["dropped"] == 2
+    assert stats["lag_seconds"] > 0
+
+    release.set()
+    EventBus.flush(5)
+    assert received == [0, 3, 4]
+    assert subscription.delivered == 3
+
+
+def test_coalesce_keeps_latest_event_per_topic():
+    _, release, received = _fill_while_blocked(overflow="coalesce")
+    EventBus.publish("progress", 0)
+    time.sleep(0.05)
+    EventBus.publish("progress", 1)
+    EventBus.publish("done", "d")
+    EventBus.publish("progress", 2)
+    EventBus.publish("progress", 3)
+
+    release.set()
+    EventBus.flush(5)
+    assert received == [0, "d", 3]
+    assert EventBus.stats()[0]["coalesced"] == 2
+
+
+def test_block_overflow_makes_publisher_wait():
+    _, release, received = _fill_while_blocked(overflow="block")
+    for i in range(3):
+        EventBus.publish("a", i)
+    time.sleep(0.05)
+
+    publisher = threading.Thread(target=EventBus.publish, args=("a", 3))
+    publisher.start()
+    publisher.join(0.1)
+    assert publisher.is_alive()
+
+    release.set()
+    publisher.join(5)
+    EventBus.flush(5)
+    assert received == [0, 1, 2, 3]
+
+
+def test_publish_nowait_hands_off_to_blocking_subscribers():
+    _, release, received = _fill_while_blocked(overflow="block")
+    for i in range(3):
+        EventBus.publish("a", i)
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    EventBus.publish_nowait("a", 3)
+    assert time.monotonic() - started < 0.05
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while len(received) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert received == [0, 1, 2, 3]
+
+
+def test_unsubscribe_stops_delivery():
+    received = []
+    subscription = EventBus.subscribe("log", received.append)
+    EventBus.publish("log", "one")
+    EventBus.flush(5)
+    EventBus.unsubscribe(subscription)
+    EventBus.publish("log", "two")
+
+    assert received == ["one"]
+    assert EventBus.stats() == []
+
+
+@pytest.mark.asyncio
+async def test_event_log_resumes_after_last_event_id():
+    log = EventLog(EventsConfig(buffer_size=3, keepalive_seconds=0.05))
+    for i in range(5):
+        EventBus.publish("transcription_complete", {"n": i})
+    await asyncio.to_thread(EventBus.flush, 5)
+
+    events, gap = log.since(3)
+    assert [e.data["n"] for e in events] == [3, 4]
+    assert gap is False
+    # Event 2 fell out of the three-event buffer
+    assert log.since(1)[1] is True
+    # An id from before a restart replays the buffer and flags the gap
+    assert [e.id for e in log.since(99)[0]] == [3, 4, 5]
+
+    stream = log.follow(4)
+    assert (await anext(stream)).id == 5
+    assert await anext(stream) is None  # keep-alive while idle
+    EventBus.publish("model_ready", {"ready": True})
+    assert (await anext(stream)).topic == "model_ready"
+    await stream.aclose()
+    log.close()
+
+
+@pytest.mark.asyncio
+async def test_events_endpoint_streams_state_and_bus_events():
+    from backend.api.routes import event_stream
+
+    log = EventLog(EventsConfig())
+    pool = MagicMock(ready=True, in_flight=0, queue_depth=0)
+    response = await event_stream(last_event_id=None, last_event_id_header=None, pool=pool, event_log=log)
+    body = response.body_iterator
+
+    assert await anext(body) == "retry: 3000\n\n"
+    assert (await anext(body)).startswith('event: state\ndata: {"ready": true')
+    EventBus.publish("refine_complete", {"text": "done"})
+    message = await anext(body)
+    assert message == 'id: 1\nevent: refine_complete\ndata: {"text": "done"}\n\n'
+    await body.aclose()
+
+    # Resuming from an id the server never issued signals a reset first
+    response = await event_stream(last_event_id=42, last_event_id_header=None, pool=pool, event_log=log)
+    body = response.body_iterator
+    await anext(body)
+    await anext(body)
+    assert (await anext(body)).startswith("event: reset")
+    assert (await anext(body)).startswith("id: 1\n")
+    await body.aclose()
+    log.close()
+
+
+@pytest.mark.asyncio
+async def test_event_log_buffers_events_from_startup(monkeypatch):
+    from backend import main
+    from backend.api import routes
+
+    settings = MagicMock(events=EventsConfig())
+    settings.transcription.warmup = False
+    settings.llm.http.warmup = False
+    settings.templates.watch = False
+    monkeypatch.setattr(main, "settings", settings)
+    monkeypatch.setattr(routes, "start_session_index", lambda settings: None)
+
+    async with main.lifespan(main.app):
+        # Published before any /api/events client has connected
+        EventBus.publish("model_ready", {"ready": True})
+        EventBus.flush(5)
+        events, _ = routes._event_log.since(0)
+        assert [event.topic for event in events] == ["model_ready"]
@@ -0,0 +1,91 @@
+"""
+Tests for the shared LLM provider connection pool.
+"""
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from backend import metrics
+from backend.config.models import (
+    CacheConfig,
+    HTTPConfig,
+    LLMConfig,
+    OllamaConfig,
+    OpenAIConfig,
+    ResultCacheConfig,
+    TemplatesConfig,
+)
+from backend.engine.http_client import HTTPClientManager
+from backend.engine.llm import LLMEngine
+
+
+@pytest.mark.asyncio
+async def test_client_is_reused_until_closed():
+    manager = HTTPClientManager(HTTPConfig(max_connections=4, connect_timeout=2.0))
+    client = manager.client
+    assert manager.client is client
+    assert client.timeout.connect == 2.0
+    assert manager.stats()["connections"] == {"active": 0, "idle": 0}
+
+    await manager.aclose()
+    assert client.is_closed
+    # A closed pool is replaced on next use
+    assert manager.client is not client
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_touches_each_provider_and_counts_requests():
+    seen = []
+
+    def handler(request: httpx.Request):
+        seen.append((request.method, str(request.url)))
+        if request.url.host == "down.invalid":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200)
+
+    manager = HTTPClientManager(HTTPConfig(), transport=httpx.MockTransport(handler))
+    before = metrics.LLM_HTTP_REQUESTS_TOTAL.value(host="api.example.com", http_version="HTTP/1.1")
+
+    # A provider that can't be reached is logged, not raised
+    await manager.warm_up(["https://api.example.com", "http://down.invalid:11434"])
+
+    assert sorted(seen) == [("HEAD", "http://down.invalid:11434"), ("HEAD", "https://api.example.com")]
+    after = metrics.LLM_HTTP_REQUESTS_TOTAL.value(host="api.example.com", http_version="HTTP/1.1")
+    assert after == before + 1
+    assert "dictator_llm_http_connections" in metrics.REGISTRY.render()
+    await manager.aclose()
+
+
+@pytest.mark.asyncio
+async def test_provider_clients_share_one_pool(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-openai-test-key")
+    (tmp_path / "fix.j2").write_text("Fix this: {{ text }}")
+    settings = MagicMock(
+        templates=TemplatesConfig(directory=tmp_path),
+        cache=CacheConfig(llm=ResultCacheConfig(enabled=False)),
+        llm=LLMConfig(openai=OpenAIConfig(timeout=30.0), ollama=OllamaConfig(timeout=90.0)),
+    )
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        return httpx.Response(200, json={"message": {"content": "Fixed."}, "prompt_eval_count": 9, "eval_count": 2})
+
+    with patch("backend.engine.llm.AsyncOpenAI") as MockOpenAI:
+        engine = LLMEngine(settings)
+        engine.http = HTTPClientManager(settings.llm.http, transport=httpx.MockTransport(handler))
+        engine._get_openai_client()
+        result = await engine.refine("fix me", "fix", provider="ollama")
+
+    openai_args = MockOpenAI.call_args[1]
+    assert openai_args["http_client"] is engine.http.client
+    assert openai_args["timeout"].read == 30.0
+    # Ollama is called directly through the same pool
+    assert requests[0].url == "http://localhost:11434/api/chat"
+    assert requests[0].extensions["timeout"]["read"] == 90.0
+    assert (result.text, result.usage) == ("Fixed.", {"input_tokens": 9, "output_tokens": 2})
+
+    await engine.aclose()
+    assert engine.openai_client is None
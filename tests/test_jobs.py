@@ -0,0 +1,137 @@
+"""
+Tests for background transcription/refinement jobs.
+"""
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.config.models import JobsConfig
+from backend.engine import RefineResult, TranscriptionResult
+from backend.jobs import JobManager, JobStoreFullError
+
+
+def make_manager(config: JobsConfig | None = None):
+    pool = MagicMock()
+    pool.transcribe = AsyncMock(return_value=TranscriptionResult(text="raw text"))
+    llm_engine = MagicMock()
+    llm_engine.refine = AsyncMock(return_value=RefineResult(text="Refined text.", provider="ollama", model="m"))
+    session_logger = MagicMock()
+    session_logger.append.return_value = "transcripts/2025-01-31.md"
+    return JobManager(config or JobsConfig(), pool, llm_engine, session_logger)
+
+
+async def wait_finished(manager, job):
+    for _ in range(100):
+        if job.finished:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job still {job.status}")
+
+
+@pytest.mark.asyncio
+async def test_runs_transcribe_refine_append_pipeline():
+    manager = make_manager()
+    job = manager.submit(audio=b"audio", template="fix_grammar", append=True)
+    assert job.status == "queued"
+    assert job.stages == ["transcribe", "refine", "append"]
+
+    await wait_finished(manager, job)
+    assert job.status == "succeeded"
+    assert job.result.transcription == "raw text"
+    assert job.result.refined == job.result.text == "Refined text."
+    assert job.result.session_file == "transcripts/2025-01-31.md"
+    manager.llm_engine.refine.assert_awaited_once_with("raw text", "fix_grammar", None)
+    manager.session_logger.append.assert_called_once_with("Refined text.")
+    assert manager.get(job.id) is job
+
+
+@pytest.mark.asyncio
+async def test_failures_and_validation():
+    manager = make_manager()
+    manager.llm_engine.refine.side_effect = RuntimeError("provider down")
+    job = manager.submit(text="hello", template="fix_grammar")
+    await wait_finished(manager, job)
+    assert job.status == "failed"
+    assert job.stage == "refine"
+    assert job.error == "provider down"
+
+    with pytest.raises(ValueError):
+        manager.submit()
+    with pytest.raises(ValueError):
+        manager.submit(text="nothing to do")
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_job():
+    manager = make_manager()
+    started = asyncio.Event()
+
+    async def slow_transcribe(audio, model):
+        started.set()
+        await asyncio.sleep(10)
+
+    manager.pool.transcribe = slow_transcribe
+    job = manager.submit(audio=b"audio")
+    await started.wait()
+
+    assert manager.cancel(job.id).status == "cancelled"
+    await asyncio.sleep(0)
+    assert job.result.text is None
+    assert manager.cancel("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_store_is_bounded_and_expires_finished_jobs():
+    manager = make_manager(JobsConfig(max_jobs=2, ttl_seconds=60))
+    blocker = asyncio.Event()
+
+    async def blocked_transcribe(audio, model):
+        await blocker.wait()
+        return TranscriptionResult(text="done")
+
+    manager.pool.transcribe = blocked_transcribe
+    first = manager.submit(audio=b"1")
+    second = manager.submit(audio=b"2")
+    # Both slots hold unfinished jobs
+    with pytest.raises(JobStoreFullError):
+        manager.submit(audio=b"3")
+
+    blocker.set()
+    await wait_finished(manager, second)
+    # The oldest finished job makes room
+    third = manager.submit(audio=b"3")
+    assert manager.get(first.id) is None
+    assert manager.get(third.id) is third
+
+    second.finished_at -= timedelta(seconds=61)
+    assert manager.get(second.id) is None
+    await wait_finished(manager, third)
+
+
+def test_jobs_endpoint_returns_job_immediately():
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes import get_job_manager
+    from backend.main import app
+
+    manager = make_manager()
+    manager.pool.transcriber.available_models = ["base.en"]
+    app.dependency_overrides[get_job_manager] = lambda: manager
+    try:
+        client = TestClient(app)
+        created = client.post("/api/jobs", data={"text": "hello", "template": "fix_grammar"})
+        missing_input = client.post("/api/jobs", data={"template": "fix_grammar"})
+        bad_model = client.post("/api/jobs", data={"text": "hi", "append": "true", "model": "huge"})
+        not_found = client.get("/api/jobs/nope")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert created.status_code == 202
+    body = created.json()
+    assert body["stages"] == ["refine"]
+    assert body["id"]
+    assert missing_input.status_code == 400
+    assert bad_model.status_code == 400
+    assert not_found.status_code == 404
@@ -1,6 +1,9 @@
 """
 Tests for LLM refinement functionality.
 """
+import asyncio
+import json
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -10,6 +13,8 @@ from backend.config.models import (
     AudioConfig,
     ClusterConfig,
     LLMConfig,
+    OllamaConfig,
+    OpenAIConfig,
     ServerConfig,
     SessionConfig,
     Settings,
@@ -88,8 +93,12 @@ async def test_refine_text_anthropic(mock_env_vars, mock_settings):
         # Assertions
         assert refined == "Refined text response"
 
-        # Verify client initialization
-        MockAnthropic.assert_called_once_with(api_key="sk-ant-test-key")
+        # Verify client initialization: the SDK runs on the shared connection pool
+        MockAnthropic.assert_called_once()
+        client_args = MockAnthropic.call_args[1]
+        assert client_args["api_key"] == "sk-ant-test-key"
+        assert client_args["http_client"] is engine.http.client
+        assert client_args["timeout"].read == 60.0
 
         # Verify API call arguments
         mock_client.messages.create.assert_called_once()
@@ -100,3 +109,407 @@ async def test_refine_text_anthropic(mock_env_vars, mock_settings):
         assert call_args["messages"][0]["role"] == "user"
         # The prompt is rendered from the template: "Refine this: {{ text }}"
         assert "Refine this: original text" in call_args["messages"][0]["content"]
+
+
+@pytest.mark.asyncio
+async def test_refine_caches_responses_until_template_changes(mock_env_vars, mock_settings):
+    """Identical requests hit the cache; editing the template invalidates it."""
+    with patch("backend.engine.llm.AsyncAnthropic") as MockAnthropic:
+        mock_client = AsyncMock()
+        MockAnthropic.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="Refined text response")]
+        mock_client.messages.create.return_value = mock_response
+
+        engine = LLMEngine(mock_settings)
+
+        first = await engine.refine("original text", "test_template", provider="anthropic")
+        second = await engine.refine("original text", "test_template", provider="anthropic")
+        assert first.cached is False
+        assert second.cached is True
+        assert second.text == "Refined text response"
+        assert mock_client.messages.create.call_count == 1
+
+        # Different text is a different prompt
+        await engine.refine("other text", "test_template", provider="anthropic")
+        assert mock_client.messages.create.call_count == 2
+
+        template = mock_settings.templates.directory / "test_template.j2"
+        template.write_text("Please refine: {{ text }}")
+        third = await engine.refine("original text", "test_template", provider="anthropic")
+        assert third.cached is False
+        assert mock_client.messages.create.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_refine_metrics_label_only_known_templates(mock_env_vars, mock_settings):
+    from backend import metrics
+
+    with patch("backend.engine.llm.AsyncAnthropic") as MockAnthropic:
+        mock_client = AsyncMock()
+        MockAnthropic.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.content = [MagicMock(text="Refined text response")]
+        mock_client.messages.create.return_value = mock_response
+        engine = LLMEngine(mock_settings)
+        stage = {"stage": "template_render", "provider": "anthropic"}
+        known_before = metrics.REFINE_STAGE_SECONDS.count(template="test_template", **stage)
+        unknown_before = metrics.REFINE_STAGE_SECONDS.count(template="unknown", **stage)
+
+        await engine.refine("original text", "test_template.j2", provider="anthropic")
+        for name in ("no_such_template_1", "no_such_template_2"):
+            with pytest.raises(FileNotFoundError):
+                await engine.refine("original text", name, provider="anthropic")
+
+    assert metrics.REFINE_STAGE_SECONDS.count(template="test_template", **stage) == known_before + 1
+    assert metrics.REFINE_STAGE_SECONDS.count(template="unknown", **stage) == unknown_before + 2
+    assert "no_such_template" not in metrics.REGISTRY.render()
+
+
+def test_template_digest_follows_file_contents(mock_settings):
+    engine = LLMEngine(mock_settings)
+    before = engine.template_digest("test_template")
+    assert engine.template_digest("test_template.j2") == before
+
+    (mock_settings.templates.directory / "test_template.j2").write_text("Changed: {{ text }}")
+    assert engine.template_digest("test_template") != before
+
+
+class FakeAnthropicStream:
+    """Stands in for the context manager returned by messages.stream()."""
+
+    def __init__(self, fragments):
+        self.fragments = fragments
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for fragment in self.fragments:
+            yield fragment
+
+    async def get_final_message(self):
+        return MagicMock(usage=MagicMock(input_tokens=12, output_tokens=3))
+
+
+@pytest.mark.asyncio
+async def test_refine_stream_yields_tokens_then_usage(mock_env_vars, mock_settings):
+    with patch("backend.engine.llm.AsyncAnthropic") as MockAnthropic:
+        mock_client = MagicMock()
+        mock_client.messages.stream.return_value = FakeAnthropicStream(["Refined", " text", "."])
+        MockAnthropic.return_value = mock_client
+
+        engine = LLMEngine(mock_settings)
+        events = [e async for e in engine.refine_stream("original text", "test_template", provider="anthropic")]
+
+        assert [e["text"] for e in events[:-1]] == ["Refined", " text", "."]
+        done = events[-1]
+        assert done["type"] == "done"
+        assert done["text"] == "Refined text."
+        assert done["usage"] == {"input_tokens": 12, "output_tokens": 3}
+        assert done["timing"]["first_token_ms"] <= done["timing"]["total_ms"]
+
+        # The streamed result feeds the same cache as /refine
+        cached = await engine.refine("original text", "test_template", provider="anthropic")
+        assert cached.cached is True
+        assert cached.text == "Refined text."
+
+
+@pytest.mark.asyncio
+async def test_refine_stream_reads_openai_chunks(mock_env_vars, mock_settings):
+    def chunk(content=None, usage=None):
+        choices = [MagicMock(delta=MagicMock(content=content))] if content else []
+        return MagicMock(choices=choices, usage=usage)
+
+    async def chunks():
+        yield chunk("Hello")
+        yield chunk(" there")
+        yield chunk(usage=MagicMock(prompt_tokens=7, completion_tokens=2))
+
+    mock_settings.llm.openai = OpenAIConfig(model="gpt-4o", max_tokens=50)
+    with patch("backend.engine.llm.AsyncOpenAI") as MockOpenAI:
+        mock_client = AsyncMock()
+        mock_client.chat.completions.create.return_value = chunks()
+        MockOpenAI.return_value = mock_client
+
+        engine = LLMEngine(mock_settings)
+        events = [e async for e in engine.refine_stream("hi", "test_template", provider="openai")]
+
+    assert events[-1]["text"] == "Hello there"
+    assert events[-1]["usage"] == {"input_tokens": 7, "output_tokens": 2}
+    kwargs = mock_client.chat.completions.create.call_args[1]
+    assert kwargs["stream"] is True
+    assert kwargs["max_tokens"] == 50
+
+
+def test_refine_stream_endpoint_sends_server_sent_events():
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes import get_llm_engine
+    from backend.main import app
+
+    async def refine_stream(text, template_name, provider):
+        yield {"type": "token", "text": "Hi"}
+        yield {"type": "done", "text": "Hi", "usage": {}, "timing": {"total_ms": 1.0}}
+
+    engine = MagicMock()
+    engine.refine_stream = refine_stream
+    app.dependency_overrides[get_llm_engine] = lambda: engine
+    try:
+        response = TestClient(app).post("/api/refine/stream", json={"text": "hi", "template": "fix_grammar"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.split("\n\n")[:2] == [
+        'event: token\ndata: {"text": "Hi"}',
+        'event: done\ndata: {"text": "Hi", "usage": {}, "timing": {"total_ms": 1.0}}',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_refine_reports_fallback_route(mock_env_vars, mock_settings):
+    mock_settings.llm.openai = OpenAIConfig(model="gpt-4o", max_tokens=50)
+    mock_settings.llm.routing.fallback = ["openai"]
+    engine = LLMEngine(mock_settings)
+
+    async def complete(provider, model, max_tokens, prompt, static, usage):
+        if provider == "anthropic":
+            raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+        return f"{model} says hi"
+
+    engine._complete = complete
+    result = await engine.refine("original text", "test_template")
+    assert result.text == "gpt-4o says hi"
+    assert (result.provider, result.model) == ("openai", "gpt-4o")
+    assert result.route.fallback
+    assert [a.provider for a in result.route.attempts] == ["anthropic", "openai"]
+    # Cached under the provider that answered
+    assert (await engine.refine("original text", "test_template", provider="openai")).cached
+
+
+@pytest.mark.asyncio
+async def test_refine_batch_runs_concurrently_and_yields_as_finished(mock_env_vars, mock_settings):
+    (mock_settings.templates.directory / "summarize.j2").write_text("Summarize: {{ text }}")
+    engine = LLMEngine(mock_settings)
+    engine.cache = None
+    delays = {"Refine this": 0.2, "Summarize": 0.05}
+    renders = []
+    original_render = engine._render_prompt
+
+    def render(template_name, text):
+        renders.append(template_name)
+        return original_render(template_name, text)
+
+    async def complete(provider, model, max_tokens, prompt, static, usage):
+        await asyncio.sleep(delays[prompt.split(":")[0]])
+        return prompt.upper()
+
+    engine._render_prompt = render
+    engine._complete = complete
+    started = time.perf_counter()
+    results = [item async for item in engine.refine_batch(
+        "hello", [("test_template", None), ("summarize", None), ("missing", None), ("test_template", "anthropic")]
+    )]
+    elapsed = time.perf_counter() - started
+
+    # Roughly the slowest call, not the sum of all three
+    assert elapsed < 0.35
+    assert sorted(renders) == ["missing", "summarize", "test_template"]
+    assert [item["index"] for item in results[:2]] == [2, 1]
+    assert "not found" in results[0]["error"]
+    assert results[1]["text"] == "SUMMARIZE: HELLO"
+    assert {item["index"] for item in results[2:]} == {0, 3}
+
+
+def test_refine_batch_endpoint_streams_ndjson():
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes import get_llm_engine
+    from backend.main import app
+
+    async def refine_batch(text, refinements):
+        for index, (template, provider) in enumerate(refinements):
+            yield {"index": index, "template": template, "provider": provider or "ollama", "text": text, "cached": False}
+
+    engine = MagicMock()
+    engine.refine_batch = refine_batch
+    app.dependency_overrides[get_llm_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        response = client.post("/api/refine/batch", json={
+            "text": "hi",
+            "refinements": [{"template": "fix_grammar"}, {"template": "summarize", "provider": "openai"}],
+        })
+        empty = client.post("/api/refine/batch", json={"text": "hi", "refinements": []})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["index"], line["provider"]) for line in lines] == [(0, "ollama"), (1, "openai")]
+    assert empty.status_code == 422
+
+
+# Long enough to pass the default min_prefix_chars
+INSTRUCTIONS = "You are a careful copy editor. Fix grammar and punctuation only. " * 64
+
+
+@pytest.mark.asyncio
+async def test_static_prefix_is_sent_as_cached_system_block(mock_env_vars, mock_settings):
+    (mock_settings.templates.directory / "long.j2").write_text(INSTRUCTIONS + "Text: {{ text }}")
+    usage = MagicMock(input_tokens=20, output_tokens=5, cache_read_input_tokens=60, cache_creation_input_tokens=0)
+    with patch("backend.engine.llm.AsyncAnthropic") as MockAnthropic:
+        mock_client = MagicMock()
+        mock_client.messages.create = AsyncMock(
+            return_value=MagicMock(content=[MagicMock(text="Done.")], usage=usage)
+        )
+        MockAnthropic.return_value = mock_client
+
+        engine = LLMEngine(mock_settings)
+        result = await engine.refine("hello", "long")
+
+    kwargs = mock_client.messages.create.call_args[1]
+    # Everything before {{ text }} is the same in every prompt
+    prefix = INSTRUCTIONS + "Text: "
+    assert kwargs["system"] == [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+    assert kwargs["messages"] == [{"role": "user", "content": "hello"}]
+    assert result.usage == {
+        "input_tokens": 80,
+        "output_tokens": 5,
+        "cached_input_tokens": 60,
+        "cache_write_input_tokens": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_ollama_stream_keeps_model_loaded(mock_settings):
+    import httpx
+
+    from backend.engine.http_client import HTTPClientManager
+
+    (mock_settings.templates.directory / "long.j2").write_text(INSTRUCTIONS + "Text: {{ text }}")
+    mock_settings.llm.ollama = OllamaConfig(keep_alive="1h")
+    bodies = []
+
+    def handler(request: httpx.Request):
+        bodies.append(json.loads(request.content))
+        lines = [
+            {"message": {"content": "Hel"}, "done": False},
+            {"message": {"content": "lo."}, "done": True, "prompt_eval_count": 4, "eval_count": 2},
+        ]
+        return httpx.Response(200, content="\n".join(json.dumps(line) for line in lines))
+
+    engine = LLMEngine(mock_settings)
+    engine.http = HTTPClientManager(mock_settings.llm.http, transport=httpx.MockTransport(handler))
+    events = [e async for e in engine.refine_stream("hello", "long", provider="ollama")]
+    await engine.aclose()
+
+    assert events[-1]["text"] == "Hello."
+    assert events[-1]["usage"] == {"input_tokens": 4, "output_tokens": 2}
+    assert bodies[0]["keep_alive"] == "1h"
+    assert bodies[0]["messages"] == [
+        {"role": "system", "content": INSTRUCTIONS + "Text: "},
+        {"role": "user", "content": "hello"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_refine_chunked_maps_concurrently_then_reduces(mock_env_vars, mock_settings):
+    templates = mock_settings.templates.directory
+    (templates / "summarize.j2").write_text("Summarize: {{ text }}")
+    (templates / "summarize_reduce.j2").write_text("Merge: {{ text }}")
+    mock_settings.llm.chunking.chunk_tokens = 10
+    engine = LLMEngine(mock_settings)
+    engine.cache = None
+    prompts = []
+
+    async def complete(provider, model, max_tokens, prompt, static, usage):
+        prompts.append(prompt)
+        usage.update(input_tokens=10, output_tokens=2)
+        await asyncio.sleep(0.1)
+        kind, _, text = prompt.partition(": ")
+        return f"[{text.split()[0]}]" if kind == "Summarize" else f"merged {text}"
+
+    engine._complete = complete
+    text = "\n\n".join(f"Part {n} of the meeting went on." for n in range(4))
+    started = time.perf_counter()
+    result = await engine.refine_chunked(text, "summarize")
+    elapsed = time.perf_counter() - started
+
+    # Four chunks in parallel plus one reduce call, not five calls in a row
+    assert elapsed < 0.35
+    assert result.chunks == 4
+    assert result.reduce_template == "summarize_reduce"
+    assert result.reduce_rounds == 1
+    assert result.text == "merged [Part]\n\n[Part]\n\n[Part]\n\n[Part]"
+    assert result.usage == {"input_tokens": 50, "output_tokens": 10}
+    assert len(prompts) == 5
+
+    # Templates without a reduce step just join the chunk outputs in order
+    result = await engine.refine_chunked(text, "test_template")
+    assert result.reduce_template is None
+    assert result.text.count("\n\n") == 3
+
+
+@pytest.mark.asyncio
+async def test_refine_chunked_waits_for_provider_slots_outside_the_timeout(mock_env_vars, mock_settings):
+    mock_settings.llm.chunking.chunk_tokens = 10
+    mock_settings.llm.anthropic.max_concurrency = 2
+    mock_settings.llm.anthropic.timeout = 0.5
+    mock_settings.llm.routing.retries = 0
+    mock_settings.llm.routing.fallback = []
+    engine = LLMEngine(mock_settings)
+    engine.cache = None
+    running = peak = 0
+
+    async def complete(provider, model, max_tokens, prompt, static, usage):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.2)
+        running -= 1
+        return "ok"
+
+    engine._complete = complete
+    # Twelve chunks through two slots take ~1.2s, well past the per-call timeout
+    text = "\n\n".join(f"Part {n} of the meeting went on." for n in range(12))
+    result = await engine.refine_chunked(text, "test_template")
+
+    assert result.chunks == 12
+    assert result.text.count("ok") == 12
+    assert peak == 2
+
+
+def test_refine_chunked_endpoint_reads_a_session_day(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes import get_llm_engine, get_session_history
+    from backend.engine.llm import ChunkedRefineResult
+    from backend.main import app
+    from backend.output import SessionHistory
+
+    (tmp_path / "2025-01-31.md").write_text("# Session Log: 2025-01-31\n\n### 09:00:00\nFirst\n\n### 10:00:00\nSecond\n")
+    engine = MagicMock()
+    engine.refine_chunked = AsyncMock(return_value=ChunkedRefineResult(
+        text="Summary", provider="ollama", model="llama3.2", chunks=1
+    ))
+    history = SessionHistory(MagicMock(session=SessionConfig(directory=tmp_path)))
+    app.dependency_overrides[get_llm_engine] = lambda: engine
+    app.dependency_overrides[get_session_history] = lambda: history
+    try:
+        client = TestClient(app)
+        response = client.post("/api/refine/chunked", json={"day": "2025-01-31", "template": "summarize"})
+        missing = client.post("/api/refine/chunked", json={"day": "2025-02-01", "template": "summarize"})
+        neither = client.post("/api/refine/chunked", json={"template": "summarize"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json()["text"] == "Summary"
+    assert engine.refine_chunked.call_args[0][:2] == ("First\n\nSecond", "summarize")
+    assert (missing.status_code, neither.status_code) == (404, 400)
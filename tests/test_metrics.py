@@ -0,0 +1,67 @@
+"""
+Tests for latency metrics and Server-Timing headers.
+"""
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+
+from backend import metrics
+from backend.engine.transcriber import TranscriptionResult
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test latency.", ("stage",))
+    histogram.observe(0.003, stage="decode")
+    histogram.observe(0.2, stage="decode")
+    histogram.observe(120.0, stage="decode")
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == ["# HELP test_seconds Test latency.", "# TYPE test_seconds histogram"]
+    assert 'test_seconds_bucket{stage="decode",le="0.001"} 0' in lines
+    assert 'test_seconds_bucket{stage="decode",le="0.005"} 1' in lines
+    assert 'test_seconds_bucket{stage="decode",le="0.25"} 2' in lines
+    assert 'test_seconds_bucket{stage="decode",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{stage="decode"} 3' in lines
+
+
+def test_counter_escapes_label_values():
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter("test_total", "Test counter.", ("template",))
+    counter.inc(template='say "hi"')
+    counter.inc(2, template='say "hi"')
+
+    assert 'test_total{template="say \\"hi\\""} 3' in registry.render()
+
+
+def test_transcribe_reports_stages_in_server_timing_and_metrics():
+    from backend.api.routes import get_transcription_pool
+    from backend.main import app
+
+    pool = MagicMock()
+    pool.queue_depth = 0
+    pool.transcriber.available_models = ["small"]
+    pool.transcribe = AsyncMock(return_value=TranscriptionResult(
+        text="Hello",
+        timings={"decode": 0.012, "inference": 0.5, "segment_join": 0.0001},
+    ))
+    app.dependency_overrides[get_transcription_pool] = lambda: pool
+    inference_before = metrics.TRANSCRIPTION_STAGE_SECONDS.count(stage="inference")
+
+    try:
+        client = TestClient(app)
+        response = client.post("/api/transcribe", files={"file": ("a.wav", b"audio", "audio/wav")})
+        exposition = client.get("/api/metrics")
+    finally:
+        app.dependency_overrides.clear()
+
+    timing = response.headers["Server-Timing"]
+    for stage in ("upload_receive", "decode", "inference", "segment_join", "total"):
+        assert f"{stage};dur=" in timing
+    assert "inference;dur=500.0" in timing
+
+    assert metrics.TRANSCRIPTION_STAGE_SECONDS.count(stage="inference") == inference_before + 1
+    assert exposition.headers["content-type"].startswith("text/plain")
+    assert 'dictator_transcription_stage_seconds_count{stage="inference"}' in exposition.text
+    assert 'handler="transcribe_audio",status="200"' in exposition.text
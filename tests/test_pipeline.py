@@ -0,0 +1,131 @@
+"""
+Tests for the server-side transcribe/refine/append pipeline.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.engine import RefineResult, TranscriptionResult
+from backend.pipeline import Pipeline, PipelineError, parse_steps
+
+
+def make_pipeline():
+    pool = MagicMock()
+    pool.transcribe = AsyncMock(return_value=TranscriptionResult(text="raw text"))
+    llm_engine = MagicMock()
+    llm_engine.refine = AsyncMock(return_value=RefineResult(text="Refined text.", provider="ollama", model="m"))
+    session_logger = MagicMock()
+    session_logger.append.return_value = "transcripts/2025-01-31.md"
+    return Pipeline(pool, llm_engine, session_logger)
+
+
+def test_parse_steps_validates_order_and_inputs():
+    assert parse_steps(["transcribe", "refine:fix_grammar", "append"], True, False) == [
+        ("transcribe", None), ("refine", "fix_grammar"), ("append", None)
+    ]
+    assert parse_steps(["append"], False, True) == [("append", None)]
+    for steps, has_audio, has_text in [
+        (["refine:fix_grammar"], True, False),  # nothing transcribed yet
+        (["append", "transcribe"], True, False),
+        (["transcribe"], False, True),
+        (["refine"], False, True),
+        (["translate"], False, True),
+        ([], True, False),
+    ]:
+        with pytest.raises(PipelineError):
+            parse_steps(steps, has_audio, has_text)
+
+
+@pytest.mark.asyncio
+async def test_returns_every_step_output_with_timings():
+    pipeline = make_pipeline()
+    result = await pipeline.run(["transcribe", "refine:fix_grammar", "append"], audio=b"audio")
+
+    assert result.ok
+    assert result.text == "Refined text."
+    assert [step.output for step in result.steps] == ["raw text", "Refined text.", "transcripts/2025-01-31.md"]
+    assert all(step.duration_ms is not None for step in result.steps)
+    # append comes after refine here, so it stores the refined text
+    pipeline.session_logger.append.assert_called_once_with("Refined text.")
+
+
+@pytest.mark.asyncio
+async def test_append_of_raw_text_overlaps_refinement():
+    pipeline = make_pipeline()
+    refine_started = asyncio.Event()
+
+    def slow_append(text):
+        # Only returns once refine has started, so the two must run together
+        assert asyncio.run_coroutine_threadsafe(refine_started.wait(), loop).result(5) is True
+        return "transcripts/2025-01-31.md"
+
+    async def refine(text, template, provider):
+        refine_started.set()
+        return RefineResult(text="Refined text.", provider="ollama", model="m")
+
+    loop = asyncio.get_running_loop()
+    pipeline.session_logger.append.side_effect = slow_append
+    pipeline.llm_engine.refine = refine
+
+    result = await pipeline.run(["transcribe", "append", "refine:fix_grammar"], audio=b"audio")
+    assert result.ok
+    pipeline.session_logger.append.assert_called_once_with("raw text")
+    assert result.text == "Refined text."
+    append_step, refine_step = result.steps[1], result.steps[2]
+    assert refine_step.start_ms < append_step.start_ms + append_step.duration_ms
+
+
+@pytest.mark.asyncio
+async def test_failed_step_skips_dependents_but_not_siblings():
+    pipeline = make_pipeline()
+    pipeline.llm_engine.refine.side_effect = RuntimeError("provider down")
+
+    result = await pipeline.run(["append", "refine:fix_grammar", "append"], text="hello")
+    assert not result.ok
+    assert [step.status for step in result.steps] == ["ok", "failed", "skipped"]
+    assert result.steps[1].error == "provider down"
+    pipeline.session_logger.append.assert_called_once_with("hello")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_text_step_leaves_no_final_text():
+    pipeline = make_pipeline()
+    pipeline.llm_engine.refine.side_effect = asyncio.CancelledError()
+
+    result = await pipeline.run(["refine:fix_grammar"], text="hello")
+    assert result.text is None
+    assert not result.ok
+
+
+def test_pipeline_endpoint():
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes import get_pipeline
+    from backend.main import app
+
+    pipeline = make_pipeline()
+    pipeline.pool.transcriber.available_models = ["base.en"]
+    app.dependency_overrides[get_pipeline] = lambda: pipeline
+    try:
+        client = TestClient(app)
+        ok = client.post(
+            "/api/pipeline",
+            data={"steps": "transcribe, refine:fix_grammar"},
+            files={"file": ("clip.wav", b"audio", "audio/wav")},
+        )
+        invalid = client.post("/api/pipeline", data={"steps": "refine:fix_grammar"})
+        pipeline.llm_engine.refine.side_effect = RuntimeError("provider down")
+        failed = client.post("/api/pipeline", data={"steps": "append,refine:fix_grammar", "text": "hi"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert ok.status_code == 200
+    body = ok.json()
+    assert body["text"] == "Refined text."
+    assert [step["step"] for step in body["steps"]] == ["transcribe", "refine:fix_grammar"]
+    assert "step0_transcribe" in ok.headers["server-timing"]
+    assert invalid.status_code == 400
+    # A failed step still returns what the other steps produced
+    assert failed.status_code == 500
+    assert [step["status"] for step in failed.json()["steps"]] == ["ok", "failed"]
@@ -0,0 +1,139 @@
+"""
+Tests for the transcription worker pool.
+"""
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.config.models import BatchingConfig, CacheConfig, WorkersConfig
+from backend.engine.pool import PoolSaturatedError, TranscriptionPool
+
+
+def make_pool(count: int, max_queue: int, transcriber) -> TranscriptionPool:
+    settings = MagicMock()
+    settings.workers = WorkersConfig(mode="thread", count=count, max_queue=max_queue)
+    settings.batching = BatchingConfig()
+    settings.cache = CacheConfig()
+    return TranscriptionPool(settings, transcriber)
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_transcriber_method():
+    transcriber = MagicMock()
+    transcriber.transcribe.return_value = "Hello world"
+    pool = make_pool(count=2, max_queue=1, transcriber=transcriber)
+
+    try:
+        assert await pool.submit("transcribe", b"audio") == "Hello world"
+        transcriber.transcribe.assert_called_once_with(b"audio")
+        assert pool.in_flight == 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_queue_is_full():
+    release = threading.Event()
+    transcriber = MagicMock()
+    transcriber.transcribe.side_effect = lambda audio: release.wait(5) and "done"
+    pool = make_pool(count=1, max_queue=1, transcriber=transcriber)
+
+    try:
+        running = asyncio.ensure_future(pool.submit("transcribe", b"a"))
+        queued = asyncio.ensure_future(pool.submit("transcribe", b"b"))
+        await asyncio.sleep(0.05)
+        assert pool.queue_depth == 1
+
+        with pytest.raises(PoolSaturatedError) as exc_info:
+            await pool.submit("transcribe", b"c")
+        assert exc_info.value.queue_depth == 1
+
+        release.set()
+        assert await asyncio.gather(running, queued) == ["done", "done"]
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_transcribe_endpoint_returns_503_when_saturated():
+    from backend.api.routes import get_transcription_pool
+    from backend.main import app
+
+    pool = MagicMock()
+
+    async def saturated(*args):
+        raise PoolSaturatedError(queue_depth=8)
+
+    pool.transcribe = saturated
+    app.dependency_overrides[get_transcription_pool] = lambda: pool
+
+    try:
+        client = TestClient(app)
+        files = {"file": ("test.wav", b"fake audio data", "audio/wav")}
+        response = client.post("/api/transcribe", files=files)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.headers["X-Queue-Depth"] == "8"
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_submit_holds_its_slot_until_the_worker_finishes():
+    release = threading.Event()
+    transcriber = MagicMock()
+    transcriber.transcribe.side_effect = lambda audio: release.wait(5) and "done"
+    pool = make_pool(count=1, max_queue=0, transcriber=transcriber)
+
+    try:
+        running = asyncio.ensure_future(pool.submit("transcribe", b"a"))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        await asyncio.sleep(0)
+
+        # The worker is still busy, so nothing new is admitted
+        assert pool.in_flight == 1
+        with pytest.raises(PoolSaturatedError):
+            await pool.submit("transcribe", b"b")
+
+        release.set()
+        for _ in range(100):
+            if pool.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.in_flight == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_each_batched_upload_holds_a_slot():
+    from backend.config.models import ResultCacheConfig
+    from backend.engine.transcriber import TranscriptionResult
+
+    settings = MagicMock()
+    settings.workers = WorkersConfig(mode="thread", count=1, max_queue=1)
+    settings.batching = BatchingConfig(enabled=True, max_batch_size=8, max_wait_ms=100)
+    settings.cache = CacheConfig(transcription=ResultCacheConfig(enabled=False))
+    transcriber = MagicMock()
+    transcriber.transcribe_batch.side_effect = lambda audios: [TranscriptionResult(text="ok") for _ in audios]
+    pool = TranscriptionPool(settings, transcriber)
+
+    try:
+        queued = [asyncio.ensure_future(pool.transcribe(audio)) for audio in (b"a", b"b")]
+        await asyncio.sleep(0)
+        assert pool.in_flight == 2
+        with pytest.raises(PoolSaturatedError):
+            await pool.transcribe(b"c")
+
+        assert [result.text for result in await asyncio.gather(*queued)] == ["ok", "ok"]
+        transcriber.transcribe_batch.assert_called_once_with([b"a", b"b"])
+        await asyncio.sleep(0.01)
+        assert pool.in_flight == 0
+    finally:
+        pool.shutdown()
@@ -0,0 +1,139 @@
+"""
+Tests for the Whisper model registry, warm-up and readiness.
+"""
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.engine.registry import ModelRegistry, estimate_model_mb
+
+
+def test_estimate_scales_with_compute_type():
+    assert estimate_model_mb("small", "int8") == estimate_model_mb("small", "float16") / 2
+    assert estimate_model_mb("base.en", "float16") == estimate_model_mb("base", "float16")
+
+
+def test_registry_reuses_loaded_models():
+    loader = MagicMock(side_effect=lambda name: f"model:{name}")
+    registry = ModelRegistry(loader, compute_type="int8")
+
+    assert registry.get("base") == "model:base"
+    assert registry.get("base") == "model:base"
+    loader.assert_called_once_with("base")
+
+
+def test_registry_evicts_least_recently_used_over_budget():
+    loader = MagicMock(side_effect=lambda name: f"model:{name}")
+    budget = estimate_model_mb("small", "int8") + estimate_model_mb("base", "int8")
+    registry = ModelRegistry(loader, compute_type="int8", memory_budget_mb=int(budget) + 1)
+
+    registry.get("base")
+    registry.get("small")
+    registry.get("base")  # base is now the most recently used
+    registry.get("tiny")
+
+    assert registry.loaded == ["base", "tiny"]
+
+
+def test_loading_one_model_does_not_block_others():
+    release = threading.Event()
+    calls = []
+
+    def loader(name):
+        calls.append(name)
+        if name == "small":
+            release.wait(timeout=5)
+        return f"model:{name}"
+
+    registry = ModelRegistry(loader, compute_type="int8")
+    registry.get("base")
+    slow = [threading.Thread(target=registry.get, args=("small",)) for _ in range(2)]
+    for thread in slow:
+        thread.start()
+
+    # "small" is still loading, but a resident model is served immediately
+    assert registry.get("base") == "model:base"
+    release.set()
+    for thread in slow:
+        thread.join(timeout=5)
+
+    assert calls == ["base", "small"]
+    assert registry.loaded == ["base", "small"]
+
+
+def test_process_pool_reports_models_loaded_by_workers():
+    from backend.config.models import BatchingConfig, CacheConfig, ResultCacheConfig, WorkersConfig
+    from backend.engine.pool import TranscriptionPool
+
+    settings = MagicMock()
+    settings.workers = WorkersConfig(mode="process", count=2)
+    settings.batching = BatchingConfig(enabled=False)
+    settings.cache = CacheConfig(transcription=ResultCacheConfig(enabled=False))
+    transcriber = MagicMock()
+    transcriber.registry.loaded = []
+    pool = TranscriptionPool(settings, transcriber)
+    try:
+        pool._record_worker((101, ["small"]))
+        pool._record_worker((102, ["small", "base"]))
+        assert pool.loaded_models == ["small", "base"]
+
+        # A worker that evicted a model reports its new state
+        pool._record_worker((102, ["small"]))
+        assert pool.loaded_models == ["small"]
+    finally:
+        pool.shutdown()
+
+
+def test_warm_up_runs_inference_on_every_available_model(make_transcriber):
+    model = MagicMock()
+    model.transcribe.return_value = (iter([]), MagicMock())
+    transcriber = make_transcriber(model, model="small", preload=["base"])
+    loaded = []
+    transcriber.registry._loader = lambda name: loaded.append(name) or model
+
+    transcriber.warm_up()
+
+    assert transcriber.available_models == ["small", "base"]
+    assert transcriber.registry.loaded == ["small", "base"]
+    assert loaded == ["base"]
+    assert model.transcribe.call_count == 2
+
+
+@pytest.fixture
+def pool_client():
+    from backend.api.routes import get_transcription_pool
+    from backend.main import app
+
+    pool = MagicMock()
+    pool.ready = False
+    pool.transcriber.available_models = ["small", "base"]
+    pool.loaded_models = ["small"]
+    app.dependency_overrides[get_transcription_pool] = lambda: pool
+    try:
+        yield TestClient(app), pool
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_ready_endpoint_reflects_pool_state(pool_client):
+    client, pool = pool_client
+
+    assert client.get("/api/ready").status_code == 503
+    assert client.get("/api/health").json()["ready"] is False
+
+    pool.ready = True
+    response = client.get("/api/ready")
+    assert response.status_code == 200
+    assert response.json() == {"ready": True, "models": ["small"]}
+
+
+def test_transcribe_rejects_unknown_model(pool_client):
+    client, pool = pool_client
+
+    files = {"file": ("test.wav", b"fake audio data", "audio/wav")}
+    response = client.post("/api/transcribe", files=files, data={"model": "large-v3"})
+
+    assert response.status_code == 400
+    pool.transcribe.assert_not_called()
@@ -0,0 +1,154 @@
+"""
+Tests for LLM provider routing: limits, retries, fallback and hedging.
+"""
+import asyncio
+
+import pytest
+
+from backend.config.models import (
+    AnthropicConfig,
+    LLMConfig,
+    OllamaConfig,
+    OpenAIConfig,
+    RoutingConfig,
+)
+from backend.engine.router import ProviderRouter, Route, RoutingError
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+def make_router(**routing) -> ProviderRouter:
+    routing.setdefault("backoff_seconds", 0)
+    return ProviderRouter(LLMConfig(
+        default_provider="ollama",
+        anthropic=AnthropicConfig(),
+        openai=OpenAIConfig(),
+        ollama=OllamaConfig(max_concurrency=1, timeout=5.0),
+        routing=RoutingConfig(**routing),
+    ))
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    router = make_router(retries=2)
+    calls = []
+
+    async def call(provider):
+        calls.append(provider)
+        if len(calls) < 3:
+            raise ServerError("overloaded")
+        return "ok"
+
+    result, route = await router.run("ollama", call)
+    assert result == "ok"
+    assert calls == ["ollama"] * 3
+    assert [a.status for a in route.attempts] == ["error", "error", "ok"]
+    assert route.attempts[0].error == "overloaded"
+    assert not route.fallback
+
+
+@pytest.mark.asyncio
+async def test_permanent_errors_fall_back_down_the_chain():
+    router = make_router(fallback=["openai", "anthropic"], retries=3)
+
+    async def call(provider):
+        if provider == "ollama":
+            raise ValueError("model not found")  # not retryable
+        if provider == "openai":
+            raise ServerError("down")
+        return f"from {provider}"
+
+    result, route = await router.run("ollama", call)
+    assert result == "from anthropic"
+    assert route.provider == "anthropic"
+    assert route.fallback
+    # One ollama attempt, every openai retry, then anthropic
+    assert [a.provider for a in route.attempts] == ["ollama"] + ["openai"] * 4 + ["anthropic"]
+
+    async def always_down(provider):
+        raise ValueError(f"{provider} down")
+
+    with pytest.raises(RoutingError, match="anthropic down") as raised:
+        await router.run("ollama", always_down)
+    assert len(raised.value.route.attempts) == 3
+
+
+@pytest.mark.asyncio
+async def test_hedge_takes_first_answer_and_cancels_the_other():
+    router = make_router(fallback=["openai"], hedge_after_seconds=0.05)
+
+    async def call(provider):
+        if provider == "ollama":
+            await asyncio.sleep(5)
+        return f"from {provider}"
+
+    result, route = await asyncio.wait_for(router.run("ollama", call), 2)
+    assert result == "from openai"
+    assert route.hedged and route.fallback
+    statuses = {(a.provider, a.status, a.hedge) for a in route.attempts}
+    assert statuses == {("ollama", "cancelled", False), ("openai", "ok", True)}
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_timeout_cover_the_queue():
+    router = make_router(retries=0)
+    in_flight = 0
+    peak = 0
+
+    async def call(provider):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return provider
+
+    await asyncio.gather(*(router.run("ollama", call) for _ in range(3)))
+    assert peak == 1  # ollama max_concurrency = 1
+
+    router.config.ollama.timeout = 0.05
+
+    async def hold(provider):
+        await asyncio.sleep(1)
+
+    holder = asyncio.create_task(router.run("ollama", hold))
+    await asyncio.sleep(0)
+    # Still waiting for the only slot when the timeout hits
+    with pytest.raises(RoutingError) as raised:
+        await router.run("ollama", call)
+    assert raised.value.route.attempts[0].status == "timeout"
+    assert str(raised.value) == "ollama: TimeoutError"
+    with pytest.raises(RoutingError):
+        await holder
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_only_before_the_first_fragment():
+    router = make_router(fallback=["openai"], retries=0)
+
+    async def fragments(provider):
+        if provider == "ollama":
+            raise ConnectionError("refused")
+        yield "Hello"
+        yield " there"
+
+    route = Route(requested="ollama", provider="ollama")
+    received = [f async for f in router.stream("ollama", fragments, route)]
+    assert received == ["Hello", " there"]
+    assert route.provider == "openai"
+    assert [a.status for a in route.attempts] == ["error", "ok"]
+
+    async def breaks_midway(provider):
+        yield "Hel"
+        raise ServerError("dropped")
+
+    route = Route(requested="ollama", provider="ollama")
+    received = []
+    with pytest.raises(ServerError):
+        async for fragment in router.stream("ollama", breaks_midway, route):
+            received.append(fragment)
+    # Text was already sent, so there is no fallback
+    assert received == ["Hel"]
+    assert [a.provider for a in route.attempts] == ["ollama"]
@@ -0,0 +1,102 @@
+"""
+Tests for reading session entries back through the offset index.
+"""
+import json
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.config.models import SessionConfig
+from backend.output import SessionHistory, SessionLogger
+
+DAY = date(2025, 1, 31)
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return MagicMock(session=SessionConfig(directory=tmp_path))
+
+
+def write_session(directory, entries):
+    body = "".join(f"\n### {time}\n{text}\n" for time, text in entries)
+    (directory / "2025-01-31.md").write_text(f"# Session Log: 2025-01-31\n{body}")
+
+
+def test_reads_entries_with_numbers_and_offsets(settings, tmp_path):
+    write_session(tmp_path, [("09:00:00", "First"), ("10:30:00", "Second\n\nwith a blank line")])
+    history = SessionHistory(settings)
+
+    entries = list(history.read(DAY))
+    assert [(e["number"], e["time"], e["text"]) for e in entries] == [
+        (1, "09:00:00", "First"),
+        (2, "10:30:00", "Second\n\nwith a blank line"),
+    ]
+    content = (tmp_path / "2025-01-31.md").read_bytes()
+    assert content[entries[1]["offset"]:].startswith(b"\n### 10:30:00\n")
+
+
+def test_since_filters_by_number_or_time(settings, tmp_path):
+    write_session(tmp_path, [("09:00:00", "a"), ("10:00:00", "b"), ("11:00:00", "c")])
+    history = SessionHistory(settings)
+
+    assert [e["text"] for e in history.read(DAY, since=2)] == ["c"]
+    assert [e["text"] for e in history.read(DAY, since="09:30:00")] == ["b", "c"]
+    assert [e["text"] for e in history.read(DAY, since="10:00:00")] == ["c"]
+    assert list(history.read(DAY, since=3)) == []
+
+
+def test_index_picks_up_external_appends(settings, tmp_path):
+    write_session(tmp_path, [("09:00:00", "from disk")])
+    history = SessionHistory(settings)
+    assert len(list(history.read(DAY))) == 1
+
+    # Written by something other than the logger: picked up by scanning the tail
+    with open(tmp_path / "2025-01-31.md", "a") as f:
+        f.write("\n### 09:05:00\nexternal\n")
+    assert [e["text"] for e in history.read(DAY, since=1)] == ["external"]
+
+
+def test_logger_listener_extends_index(settings):
+    history = SessionHistory(settings)
+    session_logger = SessionLogger(settings)
+    session_logger.add_listener(history.index_entries)
+    session_logger.append("first", durable=True)
+    path = session_logger.get_session_file()
+    today = date.fromisoformat(path.stem)
+
+    list(history.read(today))
+    index = history._indexes[path]
+    session_logger.append("live one")
+    session_logger.append("live two")
+    session_logger.flush()
+
+    # Extended by the listener, so the next read has nothing to rescan
+    assert len(index.offsets) == 3
+    assert index.size == path.stat().st_size
+    assert [e["text"] for e in history.read(today, since=1)] == ["live one", "live two"]
+    session_logger.close()
+
+
+def test_history_endpoints_stream_ndjson(settings, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes import get_session_history
+    from backend.main import app
+
+    write_session(tmp_path, [("09:00:00", "a"), ("10:00:00", "b")])
+    app.dependency_overrides[get_session_history] = lambda: SessionHistory(settings)
+    try:
+        client = TestClient(app)
+        full = client.get("/api/session/2025-01-31")
+        since = client.get("/api/session/2025-01-31/entries", params={"since": "1"})
+        missing = client.get("/api/session/2025-01-30")
+        invalid = client.get("/api/session/2025-01-31/entries", params={"since": "noon"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert full.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["text"] for line in full.text.splitlines()] == ["a", "b"]
+    assert [json.loads(line)["number"] for line in since.text.splitlines()] == [2]
+    assert missing.status_code == 404
+    assert invalid.status_code == 422
@@ -0,0 +1,186 @@
+"""
+Tests for the queued session writer.
+"""
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.config.models import SessionConfig
+from backend.output import SessionLogger
+from backend.output.session_logger import _STOP
+
+
+@pytest.fixture
+def make_logger(tmp_path):
+    loggers = []
+
+    def make(**session):
+        settings = MagicMock(session=SessionConfig(directory=tmp_path, **session))
+        loggers.append(SessionLogger(settings))
+        return loggers[-1]
+
+    yield make
+    for session_logger in loggers:
+        session_logger.close()
+
+
+def test_concurrent_appends_share_one_header(make_logger):
+    session_logger = make_logger(include_timestamps=False)
+
+    def append_many(worker):
+        for i in range(25):
+            session_logger.append(f"worker {worker} entry {i}")
+
+    threads = [threading.Thread(target=append_many, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    session_logger.close()
+
+    content = session_logger.get_session_file().read_text()
+    assert content.count("# Session Log:") == 1
+    assert content.count("entry") == 100
+    # Each worker's entries stay in the order they were appended
+    positions = [content.index(f"worker 0 entry {i}\n") for i in range(25)]
+    assert positions == sorted(positions)
+
+
+def test_append_returns_before_write_unless_durable(make_logger):
+    session_logger = make_logger(fsync_interval=60)
+    release = threading.Event()
+    original_open = session_logger._open
+
+    def slow_open(path, date):
+        release.wait(5)
+        return original_open(path, date)
+
+    with patch.object(session_logger, "_open", slow_open):
+        path = session_logger.append("queued")
+        assert not path.exists()
+
+        durable = threading.Thread(target=session_logger.append, args=("durable",), kwargs={"durable": True})
+        durable.start()
+        durable.join(0.1)
+        assert durable.is_alive()
+
+        release.set()
+        durable.join(5)
+
+    content = path.read_text()
+    assert "queued" in content and "durable" in content
+
+
+def test_durable_append_surfaces_write_errors(make_logger):
+    session_logger = make_logger()
+    with (
+        patch.object(session_logger, "_open", side_effect=OSError("disk full")),
+        pytest.raises(OSError, match="disk full"),
+    ):
+        session_logger.append("lost", durable=True)
+
+    # The writer keeps going after a failed batch
+    session_logger.append("kept", durable=True)
+    assert "kept" in session_logger.get_session_file().read_text()
+
+
+def test_unencodable_text_is_rejected_and_the_writer_survives(make_logger):
+    session_logger = make_logger()
+    with pytest.raises(ValueError):
+        session_logger.append("a\ud800b", durable=True)
+
+    # A batch that fails in an unexpected way only fails its own appends
+    with (
+        patch.object(session_logger, "_open", side_effect=UnicodeEncodeError("utf-8", "", 0, 1, "bad")),
+        pytest.raises(UnicodeEncodeError),
+    ):
+        session_logger.append("lost", durable=True)
+
+    session_logger.append("kept", durable=True)
+    assert "kept" in session_logger.get_session_file().read_text()
+
+
+def test_append_fails_once_the_writer_has_stopped(make_logger):
+    session_logger = make_logger()
+    session_logger._queue.put((_STOP, None))
+    session_logger._writer.join(5)
+
+    with pytest.raises(RuntimeError, match="writer"):
+        session_logger.append("dropped")
+
+
+def test_rolls_over_at_date_boundary(make_logger):
+    session_logger = make_logger()
+    times = iter([datetime(2025, 1, 31, 23, 59, 59), datetime(2025, 2, 1, 0, 0, 1)])
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return next(times)
+
+    with patch("backend.output.session_logger.datetime", FakeDatetime):
+        first = session_logger.append("before midnight")
+        second = session_logger.append("after midnight")
+    session_logger.flush()
+
+    assert first.name == "2025-01-31.md"
+    assert second.name == "2025-02-01.md"
+    assert first.read_text() == "# Session Log: 2025-01-31\n\n### 23:59:59\nbefore midnight\n"
+    assert second.read_text() == "# Session Log: 2025-02-01\n\n### 00:00:01\nafter midnight\n"
+
+
+def test_append_after_close_is_rejected(make_logger):
+    session_logger = make_logger()
+    session_logger.append("last")
+    session_logger.close()
+    session_logger.close()
+
+    assert "last" in session_logger.get_session_file().read_text()
+    with pytest.raises(RuntimeError):
+        session_logger.append("too late")
+    with pytest.raises(RuntimeError):
+        session_logger.flush()
+
+
+def test_append_racing_close_is_written_before_the_writer_stops(make_logger):
+    session_logger = make_logger(include_timestamps=False)
+    put = session_logger._queue.put
+    closer = threading.Thread(target=session_logger.close, daemon=True)
+
+    def put_during_close(item):
+        # close() starts after append() checked the flag but before it queued
+        if not closer.is_alive() and not session_logger._closed:
+            closer.start()
+            closer.join(0.2)
+        put(item)
+
+    appender = threading.Thread(
+        target=session_logger.append, args=("racing",), kwargs={"durable": True}, daemon=True
+    )
+    with patch.object(session_logger._queue, "put", side_effect=put_during_close):
+        appender.start()
+        appender.join(5)
+        closer.join(5)
+
+    # A durable append queued behind the stop marker would never return
+    assert not appender.is_alive()
+    assert "racing" in session_logger.get_session_file().read_text()
+
+
+def test_segments_go_to_a_sidecar_keyed_by_offset(make_logger, tmp_path):
+    import json
+
+    session_logger = make_logger()
+    segments = {"start": [0.0, 1.2], "end": [1.1, 2.0], "text": ["Hello", "there"]}
+    path = session_logger.append("Hello there", durable=True, segments=segments)
+    session_logger.append("No segments", durable=True)
+    session_logger.close()
+
+    sidecar = tmp_path / f"{path.stem}.segments.jsonl"
+    records = [json.loads(line) for line in sidecar.read_text().splitlines()]
+    assert len(records) == 1
+    assert records[0]["segments"] == segments
+    # The offset points at the entry in the markdown file
+    assert path.read_bytes()[records[0]["offset"]:].startswith(f"\n### {records[0]['time']}\nHello there\n".encode())
@@ -0,0 +1,121 @@
+"""
+Tests for the session full-text search index.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.config.models import SessionConfig
+from backend.output import SessionIndex, SessionLogger
+from backend.output.search import build_match_query
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return MagicMock(session=SessionConfig(directory=tmp_path))
+
+
+def write_session(directory, date, entries):
+    body = "".join(f"\n### {time}\n{text}\n" for time, text in entries)
+    (directory / f"{date}.md").write_text(f"# Session Log: {date}\n{body}")
+
+
+def test_build_match_query_quotes_terms():
+    assert build_match_query('call "Bob" OR deploy*') == '"call" "Bob" "OR" "deploy"*'
+    assert build_match_query("?!") == ""
+
+
+def test_backfill_is_incremental(settings, tmp_path):
+    write_session(tmp_path, "2025-01-30", [("09:00:00", "Call Bob about the budget"), ("10:00:00", "Lunch")])
+    index = SessionIndex(settings)
+    assert index.backfill() == 2
+    assert index.backfill() == 0
+
+    with open(tmp_path / "2025-01-30.md", "a") as f:
+        f.write("\n### 11:00:00\nBudget review with Alice\n")
+    assert index.backfill() == 1
+
+    hits = index.search("budget").results
+    assert {hit.time for hit in hits} == {"09:00:00", "11:00:00"}
+    content = (tmp_path / "2025-01-30.md").read_bytes()
+    for hit in hits:
+        assert content[hit.offset:].startswith(f"\n### {hit.time}\n{hit.text}\n".encode())
+    index.close()
+
+    # A reopened index keeps its state instead of rescanning
+    reopened = SessionIndex(settings)
+    assert reopened.backfill() == 0
+    assert reopened.search("alice").total == 1
+    reopened.close()
+
+
+def test_date_filters_and_pagination(settings, tmp_path):
+    for day in range(1, 6):
+        write_session(tmp_path, f"2025-02-0{day}", [("09:00:00", f"standup notes day {day}")])
+    index = SessionIndex(settings)
+    index.backfill()
+
+    results = index.search("standup", date_from="2025-02-02", date_to="2025-02-04", limit=2)
+    assert results.total == 3
+    assert len(results.results) == 2
+    page_two = index.search("standup", date_from="2025-02-02", date_to="2025-02-04", limit=2, offset=2)
+    dates = {hit.date for hit in results.results + page_two.results}
+    assert dates == {"2025-02-02", "2025-02-03", "2025-02-04"}
+    index.close()
+
+
+def test_ranks_better_matches_first(settings, tmp_path):
+    write_session(tmp_path, "2025-03-01", [
+        ("09:00:00", "The deploy went fine after a long meeting about many unrelated topics"),
+        ("10:00:00", "deploy deploy rollback deploy"),
+    ])
+    index = SessionIndex(settings)
+    index.backfill()
+    hits = index.search("deploy").results
+    assert hits[0].time == "10:00:00"
+    assert hits[0].score > hits[1].score
+    assert "**deploy**" in hits[0].snippet
+    index.close()
+
+
+def test_logger_listener_indexes_appends(settings, tmp_path):
+    write_session(tmp_path, "2025-01-01", [("08:00:00", "old entry about taxes")])
+    index = SessionIndex(settings)
+    session_logger = SessionLogger(settings)
+    session_logger.add_listener(index.index_entries)
+    index.backfill()
+
+    session_logger.append("new entry about taxes")
+    session_logger.append("and one about groceries")
+    session_logger.flush()
+
+    assert index.search("taxes").total == 2
+    [hit] = index.search("groceries").results
+    content = session_logger.get_session_file().read_bytes()
+    assert content[hit.offset:].startswith(f"\n### {hit.time}\nand one about groceries\n".encode())
+    # Backfill after live indexing finds nothing new
+    assert index.backfill() == 0
+
+    session_logger.close()
+    index.close()
+
+
+def test_search_endpoint(settings):
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes import get_session_index
+    from backend.main import app
+
+    index = MagicMock()
+    index.search.return_value = {"query": "bob", "total": 0, "limit": 5, "offset": 0, "results": []}
+    app.dependency_overrides[get_session_index] = lambda: index
+    try:
+        client = TestClient(app)
+        response = client.get("/api/session/search", params={"q": "bob", "date_from": "2025-01-01", "limit": 5})
+        invalid = client.get("/api/session/search", params={"q": "bob", "date_to": "yesterday"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    index.search.assert_called_once_with("bob", date_from="2025-01-01", date_to=None, limit=5, offset=0)
+    assert invalid.status_code == 422
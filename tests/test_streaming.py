@@ -0,0 +1,133 @@
+"""
+Tests for streaming transcription.
+"""
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from backend.config.models import StreamingConfig
+from backend.engine.streaming import SAMPLE_RATE, StreamingSession
+
+
+def make_pool(transcriber, count: int = 1, max_queue: int = 2):
+    from backend.config.models import BatchingConfig, CacheConfig, ResultCacheConfig, WorkersConfig
+    from backend.engine.pool import TranscriptionPool
+
+    settings = MagicMock()
+    settings.workers = WorkersConfig(mode="thread", count=count, max_queue=max_queue)
+    settings.batching = BatchingConfig()
+    settings.cache = CacheConfig(transcription=ResultCacheConfig(enabled=False))
+    return TranscriptionPool(settings, transcriber)
+
+
+def segment(start: float, end: float, text: str):
+    return SimpleNamespace(start=start, end=end, text=text)
+
+
+def test_segments_become_final_once_stable():
+    transcriber = MagicMock()
+    config = StreamingConfig(step_seconds=1.0, window_seconds=20.0, stability_margin=1.0)
+    session = StreamingSession(transcriber, config)
+
+    session.push_samples(np.zeros(4 * SAMPLE_RATE, dtype=np.float32))
+    transcriber.transcribe_segments.return_value = [segment(0.0, 1.5, " Hello"), segment(1.5, 3.8, " wor")]
+    events = session.step()
+    assert events == [{"type": "partial", "text": "Hello wor"}]
+
+    # Same first segment again, well clear of the window edge: it gets committed
+    session.push_samples(np.zeros(2 * SAMPLE_RATE, dtype=np.float32))
+    transcriber.transcribe_segments.return_value = [segment(0.0, 1.5, " Hello"), segment(1.5, 5.5, " world")]
+    events = session.step()
+    assert events[0] == {"type": "final", "text": "Hello", "start": 0.0, "end": 1.5}
+    assert events[1] == {"type": "partial", "text": "world"}
+
+    # The next window starts after the committed segment
+    window = transcriber.transcribe_segments.call_args[0][0]
+    transcriber.transcribe_segments.return_value = [segment(0.0, 4.5, " world")]
+    events = session.step(final=True)
+    assert len(transcriber.transcribe_segments.call_args[0][0]) == 6 * SAMPLE_RATE - int(1.5 * SAMPLE_RATE)
+    assert len(window) == 6 * SAMPLE_RATE
+    assert events[-1] == {"type": "done", "text": "Hello world"}
+
+
+def test_committed_audio_is_released():
+    transcriber = MagicMock()
+    config = StreamingConfig(step_seconds=1.0, window_seconds=20.0, stability_margin=1.0)
+    session = StreamingSession(transcriber, config)
+
+    windows = []
+    finals = []
+    for _ in range(30):
+        session.push_samples(np.zeros(SAMPLE_RATE, dtype=np.float32))
+        # The first second repeats the previous pass, so it keeps getting committed
+        transcriber.transcribe_segments.return_value = [segment(0.0, 1.0, " again"), segment(1.0, 2.0, " again")]
+        finals += [e for e in session.step() if e["type"] == "final"]
+        windows.append(len(transcriber.transcribe_segments.call_args[0][0]))
+
+    # The window and the buffer stay around two seconds, however long the recording
+    assert max(windows[2:]) <= 3 * SAMPLE_RATE
+    assert sum(len(chunk) for chunk in session._samples) <= 3 * SAMPLE_RATE
+    assert session.duration == 30.0
+    # Timestamps stay absolute after the buffer is trimmed
+    assert [e["start"] for e in finals] == [float(n) for n in range(len(finals))]
+    assert len(finals) >= 27
+
+
+def test_websocket_streams_partial_and_final_text(make_transcriber, make_wav):
+    mock_model = MagicMock()
+    mock_model.transcribe.return_value = ([segment(0.0, 1.0, " Hello world")], MagicMock())
+
+    from backend.api.routes import get_transcription_pool
+    from backend.main import app
+
+    pool = make_pool(make_transcriber(mock_model, language="en"))
+    app.dependency_overrides[get_transcription_pool] = lambda: pool
+
+    try:
+        client = TestClient(app)
+        with client.websocket_connect("/api/ws/transcribe") as ws:
+            audio = make_wav(2.0)
+            for i in range(0, len(audio), 4096):
+                ws.send_bytes(audio[i:i + 4096])
+            ws.send_json({"type": "stop"})
+
+            events = []
+            while True:
+                event = ws.receive_json()
+                events.append(event)
+                if event["type"] in ("done", "error"):
+                    break
+    finally:
+        app.dependency_overrides.clear()
+        pool.shutdown()
+
+    assert events[-1] == {"type": "done", "text": "Hello world"}
+    # Inference went through the pool's admission counter
+    assert pool.in_flight == 0
+    audio_arg = mock_model.transcribe.call_args[0][0]
+    assert isinstance(audio_arg, np.ndarray)
+    assert abs(len(audio_arg) - 2 * SAMPLE_RATE) < SAMPLE_RATE // 10
+
+
+def test_websocket_is_refused_when_the_pool_is_full(make_transcriber):
+    import pytest
+    from starlette.websockets import WebSocketDisconnect
+
+    from backend.api.routes import get_transcription_pool
+    from backend.main import app
+
+    mock_model = MagicMock()
+    pool = make_pool(make_transcriber(mock_model, language="en"), count=1, max_queue=0)
+    pool._pending = 1  # the only worker is busy
+    app.dependency_overrides[get_transcription_pool] = lambda: pool
+    try:
+        with TestClient(app).websocket_connect("/api/ws/transcribe") as ws, pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    finally:
+        app.dependency_overrides.clear()
+        pool.shutdown()
+
+    assert closed.value.code == 1013
+    mock_model.transcribe.assert_not_called()
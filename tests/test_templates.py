@@ -1,15 +1,22 @@
 """
 Tests for prompt templates.
 """
+import asyncio
+import hashlib
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
+from backend.config.models import TemplatesConfig
+from backend.engine.templates import TemplateRegistry
+
 EXPECTED_TEMPLATES = [
     "fix_grammar.j2",
     "summarize.j2",
     "deep_research.j2",
     "expand.j2",
+    "summarize_reduce.j2",
 ]
 
 
@@ -31,3 +38,83 @@ def test_template_has_text_variable(prompts_dir: Path, template_name: str):
     template_path = prompts_dir / template_name
     content = template_path.read_text()
     assert "{{ text }}" in content, f"Template {template_name} missing {{{{ text }}}} variable"
+
+
+def test_registry_compiles_every_template(prompts_dir: Path):
+    registry = TemplateRegistry(TemplatesConfig(directory=prompts_dir))
+    names = [info.name for info in registry.list()]
+    assert names == sorted(name.removesuffix(".j2") for name in EXPECTED_TEMPLATES)
+
+    info = registry.get("fix_grammar.j2").info
+    assert info.sha256 == hashlib.sha256((prompts_dir / "fix_grammar.j2").read_bytes()).hexdigest()
+    # The instructions before {{ text }} are the same in every prompt
+    prompt = registry.render("fix_grammar", text="hello")
+    assert prompt.startswith(registry.get("fix_grammar").prefix)
+    assert info.prefix_chars > 0
+
+
+@pytest.mark.asyncio
+async def test_registry_recompiles_only_changed_files(tmp_path: Path):
+    (tmp_path / "a.j2").write_text("A: {{ text }}")
+    (tmp_path / "b.j2").write_text("B: {{ text }}")
+    (tmp_path / "d.j2").write_text("D: {{ text }}")
+    registry = TemplateRegistry(TemplatesConfig(directory=tmp_path, poll_seconds=0.01))
+    untouched = registry.get("d")
+
+    watcher = asyncio.create_task(registry.watch())
+    await asyncio.sleep(0)
+    (tmp_path / "a.j2").write_text("Changed A: {{ text }}")
+    (tmp_path / "c.j2").write_text("C: {{ text }}")
+    (tmp_path / "b.j2").unlink()
+    for _ in range(200):
+        if registry.render("a", text="x") == "Changed A: x" and "b" not in [i.name for i in registry.list()]:
+            break
+        await asyncio.sleep(0.01)
+    watcher.cancel()
+
+    assert registry.render("a", text="x") == "Changed A: x"
+    assert [info.name for info in registry.list()] == ["a", "c", "d"]
+    assert registry.get("d") is untouched
+    with pytest.raises(FileNotFoundError):
+        registry.get("b")
+
+
+def test_broken_edit_keeps_last_good_version(tmp_path: Path):
+    template = tmp_path / "a.j2"
+    template.write_text("A: {{ text }}")
+    registry = TemplateRegistry(TemplatesConfig(directory=tmp_path))
+    template.write_text("A: {{ text ")
+    assert registry.render("a", text="x") == "A: x"
+    with pytest.raises(FileNotFoundError):
+        registry.get("../a")
+
+
+def test_non_utf8_edit_keeps_last_good_version(tmp_path: Path):
+    template = tmp_path / "a.j2"
+    template.write_text("A: {{ text }}")
+    registry = TemplateRegistry(TemplatesConfig(directory=tmp_path))
+    template.write_bytes(b"A: \xff{{ text }}")
+
+    # reload() runs inside watch(); it must not raise
+    assert registry.reload() == []
+    assert registry.render("a", text="x") == "A: x"
+
+
+def test_templates_endpoint_lists_registry(prompts_dir: Path):
+    from fastapi.testclient import TestClient
+
+    from backend.api.routes import get_llm_engine
+    from backend.main import app
+
+    engine = MagicMock(templates=TemplateRegistry(TemplatesConfig(directory=prompts_dir)))
+    engine.settings.templates.default = "fix_grammar"
+    app.dependency_overrides[get_llm_engine] = lambda: engine
+    try:
+        response = TestClient(app).get("/api/templates")
+    finally:
+        app.dependency_overrides.clear()
+
+    body = response.json()
+    assert body["default"] == "fix_grammar"
+    assert {"fix_grammar", "summarize"} <= {t["name"] for t in body["templates"]}
+    assert len(body["templates"][0]["sha256"]) == 64
@@ -1,12 +1,16 @@
 import io
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 from fastapi.testclient import TestClient
 
+from backend.config.models import AudioConfig, TranscriptionConfig, VadConfig
+from backend.engine.audio import load_audio, normalize, resample
+
 # We need to mock faster_whisper before importing backend.engine
 # because backend.engine imports it at module level (or inside load_model)
 
-def test_transcribe_endpoint_uses_memory_file():
+def test_transcribe_endpoint_decodes_upload_to_array(make_wav):
     # Setup the mock instance
     mock_instance = MagicMock()
 
@@ -17,6 +21,8 @@ def test_transcribe_endpoint_uses_memory_file():
     mock_info = MagicMock()
     mock_info.language = "en"
     mock_info.language_probability = 0.99
+    mock_info.duration = 3.0
+    mock_info.duration_after_vad = 2.25
 
     # transcribe returns (generator of segments, info)
     mock_instance.transcribe.return_value = ([mock_segment], mock_info)
@@ -34,10 +40,9 @@ def test_transcribe_endpoint_uses_memory_file():
         # We need to create a valid Settings object or mock it
         # Since Transcriber accesses attributes like settings.transcription.model
         settings = MagicMock()
-        settings.transcription.model = "tiny"
-        settings.transcription.device = "cpu"
-        settings.transcription.compute_type = "int8"
-        settings.transcription.language = "en"
+        settings.transcription = TranscriptionConfig(model="tiny", device="cpu", compute_type="int8", language="en")
+        settings.vad = VadConfig()
+        settings.audio = AudioConfig()
 
         transcriber = Transcriber(settings)
 
@@ -47,8 +52,8 @@ def test_transcribe_endpoint_uses_memory_file():
 
         client = TestClient(app)
 
-        # Create a dummy file
-        file_content = b"fake audio data"
+        # A real WAV upload, as the browser recorder would send
+        file_content = make_wav(1.0, sample_rate=48000)
 
         # Use a file-like object for upload
         files = {"file": ("test.wav", io.BytesIO(file_content), "audio/wav")}
@@ -59,21 +64,187 @@ def test_transcribe_endpoint_uses_memory_file():
             print(response.json())
 
         assert response.status_code == 200
-        assert response.json() == {"text": "Hello world"}
+        assert response.json() == {"text": "Hello world", "vad_skipped_seconds": 0.75}
 
-        # Verify that transcribe was called with a file-like object, not a string path
-        # arguments to transcribe: (audio, language=..., beam_size=...)
-        # transcriber.model is our mock_instance
+        # Server-Timing separates decoding from inference
+        assert "decode;dur=" in response.headers["Server-Timing"]
+        assert "inference;dur=" in response.headers["Server-Timing"]
 
+        # Whisper receives the decoded 16 kHz float32 array, not the upload
         assert mock_instance.transcribe.called
-        call_args = mock_instance.transcribe.call_args
-        assert call_args is not None
+        audio_arg = mock_instance.transcribe.call_args[0][0]
+        assert isinstance(audio_arg, np.ndarray)
+        assert audio_arg.dtype == np.float32
+        assert len(audio_arg) == 16000
+
+
+def test_transcribe_passes_vad_settings_to_model(make_transcriber):
+    mock_info = MagicMock(language="en", language_probability=1.0, duration=10.0, duration_after_vad=4.0)
+    model = MagicMock()
+    model.transcribe.return_value = ([MagicMock(text=" Speech only")], mock_info)
+
+    vad = VadConfig(threshold=0.6, min_speech_duration=0.25, min_silence_duration=1.0)
+    transcriber = make_transcriber(model, vad=vad, language="en")
+
+    result = transcriber.transcribe(np.zeros(16000, dtype=np.float32))
+
+    kwargs = model.transcribe.call_args[1]
+    assert kwargs["vad_filter"] is True
+    assert kwargs["vad_parameters"] == {
+        "threshold": 0.6,
+        "min_speech_duration_ms": 250,
+        "min_silence_duration_ms": 1000,
+    }
+    assert result.text == "Speech only"
+    assert result.vad_skipped_seconds == 6.0
+
+
+def test_transcribe_without_vad_reports_no_skip(make_transcriber):
+    mock_info = MagicMock(language="en", language_probability=1.0, duration=10.0, duration_after_vad=10.0)
+    model = MagicMock()
+    model.transcribe.return_value = ([], mock_info)
+
+    transcriber = make_transcriber(model, vad=VadConfig(enabled=False), language="en")
+
+    result = transcriber.transcribe(np.zeros(16000, dtype=np.float32))
+
+    assert model.transcribe.call_args[1]["vad_filter"] is False
+    assert result.vad_skipped_seconds is None
+
+
+def test_load_audio_downmixes_resamples_and_normalizes(make_wav):
+    audio = load_audio(make_wav(0.5, sample_rate=48000, channels=2), AudioConfig())
+
+    assert audio.dtype == np.float32
+    assert len(audio) == 8000
+    assert abs(np.abs(audio).max() - 10 ** (-1 / 20)) < 1e-3
+
+
+def test_load_audio_without_normalization_keeps_level(make_wav):
+    audio = load_audio(make_wav(0.5), AudioConfig(normalize=False))
+
+    assert len(audio) == 8000
+    assert abs(np.abs(audio).max() - 8000 / 32768) < 1e-3
 
-        # The first argument to model.transcribe
-        audio_arg = call_args[0][0]
 
-        # It should be a file-like object (specifically SpooledTemporaryFile or BytesIO wrapper from FastAPI)
-        # We can check if it has a read method
-        assert hasattr(audio_arg, "read")
-        # It should NOT be a string
-        assert not isinstance(audio_arg, str)
+def test_load_audio_decodes_compressed_containers():
+    import av
+
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="ogg") as container:
+        stream = container.add_stream("libopus", rate=48000, layout="mono")
+        tone = (np.sin(2 * np.pi * 220 * np.arange(48000) / 48000) * 0.3).astype(np.float32)
+        frame = av.AudioFrame.from_ndarray(tone.reshape(1, -1), format="flt", layout="mono")
+        frame.rate = 48000
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+
+    audio = load_audio(buffer.getvalue(), AudioConfig(normalize=False))
+
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - 16000) < 1600
+
+
+def test_resample_and_normalize_edge_cases():
+    samples = np.ones(48, dtype=np.float32)
+    assert len(resample(samples, 48000, 16000)) == 16
+    assert len(resample(samples, 44100, 16000)) == round(48 * 16000 / 44100)
+
+    silence = np.zeros(10, dtype=np.float32)
+    assert not normalize(silence).any()
+
+
+def make_segment(start, end, text, words=None):
+    segment = MagicMock(start=start, end=end, text=text, avg_logprob=-0.21, no_speech_prob=0.01)
+    segment.words = None
+    if words is not None:
+        segment.words = [MagicMock(start=s, end=e, word=w, probability=0.9) for s, e, w in words]
+    return segment
+
+
+def make_pool(transcriber):
+    from backend.config.models import BatchingConfig, CacheConfig, ResultCacheConfig, WorkersConfig
+    from backend.engine.pool import TranscriptionPool
+
+    settings = MagicMock()
+    settings.workers = WorkersConfig(mode="thread", count=1)
+    settings.batching = BatchingConfig()
+    settings.cache = CacheConfig(transcription=ResultCacheConfig(enabled=False))
+    return TranscriptionPool(settings, transcriber)
+
+
+def test_transcribe_detail_returns_columnar_segments(make_transcriber, make_wav):
+    from backend.api.routes import get_transcription_pool
+    from backend.main import app
+
+    info = MagicMock(language="de", language_probability=0.87, duration=2.0, duration_after_vad=2.0)
+    model = MagicMock()
+    model.transcribe.return_value = ([
+        make_segment(0.0, 0.9, " Hallo", words=[(0.0, 0.9, " Hallo")]),
+        make_segment(1.0, 1.8, " Welt", words=[(1.0, 1.4, " We"), (1.4, 1.8, "lt")]),
+    ], info)
+    pool = make_pool(make_transcriber(model, vad=VadConfig(enabled=False)))
+    app.dependency_overrides[get_transcription_pool] = lambda: pool
+    try:
+        response = TestClient(app).post(
+            "/api/transcribe",
+            files={"file": ("a.wav", make_wav(0.5), "audio/wav")},
+            data={"detail": "words"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+        pool.shutdown()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["text"], body["language"], body["language_probability"]) == ("Hallo  Welt", "de", 0.87)
+    assert body["segments"]["start"] == [0.0, 1.0]
+    assert body["segments"]["text"] == ["Hallo", "Welt"]
+    assert body["segments"]["avg_logprob"] == [-0.21, -0.21]
+    assert body["segments"]["words"]["text"] == [" Hallo", " We", "lt"]
+    assert body["segments"]["words"]["segment"] == [0, 1, 1]
+    # Word timings come from the same decoding pass
+    assert model.transcribe.call_count == 1
+    assert model.transcribe.call_args[1]["word_timestamps"] is True
+
+
+def test_transcribe_segments_streams_as_decoded(make_transcriber, make_wav):
+    import json
+
+    from backend.api.routes import get_transcription_pool
+    from backend.main import app
+
+    def segments():
+        for n in range(3):
+            yield make_segment(float(n), n + 0.5, f" part {n}")
+
+    info = MagicMock(language="en", language_probability=0.99, duration=3.0, duration_after_vad=3.0)
+    model = MagicMock()
+    model.transcribe.return_value = (segments(), info)
+    pool = make_pool(make_transcriber(model, vad=VadConfig(enabled=False)))
+    app.dependency_overrides[get_transcription_pool] = lambda: pool
+    try:
+        with TestClient(app).stream(
+            "POST", "/api/transcribe/segments", files={"file": ("a.wav", make_wav(0.5), "audio/wav")}
+        ) as response:
+            events = [json.loads(line) for line in response.iter_lines() if line]
+    finally:
+        app.dependency_overrides.clear()
+        pool.shutdown()
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [e["type"] for e in events] == ["info", "segment", "segment", "segment", "done"]
+    assert events[0]["language"] == "en"
+    assert events[2] == {
+        "type": "segment",
+        "index": 1,
+        "start": [1.0],
+        "end": [1.5],
+        "text": ["part 1"],
+        "avg_logprob": [-0.21],
+        "no_speech_prob": [0.01],
+    }
+    assert events[-1]["text"] == "part 0  part 1  part 2"
+    assert pool.in_flight == 0